@@ -1,6 +1,11 @@
 import os
 
+from exceptions import DataNotFound
 from flask import Blueprint, jsonify
+from neo4j_database import get_pool_stats
+from relation_graph import relation_graph
+from segment_intervals import segment_layers
+from storage import base_text_cache
 
 api_bp = Blueprint("api", __name__)
 
@@ -9,3 +14,21 @@ api_bp = Blueprint("api", __name__)
 def get_version():
     commit_sha = os.getenv("COMMIT_SHA", "unknown")
     return jsonify({"version": "0.1.0", "git_sha": commit_sha}), 200
+
+
+@api_bp.route("/stats", methods=["GET"])
+def get_stats():
+    # Worker internals are only exposed where explicitly enabled
+    if os.getenv("STATS_ENDPOINT_ENABLED", "false").lower() != "true":
+        raise DataNotFound("Not found")
+    return (
+        jsonify(
+            {
+                "neo4j_pool": get_pool_stats(),
+                "base_text_cache": base_text_cache.stats(),
+                "relation_graph": relation_graph.stats(),
+                "segment_layers": segment_layers.stats(),
+            }
+        ),
+        200,
+    )
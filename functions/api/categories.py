@@ -4,6 +4,7 @@ from exceptions import InvalidRequest
 from flask import Blueprint, Response, jsonify, request
 from models import CategoryRequestModel, CategoryResponseModel
 from neo4j_database import Neo4JDatabase
+from pagination import cursor_from_args, next_cursor
 
 categories_bp = Blueprint("categories", __name__)
 
@@ -84,6 +85,8 @@ def get_texts_by_category(category_id: str) -> tuple[Response, int]:
       - instance_type: one of ['diplomatic', 'critical', 'all'] (default: 'all')
       - limit: page size (1..100, default 20)
       - offset: page offset (>= 0, default 0)
+      - cursor: keyset pagination instead of offset; pass the previous page's next_cursor,
+        or an empty value for the first page. The response is then {items, next_cursor}.
     """
     # Pagination
     limit = request.args.get("limit", 20, type=int)
@@ -103,6 +106,8 @@ def get_texts_by_category(category_id: str) -> tuple[Response, int]:
     # Normalize 'all' to None for DB filtering
     normalized_instance_type = None if instance_type == "all" else instance_type
 
+    after = cursor_from_args(request.args)
+
     db = Neo4JDatabase()
     texts = db.get_texts_by_category(
         category_id=category_id,
@@ -110,7 +115,11 @@ def get_texts_by_category(category_id: str) -> tuple[Response, int]:
         limit=limit,
         language=language,
         instance_type=normalized_instance_type,
+        after=after,
     )
 
     # Already minimal dicts with only title and instance_id
+    if after is not None:
+        ids = [text["text_metadata"]["id"] for text in texts]
+        return jsonify({"items": texts, "next_cursor": next_cursor(ids, limit)}), 200
     return jsonify(texts), 200
@@ -1,11 +1,12 @@
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
 
-import requests
 from api.annotations import _alignment_annotation_mapping
 from api.relation import _get_relation_for_an_expression
 from exceptions import DataNotFound, InvalidRequest
+from fieldsets import MANIFESTATION_FIELDS, fields_from_args
 from flask import Blueprint, Response, jsonify, request
 from identifier import generate_id
 from models import (
@@ -16,6 +17,7 @@ from models import (
     ContributionModelInput,
     ContributorRole,
     ExpressionModelInput,
+    InstanceContentsRequestModel,
     InstanceRequestModel,
     LocalizedString,
     ManifestationModelInput,
@@ -32,6 +34,15 @@ instances_bp = Blueprint("instances", __name__)
 
 logger = logging.getLogger(__name__)
 
+# Bounds concurrent base-text downloads across all requests in this worker
+_content_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="instance-content")
+
+# Manifestation fields returned as instance metadata
+_METADATA_FIELDS = {
+    field: MANIFESTATION_FIELDS[field]
+    for field in ("id", "type", "source", "bdrc", "wiki", "colophon", "incipit_title", "alt_incipit_titles")
+}
+
 
 def _trigger_search_segmenter(manifestation_id: str) -> None:
     """
@@ -42,6 +53,8 @@ def _trigger_search_segmenter(manifestation_id: str) -> None:
     """
 
     def _make_request():
+        import requests  # pylint: disable=import-outside-toplevel
+
         url = "https://sqs-search-segmenter-api.onrender.com/jobs/create"
         payload = {"manifestation_id": manifestation_id}
         response = requests.post(url, json=payload, timeout=10)
@@ -60,6 +73,8 @@ def _trigger_delete_search_segments(segment_ids: list[str]) -> None:
     """
 
     def _make_request():
+        import requests  # pylint: disable=import-outside-toplevel
+
         url = "https://sqs-search-segmenter-api.onrender.com/jobs/delete"
         payload = {"segment_ids": segment_ids}
         response = requests.post(url, json=payload, timeout=10)
@@ -79,37 +94,30 @@ def get_instance(manifestation_id: str):
     content_param = request.args.get("content", "false").lower() == "true"
     annotation_param = request.args.get("annotation", "false").lower() == "true"
     logger.info("Annotation parameter %s", annotation_param)
+    metadata_fields = fields_from_args(request.args, _METADATA_FIELDS) or frozenset(_METADATA_FIELDS)
 
     logger.info("Getting manifestation detail and expression id from Neo4J Database")
-    manifestation, expression_id = Neo4JDatabase().get_manifestation(manifestation_id=manifestation_id)
+    manifestation, expression_id = Neo4JDatabase().get_manifestation(
+        manifestation_id=manifestation_id,
+        fields=metadata_fields | {"annotations"} if annotation_param else metadata_fields,
+    )
 
     logger.info("Retrieving base text from storage")
     base_text = None
     if content_param:
         base_text = Storage().retrieve_base_text(expression_id=expression_id, manifestation_id=manifestation_id)
 
-    metadata = {
-        "id": manifestation.id,
-        "type": manifestation.type.value,
-        "source": manifestation.source,
-        "bdrc": manifestation.bdrc,
-        "wiki": manifestation.wiki,
-        "colophon": manifestation.colophon,
-        "incipit_title": manifestation.incipit_title.model_dump() if manifestation.incipit_title else None,
-        "alt_incipit_titles": (
-            [alt.model_dump() for alt in manifestation.alt_incipit_titles] if manifestation.alt_incipit_titles else None
-        ),
-    }
+    metadata = {field: manifestation[field] for field in _METADATA_FIELDS if field in metadata_fields}
 
     annotations = None
-    if annotation_param and manifestation.annotations:
+    if annotation_param and manifestation["annotations"]:
         annotations = []
-        for annotation in manifestation.annotations:
-            if annotation.type != AnnotationType.ALIGNMENT:
+        for annotation in manifestation["annotations"]:
+            if annotation["type"] != AnnotationType.ALIGNMENT:
                 annotations.append(
                     {
-                        "annotation_id": annotation.id,
-                        "type": annotation.type.value,
+                        "annotation_id": annotation["id"],
+                        "type": annotation["type"],
                     }
                 )
 
@@ -122,6 +130,55 @@ def get_instance(manifestation_id: str):
     return jsonify(json), 200
 
 
+@instances_bp.route("/contents", methods=["POST"], strict_slashes=False)
+def get_instance_contents() -> tuple[Response, int]:
+    """
+    Return the base text (or a span of it) of many instances in one call.
+
+    Body: {"instances": [{"manifestation_id": "...", "span": {"start": 0, "end": 10}}, ...]}
+    The span is optional. Results follow the request order.
+    """
+    data = request.get_json(force=True, silent=True)
+    if not data:
+        raise InvalidRequest("Request body is required")
+    request_model = InstanceContentsRequestModel.model_validate(data)
+
+    manifestation_ids = list(dict.fromkeys(item.manifestation_id for item in request_model.instances))
+    expression_ids = Neo4JDatabase().get_expression_ids_by_manifestation_ids(manifestation_ids)
+    if missing := [
+        manifestation_id for manifestation_id in manifestation_ids if manifestation_id not in expression_ids
+    ]:
+        raise DataNotFound(f"Manifestations not found: {', '.join(missing)}")
+
+    # Group spans per manifestation so every text is read once; None stands for the full text
+    spans: dict[str, list[tuple[int, int] | None]] = {manifestation_id: [] for manifestation_id in manifestation_ids}
+    for item in request_model.instances:
+        spans[item.manifestation_id].append((item.span.start, item.span.end) if item.span else None)
+
+    storage = Storage()
+
+    def fetch(manifestation_id: str) -> list[str]:
+        expression_id = expression_ids[manifestation_id]
+        requested = spans[manifestation_id]
+        if any(span is None for span in requested):
+            text = storage.retrieve_base_text(expression_id, manifestation_id)
+            return [text if span is None else text[span[0] : span[1]] for span in requested]
+        return storage.fetch_base_text_ranges(expression_id, manifestation_id, requested)
+
+    contents = dict(zip(manifestation_ids, _content_executor.map(fetch, manifestation_ids)))
+
+    result = []
+    for item in request_model.instances:
+        result.append(
+            {
+                "manifestation_id": item.manifestation_id,
+                "span": item.span.model_dump() if item.span else None,
+                "content": contents[item.manifestation_id].pop(0),
+            }
+        )
+    return jsonify(result), 200
+
+
 @instances_bp.route("/<string:manifestation_id>", methods=["PUT"], strict_slashes=False)
 def update_instance(manifestation_id: str):
     """Update a manifestation by ID."""
@@ -166,23 +223,30 @@ def update_instance(manifestation_id: str):
             )
         bibliography_segments = [seg.model_dump() for seg in request_model.biblography_annotation]
 
-    # Update manifestation in database
-    segment_ids = db.update_manifestation(
-        manifestation_id=manifestation_id,
-        manifestation=request_model.metadata,
-        annotation=annotation,
-        annotation_segments=annotation_segments,
-        bibliography_annotation=bibliography_annotation,
-        bibliography_segments=bibliography_segments,
-    )
-
-    # Update base text in storage
-    storage.store_base_text(
+    # Store the new text first, on the condition that it is still the version the graph refers to
+    previous_generation, _ = db.get_base_text_generations(manifestation_id)
+    base_text_generation = storage.store_base_text(
         expression_id=expression_id,
         manifestation_id=manifestation_id,
         base_text=request_model.content,
+        if_generation_match=previous_generation,
     )
 
+    try:
+        segment_ids = db.update_manifestation(
+            manifestation_id=manifestation_id,
+            manifestation=request_model.metadata,
+            annotation=annotation,
+            annotation_segments=annotation_segments,
+            bibliography_annotation=bibliography_annotation,
+            bibliography_segments=bibliography_segments,
+        )
+        db.set_base_text_generation(manifestation_id=manifestation_id, generation=base_text_generation)
+    except Exception as e:
+        logger.error("Error updating manifestation: %s", e)
+        _restore_base_text(db, storage, expression_id, manifestation_id, base_text_generation, previous_generation)
+        raise e
+
     _trigger_delete_search_segments(segment_ids)
     # Trigger search segmenter API asynchronously
     _trigger_search_segmenter(manifestation_id)
@@ -190,6 +254,31 @@ def update_instance(manifestation_id: str):
     return jsonify({"message": "Manifestation updated successfully", "id": manifestation_id}), 200
 
 
+def _restore_base_text(
+    db: Neo4JDatabase,
+    storage: Storage,
+    expression_id: str,
+    manifestation_id: str,
+    generation: int,
+    previous_generation: int | None,
+) -> None:
+    """Put back the base text `generation` replaced after a failed graph update, and record it."""
+    # Without a recorded previous generation (texts stored before they were tracked) the
+    # object's versions are listed instead
+    restored_generation = storage.rollback_base_text(
+        expression_id=expression_id,
+        manifestation_id=manifestation_id,
+        generation=generation if previous_generation is not None else None,
+        previous_generation=previous_generation,
+    )
+    if restored_generation is None:
+        return
+    try:
+        db.set_base_text_generation(manifestation_id=manifestation_id, generation=restored_generation)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Could not record restored base text generation of %s: %s", manifestation_id, e)
+
+
 def _create_aligned_text(
     request_model: AlignedTextRequestModel, text_type: TextType, target_manifestation_id: str
 ) -> tuple[Response, int]:
@@ -221,7 +310,7 @@ def _create_aligned_text(
     ]
 
     storage = Storage()
-    storage.store_base_text(
+    base_text_generation = storage.store_base_text(
         expression_id=expression_id, manifestation_id=manifestation_id, base_text=request_model.content
     )
 
@@ -294,6 +383,7 @@ def _create_aligned_text(
                 alignments=alignments,
                 bibliography_annotation=bibliography_annotation,
                 bibliography_segments=bibliography_segments,
+                base_text_generation=base_text_generation,
             )
         else:
             db.create_manifestation(
@@ -305,10 +395,12 @@ def _create_aligned_text(
                 annotation_segments=segmentation_segments,
                 bibliography_annotation=bibliography_annotation,
                 bibliography_segments=bibliography_segments,
+                base_text_generation=base_text_generation,
             )
     except Exception as e:
         logger.error("Error creating aligned text: %s", e)
-        Storage().rollback_base_text(expression_id=expression_id, manifestation_id=manifestation_id)
+        # The text was just created, so there is no earlier generation to restore
+        storage.delete_base_text(expression_id=expression_id, manifestation_id=manifestation_id)
         raise e
 
     # Trigger search segmenter API asynchronously
@@ -332,38 +424,9 @@ def get_segments_relation_by_manifestation(manifestation_id: str):
     logger.info("Getting segmentation annotation and it's segments by manifestation")
     db = Neo4JDatabase()
     segments = db.get_segmentation_annotation_by_manifestation(manifestation_id=manifestation_id)
-    logger.info("Fetched segmentation annotation with it's segments nodes")
-    response = {"instance_id": manifestation_id, "segments_relations": []}
-
-    # Process each segment
-    logger.info("Beginning with getting segments relation for each segment node")
-    for segment in segments:
-
-        start = int(segment["span"]["start"])
-        end = int(segment["span"]["end"])
-
-        logger.info(
-            "Getting related segments for segment id: %s with span_start: %s, span_end: %s", segment["id"], start, end
-        )
-
-        related_segments = db._get_related_segments(
-            manifestation_id=manifestation_id, start=start, end=end, transform=True
-        )
-
-        logger.info(
-            "Fetched related segments for segment id: %s with span_start: %s, span_end: %s", segment["id"], start, end
-        )
-        logger.info("Appending to response list")
-        response["segments_relations"].append({"segment_id": segment["id"], "related_segments": related_segments})
-
-        logger.info(
-            "Completed searching segment related for segment id: %s with span_start: %s, span_end: %s",
-            segment["id"],
-            start,
-            end,
-        )
-
-    return jsonify(response), 200
+    logger.info("Fetched %d segments, getting the related segments of each", len(segments))
+    segments_relations = db.get_segments_relations(manifestation_id=manifestation_id, segments=segments)
+    return jsonify({"instance_id": manifestation_id, "segments_relations": segments_relations}), 200
 
 
 @instances_bp.route("/<string:original_manifestation_id>/commentary", methods=["POST"], strict_slashes=False)
@@ -463,7 +526,9 @@ def get_segment_related(manifestation_id: str) -> tuple[Response, int]:
 
     expression_ids = [expression_map.get(manifestation_id) for manifestation_id in manifestation_ids]
 
-    manifestations_metadata = db.get_manifestations_metadata_by_ids(manifestation_ids)
+    manifestations_metadata = db.get_manifestations_metadata_by_ids(
+        manifestation_ids, fields=frozenset(_METADATA_FIELDS)
+    )
     expression_metadata = db.get_expressions_metadata_by_ids(expression_ids)
 
     relations = _get_relation_for_an_expression(expression_id=expression_map[manifestation_id])
@@ -477,23 +542,12 @@ def get_segment_related(manifestation_id: str) -> tuple[Response, int]:
         manifestation_id = related_segment.get("manifestation_id")
         del related_segment["manifestation_id"]
         related_segment["instance_metadata"] = manifestations_metadata.get(manifestation_id)
-
-        _delete_unwanted_fields(
-            dictionary=related_segment["instance_metadata"],
-            unwanted_fields=["annotations", "alignment_sources", "alignment_targets"],
-        )
-
         related_segment["text_metadata"] = expression_metadata.get(expression_map.get(manifestation_id))
         related_segment["relation"] = relations_look_up.get(expression_map.get(manifestation_id)).lower()
 
     return jsonify(related_segments), 200
 
 
-def _delete_unwanted_fields(dictionary: dict, unwanted_fields: list[str]) -> None:
-    for field in unwanted_fields:
-        del dictionary[field]
-
-
 @instances_bp.route("/<string:manifestation_id>/related", methods=["GET"], strict_slashes=False)
 def get_related_instances(manifestation_id: str) -> tuple[Response, int]:
     logger.info("Finding related instances for manifestation ID: %s", manifestation_id)
@@ -555,8 +609,7 @@ def get_instance_segment_content(manifestation_id: str) -> tuple[Response, int]:
 
     expression_id = db.get_expression_id_by_manifestation_id(manifestation_id)
 
-    base_text = Storage().retrieve_base_text(expression_id=expression_id, manifestation_id=manifestation_id)
-    result = []
+    storage = Storage()
 
     # Handle segment approach
     if segment_ids:
@@ -564,15 +617,16 @@ def get_instance_segment_content(manifestation_id: str) -> tuple[Response, int]:
         # Get all segments in batch using Cypher query
         segments_data = db._get_segments_batch(segment_ids)
 
-        errors = []
-
-        for segment in segments_data:
-            content = base_text[segment["span_start"] : segment["span_end"]]
-            result.append({"segment_id": segment["segment_id"], "content": content})
-
-        # If there are any errors, return error
-        if errors:
-            return jsonify({"error": "; ".join(errors)}), 404
+        # Only the bytes covering the requested segments are downloaded
+        contents = storage.fetch_base_text_ranges(
+            expression_id=expression_id,
+            manifestation_id=manifestation_id,
+            spans=[(segment["span_start"], segment["span_end"]) for segment in segments_data],
+        )
+        result = [
+            {"segment_id": segment["segment_id"], "content": content}
+            for segment, content in zip(segments_data, contents)
+        ]
 
         # Return result
         return jsonify(result), 200
@@ -580,9 +634,10 @@ def get_instance_segment_content(manifestation_id: str) -> tuple[Response, int]:
     # Handle span approach
     if span_start is not None and span_end is not None:
         span = SpanModel(start=int(span_start), end=int(span_end))
-        content = base_text[span.start : span.end]
-        result.append({"segment_id": None, "content": content})
-        return jsonify(result), 200
+        content = storage.fetch_base_text_range(
+            expression_id=expression_id, manifestation_id=manifestation_id, start=span.start, end=span.end
+        )
+        return jsonify([{"segment_id": None, "content": content}]), 200
 
 
 def _validate_request_parameters(segment_ids: list[str], span_start: str, span_end: str) -> tuple[bool, str]:
@@ -1,9 +1,11 @@
 import logging
 
 from exceptions import InvalidRequest, ValidationError
+from fieldsets import PERSON_FIELDS, fields_from_args
 from flask import Blueprint, Response, jsonify, request
 from models import PersonModelInput
 from neo4j_database import Neo4JDatabase
+from pagination import cursor_from_args, next_cursor
 
 persons_bp = Blueprint("persons", __name__)
 
@@ -12,8 +14,9 @@ logger = logging.getLogger(__name__)
 
 @persons_bp.route("/<string:person_id>", methods=["GET"], strict_slashes=False)
 def get_person(person_id: str) -> tuple[Response, int]:
-    person = Neo4JDatabase().get_person(person_id)
-    return jsonify(person.model_dump()), 200
+    fields = fields_from_args(request.args, PERSON_FIELDS)
+    person = Neo4JDatabase().get_person(person_id, fields=fields)
+    return jsonify(person.model_dump() if fields is None else person), 200
 
 
 @persons_bp.route("/", methods=["GET"], strict_slashes=False)
@@ -26,8 +29,16 @@ def get_all_persons() -> tuple[Response, int]:
     if offset < 0:
         raise ValidationError("Offset must be non-negative")
 
-    persons = Neo4JDatabase().get_all_persons(offset=offset, limit=limit)
-    return jsonify([person.model_dump() for person in persons]), 200
+    after = cursor_from_args(request.args)
+    fields = fields_from_args(request.args, PERSON_FIELDS)
+
+    persons = Neo4JDatabase().get_all_persons(offset=offset, limit=limit, after=after, fields=fields)
+    response_data = [person.model_dump() for person in persons] if fields is None else persons
+
+    if after is not None:
+        ids = [p["id"] for p in response_data]
+        return jsonify({"items": response_data, "next_cursor": next_cursor(ids, limit)}), 200
+    return jsonify(response_data), 200
 
 
 @persons_bp.route("/", methods=["POST"], strict_slashes=False)
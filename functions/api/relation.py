@@ -1,8 +1,11 @@
 import logging
+from collections import deque
 
-from exceptions import InvalidRequest
-from flask import Blueprint, Response, jsonify
+from exceptions import DataNotFound, InvalidRequest
+from flask import Blueprint, Response, jsonify, request
+from models import ExpressionRelationsRequestModel
 from neo4j_database import Neo4JDatabase
+from relation_graph import relation_graph
 
 relation_bp = Blueprint("relation", __name__)
 
@@ -17,9 +20,37 @@ def get_expression_relations(expression_id: str) -> tuple[Response, int]:
     return jsonify(response), 200
 
 
+@relation_bp.route("/expressions:batch", methods=["POST"], strict_slashes=False)
+def get_expressions_relations() -> tuple[Response, int]:
+    """
+    Return the relations of many expressions in one call.
+
+    Body: {"expression_ids": ["...", ...]}. The response maps each expression ID to the same
+    relation map as GET /expressions/<expression_id>. Expressions in one connected component share
+    a single component lookup.
+    """
+    data = request.get_json(force=True, silent=True)
+    if not data:
+        raise InvalidRequest("Request body is required")
+    request_model = ExpressionRelationsRequestModel.model_validate(data)
+
+    expression_ids = list(dict.fromkeys(request_model.expression_ids))
+    components = relation_graph.components(Neo4JDatabase(), expression_ids)
+    if missing := [expression_id for expression_id in expression_ids if components[expression_id] is None]:
+        raise DataNotFound(f"Expressions not found: {', '.join(missing)}")
+
+    response = {
+        expression_id: _group_by_relation(_classify_relations(expression_id, components[expression_id]))
+        for expression_id in expression_ids
+    }
+    return jsonify(response), 200
+
+
 def _get_relation_for_an_expression(expression_id: str) -> dict:
+    return _group_by_relation(_get_expression_relations(expression_id))
 
-    relationship = _get_expression_relations(expression_id)
+
+def _group_by_relation(relationship: dict) -> dict:
     response = {}
 
     for key, value in relationship.items():
@@ -54,19 +85,23 @@ def _get_relation_according_to_relation_rule(relation: str) -> str:
 
 
 def _get_expression_relations(expression_id: str):
-    db = Neo4JDatabase()
-    expression_relations = db.get_all_expression_relations()
-    if expression_id not in expression_relations:
-        raise InvalidRequest(f"Expression with ID {expression_id} not found")
+    # Only the expression's connected component can be reached from it
+    expression_relations = relation_graph.component(Neo4JDatabase(), expression_id)
+    if expression_relations is None:
+        raise DataNotFound(f"Expression with ID {expression_id} not found")
+    return _classify_relations(expression_id, expression_relations)
+
+
+def _classify_relations(expression_id: str, expression_relations: dict[str, list[dict]]) -> dict:
     relation_dict = {}
-    queue = []
+    queue = deque()
     explored_expression = set()
 
     relation_dict[expression_id] = None
     queue.append(expression_id)
 
     while queue:
-        current_id = queue.pop(0)
+        current_id = queue.popleft()
 
         # Skip if already explored (prevents infinite loops)
         if current_id in explored_expression:
@@ -75,8 +110,9 @@ def _get_expression_relations(expression_id: str):
         explored_expression.add(current_id)
         logger.info("Exploring expression: %s", current_id)
 
-        # Process all relations for current node
-        for relation in expression_relations[current_id]:
+        # Process all relations for current node; a component fetched while a relation was being
+        # written may lack its newest member
+        for relation in expression_relations.get(current_id, []):
             other_id = relation.get("otherId")
 
             # Skip if the related node has already been explored
@@ -1,7 +1,7 @@
 from difflib import diff_bytes
 import logging
 
-import requests
+from api.instances import _restore_base_text
 from exceptions import DataNotFound, InvalidRequest
 from flask import Blueprint, Response, jsonify, request
 from models import SearchFilterModel, SearchRequestModel, SearchResponseModel, SearchResultModel, SegmentContentInput
@@ -70,6 +70,8 @@ def search_segments() -> tuple[Response, int]:
     Search segments by forwarding request to external search API and enriching results
     with overlapping segmentation annotation segment IDs.
     """
+    import requests  # pylint: disable=import-outside-toplevel
+
     # Get query parameters
     query = request.args.get("query")
     if not query:
@@ -231,19 +233,13 @@ def update_segment_content(segment_id: str) -> tuple[Response, int]:
         end=old_end,
     )
 
-    Storage().update_base_text_range(
-        expression_id=expression_id,
-        manifestation_id=manifestation_id,
-        start=old_start,
-        end=old_end,
-        new_content=validated_data.content,
-    )
-
     diffs = calculate_text_diffs_for_content(old_content, validated_data.content, old_start)
 
 
     manifestation, _ = db.get_manifestation(manifestation_id)
 
+    span_updates = []
+
     for annotation in manifestation.annotations:
         if annotation.type in [AnnotationType.SEGMENTATION, AnnotationType.PAGINATION, AnnotationType.DURCHEN, AnnotationType.BIBLIOGRAPHY, AnnotationType.ALIGNMENT]:
             segments = db.get_annotation_segments(annotation.id)
@@ -290,9 +286,28 @@ def update_segment_content(segment_id: str) -> tuple[Response, int]:
                         "span_end": new_end
                     })
 
-                # Update the segments in batch
-                db.update_segmentation_spans(segments_to_update)
+                span_updates.extend(segments_to_update)
 
+    # Reject the edit if the stored text is no longer the version the graph refers to
+    previous_generation, _ = db.get_base_text_generations(manifestation_id)
+    storage = Storage()
+    base_text_generation = storage.update_base_text_range(
+        expression_id=expression_id,
+        manifestation_id=manifestation_id,
+        start=segment_model.span.start,
+        end=segment_model.span.end,
+        new_content=validated_data.content,
+        if_generation_match=previous_generation,
+    )
+
+    # Every shifted span is written in one transaction; if that fails the text edit is undone
+    try:
+        db.set_base_text_generation(manifestation_id=manifestation_id, generation=base_text_generation)
+        db.update_segmentation_spans(span_updates)
+    except Exception as e:
+        logger.error("Error updating segment spans after editing segment %s: %s", segment_model.id, e)
+        _restore_base_text(db, storage, expression_id, manifestation_id, base_text_generation, previous_generation)
+        raise e
 
     return jsonify({"message": "Segment content updated"}), 200
 
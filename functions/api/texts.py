@@ -3,6 +3,7 @@ import logging
 from api.instances import _trigger_search_segmenter
 from api.relation import _get_expression_relations
 from exceptions import DataNotFound, InvalidRequest
+from fieldsets import EXPRESSION_FIELDS, fields_from_args
 from flask import Blueprint, Response, jsonify, request
 from identifier import generate_id
 from models import (
@@ -16,6 +17,7 @@ from models import (
 )
 from neo4j_database import Neo4JDatabase
 from neo4j_database_validator import Neo4JDatabaseValidator
+from pagination import cursor_from_args, next_cursor
 from storage import Storage
 
 texts_bp = Blueprint("texts", __name__)
@@ -43,11 +45,17 @@ def get_all_texts() -> tuple[Response, int]:
     if title_filter := request.args.get("title"):
         filters["title"] = title_filter
 
+    after = cursor_from_args(request.args)
+    fields = fields_from_args(request.args, EXPRESSION_FIELDS)
+
     db = Neo4JDatabase()
-    result = db.get_all_expressions(offset=offset, limit=limit, filters=filters)
+    result = db.get_all_expressions(offset=offset, limit=limit, filters=filters, after=after, fields=fields)
 
-    response_data = [item.model_dump() for item in result]
+    response_data = [item.model_dump() for item in result] if fields is None else result
 
+    if after is not None:
+        ids = [item["id"] for item in response_data]
+        return jsonify({"items": response_data, "next_cursor": next_cursor(ids, limit)}), 200
     return jsonify(response_data), 200
 
 
@@ -62,17 +70,18 @@ def get_texts_group(texts_id: str) -> tuple[Response, int]:
 
 @texts_bp.route("/<string:expression_id>", methods=["GET"], strict_slashes=False)
 def get_texts(expression_id: str) -> tuple[Response, int]:
+    fields = fields_from_args(request.args, EXPRESSION_FIELDS)
     db = Neo4JDatabase()
 
     # Try to get expression by ID first
     try:
-        expression = db.get_expression(expression_id=expression_id)
-        return jsonify(expression.model_dump()), 200
+        expression = db.get_expression(expression_id=expression_id, fields=fields)
+        return jsonify(expression.model_dump() if fields is None else expression), 200
     except DataNotFound:
         # If not found by ID, try to get by BDRC ID
         try:
-            expression = db.get_expression_by_bdrc(bdrc_id=expression_id)
-            return jsonify(expression.model_dump()), 200
+            expression = db.get_expression_by_bdrc(bdrc_id=expression_id, fields=fields)
+            return jsonify(expression.model_dump() if fields is None else expression), 200
         except DataNotFound as exc:
             # If both fail, return not found
             raise DataNotFound(f"Text with ID or BDRC ID '{expression_id}' not found") from exc
@@ -149,7 +158,7 @@ def create_instance(expression_id: str) -> tuple[Response, int]:
     manifestation_id = generate_id()
     storage = Storage()
 
-    storage.store_base_text(
+    base_text_generation = storage.store_base_text(
         expression_id=expression_id, manifestation_id=manifestation_id, base_text=instance_request.content
     )
 
@@ -170,6 +179,7 @@ def create_instance(expression_id: str) -> tuple[Response, int]:
         manifestation_id=manifestation_id,
         bibliography_annotation=bibliography_annotation,
         bibliography_segments=bibliography_segments,
+        base_text_generation=base_text_generation,
     )
 
     # Trigger search segmenter API asynchronously
@@ -0,0 +1,76 @@
+from exceptions import InvalidRequest
+from models import remove_duplicate_alternatives
+from pydantic_core import to_jsonable_python
+
+# Selectable fields of each resource: API field name -> key of the matching Queries.*_fragment
+EXPRESSION_FIELDS = {
+    "id": "id",
+    "bdrc": "bdrc",
+    "wiki": "wiki",
+    "type": "type",
+    "contributions": "contributors",
+    "date": "date",
+    "title": "title",
+    "alt_titles": "alt_titles",
+    "language": "language",
+    "target": "target",
+    "category_id": "category_id",
+    "copyright": "copyright",
+    "license": "license",
+}
+MANIFESTATION_FIELDS = {
+    field: field
+    for field in (
+        "id",
+        "bdrc",
+        "wiki",
+        "type",
+        "source",
+        "colophon",
+        "incipit_title",
+        "alt_incipit_titles",
+        "annotations",
+        "alignment_sources",
+        "alignment_targets",
+    )
+}
+PERSON_FIELDS = {field: field for field in ("id", "bdrc", "wiki", "name", "alt_names")}
+
+# Alternatives are deduplicated against their primary value, as the output models do
+_ALTERNATIVE_OF = {"alt_titles": "title", "alt_names": "name", "alt_incipit_titles": "incipit_title"}
+# Fields whose value is derived with the help of another one (standalone translations and
+# commentaries get target "N/A" from their type)
+_DERIVED_FROM = {**_ALTERNATIVE_OF, "target": "type"}
+
+
+def fields_from_args(args, allowed: dict[str, str]) -> frozenset[str] | None:
+    """
+    API fields requested with `fields=a,b`, or None when the parameter is absent (every field).
+
+    `id` is always included. Raises InvalidRequest for fields not in `allowed`.
+    """
+    if (value := args.get("fields")) is None:
+        return None
+    fields = {field.strip() for field in value.split(",") if field.strip()}
+    if unknown := fields - allowed.keys():
+        raise InvalidRequest(f"Unknown fields: {', '.join(sorted(unknown))}. Allowed fields: {', '.join(allowed)}")
+    return frozenset(fields | {"id"})
+
+
+def fragment_fields(fields: frozenset[str], allowed: dict[str, str]) -> frozenset[str]:
+    """Fragment keys to project for the requested API `fields`, including the ones they derive from."""
+    needed = fields | {_DERIVED_FROM[field] for field in fields if field in _DERIVED_FROM}
+    return frozenset(allowed[field] for field in needed)
+
+
+def select_fields(values: dict, fields: frozenset[str], allowed: dict[str, str]) -> dict:
+    """The requested `fields` of converted model field values, as JSON-ready data in the order of `allowed`."""
+    selected = {}
+    for field in allowed:
+        if field not in fields:
+            continue
+        value = values.get(field)
+        if field in _ALTERNATIVE_OF:
+            value = remove_duplicate_alternatives(values.get(_ALTERNATIVE_OF[field]), value)
+        selected[field] = to_jsonable_python(value)
+    return selected
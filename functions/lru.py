@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class SizedLRUCache:
+    """
+    Thread-safe LRU bounded by the total size of its values, as given when each one is put.
+
+    Values larger than the whole budget are not cached. `unit` names the size in `stats`, which
+    reports it as `unit` and the budget as `max_{unit}`.
+    """
+
+    def __init__(self, max_size: int, unit: str) -> None:
+        self.max_size = max_size
+        self.unit = unit
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        if size > self.max_size:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    def invalidate_where(self, matches: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key `matches`."""
+        with self._lock:
+            for key in [k for k in self._entries if matches(k)]:
+                self._size -= self._entries.pop(key)[1]
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                self.unit: self._size,
+                f"max_{self.unit}": self.max_size,
+            }
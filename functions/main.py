@@ -1,8 +1,9 @@
 import logging
 import os
+import threading
+import time
 import traceback
 
-import firebase_admin
 from api.annotations import annotations_bp
 from api.api import api_bp
 from api.categories import categories_bp
@@ -14,14 +15,25 @@ from api.texts import texts_bp
 from api.enum import enum_bp
 from api.relation import relation_bp
 from exceptions import OpenPechaException
-from firebase_admin import credentials
 from firebase_functions import https_fn, options
 from flask import Flask, jsonify, request
-from google.cloud import logging as cloud_logging
 from pydantic import ValidationError
 
 
+logger = logging.getLogger(__name__)
+
+# The Flask app is built once per worker and reused by every invocation of `api`.
+# Flask dispatch is thread-safe, so a single app can serve concurrent requests.
+_app: Flask | None = None
+_app_lock = threading.Lock()
+
+
 def _init_firebase():
+    # Imported here to keep firebase_admin and Cloud Logging out of the module import path.
+    import firebase_admin  # pylint: disable=import-outside-toplevel
+    from firebase_admin import credentials  # pylint: disable=import-outside-toplevel
+    from google.cloud import logging as cloud_logging  # pylint: disable=import-outside-toplevel
+
     try:
         firebase_admin.get_app()  # Check if Firebase is already initialized
     except ValueError:
@@ -129,7 +141,24 @@ def create_app(testing=False):
     memory=options.MemoryOption.MB_512,
 )
 def api(req: https_fn.Request) -> https_fn.Response:
-    _init_firebase()
-    app = create_app()
+    app = _get_app()
+    started = time.perf_counter()
     with app.request_context(req.environ):
-        return app.full_dispatch_request()
+        response = app.full_dispatch_request()
+    response.headers["Server-Timing"] = f"app;dur={(time.perf_counter() - started) * 1000:.1f}"
+    return response
+
+
+def _get_app() -> Flask:
+    """Return the worker's app, initializing Firebase, logging and blueprints on first use."""
+    global _app  # pylint: disable=global-statement
+    if _app is not None:
+        return _app
+
+    with _app_lock:
+        if _app is None:
+            started = time.perf_counter()
+            _init_firebase()
+            _app = create_app()
+            logger.info("Initialized app in %.1f ms", (time.perf_counter() - started) * 1000)
+    return _app
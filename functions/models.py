@@ -71,6 +71,8 @@ class OpenPechaModel(BaseModel):
     model_config = ConfigDict(
         extra="forbid",
         str_strip_whitespace=True,
+        # Build validators on first use instead of at import to keep cold starts short
+        defer_build=True,
     )
 
 
@@ -81,6 +83,8 @@ class Copyright(OpenPechaModel):
 
 
 class LocalizedString(RootModel[dict[str, NonEmptyStr]]):
+    model_config = ConfigDict(defer_build=True)
+
     root: dict[str, NonEmptyStr] = Field(min_length=1)
 
     def __getitem__(self, item: str) -> str:
@@ -615,4 +619,17 @@ class UpdateBaseTextSegmentModel(OpenPechaModel):
 
 
 class SegmentContentInput(OpenPechaModel):
-    content: NonEmptyStr = Field(..., description="The new content for the segment", min_length=1)
\ No newline at end of file
+    content: NonEmptyStr = Field(..., description="The new content for the segment", min_length=1)
+
+
+class InstanceContentRequestModel(OpenPechaModel):
+    manifestation_id: NonEmptyStr
+    span: SpanModel | None = Field(None, description="Only return this part of the base text")
+
+
+class InstanceContentsRequestModel(OpenPechaModel):
+    instances: list[InstanceContentRequestModel] = Field(..., min_length=1, max_length=100)
+
+
+class ExpressionRelationsRequestModel(OpenPechaModel):
+    expression_ids: list[NonEmptyStr] = Field(..., min_length=1, max_length=100)
@@ -39,6 +39,14 @@ CREATE CONSTRAINT manifestation_type_name_unique IF NOT EXISTS FOR (mt:Manifesta
 // CopyrightStatus nodes - each copyright status must have a unique name
 CREATE CONSTRAINT copyright_status_name_unique IF NOT EXISTS FOR (cs:CopyrightStatus) REQUIRE cs.name IS UNIQUE;
 
+// RelationsVersion node - the single counter of TRANSLATION_OF/COMMENTARY_OF writes that
+// versions the per-worker relation graph cache (MERGEd by the expression create queries)
+CREATE CONSTRAINT relations_version_id_unique IF NOT EXISTS FOR (v:RelationsVersion) REQUIRE v.id IS UNIQUE;
+
+// Backfill nodes - one per finished backfill script that queries rely on (see
+// scripts/backfill_expression_types.py)
+CREATE CONSTRAINT backfill_id_unique IF NOT EXISTS FOR (b:Backfill) REQUIRE b.id IS UNIQUE;
+
 // =============================================================================
 // UNIQUE CONSTRAINTS FOR EXTERNAL IDENTIFIERS (BDRC/WIKI)
 // =============================================================================
@@ -71,5 +79,38 @@ CREATE CONSTRAINT manifestation_wiki_unique IF NOT EXISTS FOR (m:Manifestation)
 // =============================================================================
 // INDEXING FOR FULLTEXT SEARCH ON LOCALIZED TEXT NODES
 // =============================================================================
+// Backs title and author search. The standard analyzer follows Unicode word boundaries, which
+// split Tibetan at the tsheg (་) and shad (།) into syllables and Latin scripts into lowercased
+// words. Keeping stop words lets English titles like "The Way of the Bodhisattva" match in full.
+// An index created before the analyzer was set explicitly has the same default. To change
+// analyzers, DROP INDEX localized_text_fulltext and re-run this statement.
 CREATE FULLTEXT INDEX localized_text_fulltext IF NOT EXISTS
-FOR (lt:LocalizedText) ON EACH [lt.text];
\ No newline at end of file
+FOR (lt:LocalizedText) ON EACH [lt.text]
+OPTIONS {indexConfig: {`fulltext.analyzer`: 'standard-no-stop-words'}};
+
+
+// =============================================================================
+// INDEXES FOR FILTERED LISTINGS
+// =============================================================================
+// Materialized expression type (root/translation/commentary/translation_source/none), kept up to
+// date by the expression create queries. Populate existing expressions with
+// scripts/backfill_expression_types.py; type-filtered listings only seek it once that finished.
+CREATE INDEX expression_type IF NOT EXISTS FOR (e:Expression) ON (e.type);
+
+// Keyset pagination of type-filtered listings (ORDER BY e.id within one type)
+CREATE INDEX expression_type_id IF NOT EXISTS FOR (e:Expression) ON (e.type, e.id);
+
+// Connected component of TRANSLATION_OF/COMMENTARY_OF relations, set by the expression create
+// queries. Relation lookups fetch a whole component through it. Populate existing expressions
+// with scripts/backfill_relation_groups.py.
+CREATE INDEX expression_relation_group IF NOT EXISTS FOR (e:Expression) ON (e.relation_group);
+
+// Materialized annotation type (the HAS_TYPE AnnotationType name), set by the annotation create
+// query. Layer lookups filter a manifestation's annotations on it. Populate existing annotations
+// with scripts/backfill_annotation_types.py.
+CREATE INDEX annotation_type IF NOT EXISTS FOR (a:Annotation) ON (a.type);
+
+// Overlap lookups of one annotation's segments (annotation_id equality, then a span_start range
+// bounded by Annotation.max_span_length). Populate existing segments with
+// scripts/backfill_segment_spans.py.
+CREATE INDEX segment_annotation_span IF NOT EXISTS FOR (s:Segment) ON (s.annotation_id, s.span_start);
@@ -1,8 +1,13 @@
+from __future__ import annotations
+
 import logging
 import os
-import queue as queue_module
+import re
+import threading
+from typing import TYPE_CHECKING, Callable
 
 from exceptions import DataNotFound
+from fieldsets import EXPRESSION_FIELDS, MANIFESTATION_FIELDS, PERSON_FIELDS, fragment_fields, select_fields
 from identifier import generate_id
 from models import (
     AIContributionModel,
@@ -28,74 +33,188 @@ from models import (
     TextType,
     ContributionModelOutput,
 )
-from neo4j import GraphDatabase
 from neo4j_database_validator import Neo4JDatabaseValidator
-from neo4j_queries import Queries
+from neo4j_queries import PROJECTED_FRAGMENTS, QUERY_TEMPLATES, Queries
+from relation_graph import relation_graph
+from segment_intervals import SegmentIntervals, segment_layers
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from neo4j import Driver
+
 load_dotenv()
 
 
 logger = logging.getLogger(__name__)
 
+# Process-wide drivers keyed by (uri, auth). A driver owns a Bolt connection pool and is
+# thread-safe, so it is created once per worker and shared by every Neo4JDatabase facade.
+_drivers: dict[tuple, Driver] = {}
+_driver_configs: dict[tuple, dict] = {}
+_drivers_lock = threading.Lock()
+
+
+def _driver_config() -> dict:
+    """Pool settings, overridable through environment variables."""
+    return {
+        "max_connection_pool_size": int(os.environ.get("NEO4J_MAX_POOL_SIZE", "100")),
+        "connection_acquisition_timeout": float(os.environ.get("NEO4J_ACQUISITION_TIMEOUT", "60")),
+        "fetch_size": int(os.environ.get("NEO4J_FETCH_SIZE", "1000")),
+    }
+
+
+def get_driver(neo4j_uri: str = None, neo4j_auth: tuple = None) -> Driver:
+    """
+    Return the shared driver for the given connection, creating it on first use.
+
+    Without explicit arguments the connection is read from the environment
+    (Firebase secrets or local .env).
+    """
+    if not (neo4j_uri and neo4j_auth):
+        neo4j_uri = os.environ.get("NEO4J_URI")
+        neo4j_auth = (os.environ.get("NEO4J_USERNAME", "neo4j"), os.environ.get("NEO4J_PASSWORD"))
+
+    key = (neo4j_uri, tuple(neo4j_auth))
+    driver = _drivers.get(key)
+    if driver is not None:
+        return driver
+
+    with _drivers_lock:
+        driver = _drivers.get(key)
+        if driver is None:
+            from neo4j import GraphDatabase  # pylint: disable=import-outside-toplevel
+
+            config = _driver_config()
+            logger.info("Creating Neo4j driver for %s as %s with %s", neo4j_uri, neo4j_auth[0], config)
+            driver = GraphDatabase.driver(neo4j_uri, auth=neo4j_auth, **config)
+            try:
+                driver.verify_connectivity()
+            except Exception:
+                driver.close()
+                raise
+            _drivers[key] = driver
+            _driver_configs[key] = config
+            logger.info("Connection to neo4j established.")
+    return driver
+
+
+def close_drivers() -> None:
+    """Close every shared driver. Intended for process shutdown and tests."""
+    with _drivers_lock:
+        for driver in _drivers.values():
+            driver.close()
+        _drivers.clear()
+        _driver_configs.clear()
+
+
+def get_pool_stats() -> list[dict]:
+    """
+    Report connection pool usage for every shared driver, without connection details.
+
+    The Python driver has no public pool metrics, so per-address counts are read from the
+    pool's internal bookkeeping. They are left empty when a driver version lays it out differently.
+    """
+    stats = []
+    for key, driver in list(_drivers.items()):
+        stats.append({**_driver_configs.get(key, {}), "addresses": _pool_addresses(driver)})
+    return stats
+
+
+def _pool_addresses(driver: Driver) -> dict:
+    try:
+        pool = driver._pool  # pylint: disable=protected-access
+        addresses = {}
+        with pool.lock:
+            for address, conns in pool.connections.items():
+                in_use = sum(1 for conn in conns if conn.in_use)
+                addresses[str(address)] = {"in_use": in_use, "idle": len(conns) - in_use}
+        return addresses
+    except Exception:  # pylint: disable=broad-exception-caught
+        return {}
+
+
+# The fulltext index tokenizes on whitespace, punctuation and the Tibetan tsheg/shad marks
+# (U+0F0B-U+0F14), so search terms are split the same way.
+_FULLTEXT_SEPARATORS = re.compile(r"[\s\u0f0b-\u0f14!-/:-@\[-`{-~]+")
+
+
+def fulltext_query(text: str) -> str | None:
+    """
+    Build a Lucene query for `localized_text_fulltext` requiring every term of `text` as a prefix.
+
+    Returns None if `text` has no searchable terms. Prefix terms are not analyzed, so they are
+    lowercased here like the index does.
+    """
+    terms = [term for term in _FULLTEXT_SEPARATORS.split(text.lower()) if term]
+    if not terms:
+        return None
+    return " AND ".join(f"{term}*" for term in terms)
+
 
 class Neo4JDatabase:
+    """Lightweight facade over the shared driver; cheap to construct per request."""
+
     def __init__(self, neo4j_uri: str = None, neo4j_auth: tuple = None) -> None:
-        if neo4j_uri and neo4j_auth:
-            # Allow manual override for testing
-            self.__driver = GraphDatabase.driver(neo4j_uri, auth=neo4j_auth)
-        else:
-            # Use environment variables (Firebase secrets or local .env)
-            logger.info(
-                f"Neo4j URI: {os.environ.get('NEO4J_URI')}"
-                f"Neo4j Username: {os.environ.get('NEO4J_USERNAME')}"
-                f"Neo4j Password: {os.environ.get('NEO4J_PASSWORD')}"
-            )
-            self.__driver = GraphDatabase.driver(
-                os.environ.get("NEO4J_URI"),
-                auth=(os.environ.get("NEO4J_USERNAME", "neo4j"), os.environ.get("NEO4J_PASSWORD")),
-            )
-        self.__driver.verify_connectivity()
+        self.__driver = get_driver(neo4j_uri, neo4j_auth)
         self.__validator = Neo4JDatabaseValidator()
-        logger.info("Connection to neo4j established.")
-
-    def __del__(self):
-        """Destructor to automatically close the driver when object is garbage collected"""
-        self.__close_driver()
 
     def get_session(self):
         return self.__driver.session()
 
-    def __close_driver(self):
-        """Private method to close the Neo4j driver"""
-        if self.__driver:
-            self.__driver.close()
-
     # ExpressionDatabase
-    def get_expression(self, expression_id: str) -> ExpressionModelOutput:
+    def get_expression(self, expression_id: str, fields: frozenset[str] | None = None) -> ExpressionModelOutput | dict:
+        """The expression, or only its `fields` (see fieldsets.EXPRESSION_FIELDS) as a dict when given."""
+        query = self._sparse_query("expressions", "fetch_by_id", fields)
         with self.get_session() as session:
-            result = session.run(Queries.expressions["fetch_by_id"], id=expression_id)
+            result = session.run(query, id=expression_id)
 
             if (record := result.single()) is None:
                 raise DataNotFound(f"Expression with ID '{expression_id}' not found")
 
-            return self._process_expression_data(record.data()["expression"])
+            return self._expression_output(record.data()["expression"], fields)
 
     # ExpressionDatabase
-    def get_expression_by_bdrc(self, bdrc_id: str) -> ExpressionModelOutput:
+    def get_expression_by_bdrc(
+        self, bdrc_id: str, fields: frozenset[str] | None = None
+    ) -> ExpressionModelOutput | dict:
+        """The expression, or only its `fields` (see fieldsets.EXPRESSION_FIELDS) as a dict when given."""
+        query = self._sparse_query("expressions", "fetch_by_bdrc", fields)
         with self.get_session() as session:
-            result = session.run(Queries.expressions["fetch_by_bdrc"], bdrc_id=bdrc_id)
+            result = session.run(query, bdrc_id=bdrc_id)
 
             if (record := result.single()) is None:
                 raise DataNotFound(f"Expression with BDRC ID '{bdrc_id}' not found")
 
-            return self._process_expression_data(record.data()["expression"])
+            return self._expression_output(record.data()["expression"], fields)
 
     def get_all_expression_relations(self) -> dict:
         with self.get_session() as session:
             result = session.run(Queries.expressions["fetch_all_relations"])
             return {r["id"]: r["relations"] for r in result}
 
+    def get_expression_relation_component(self, expression_id: str) -> tuple[str, dict[str, list[dict]]] | None:
+        """
+        Relation group id and the relations of every expression in the component of `expression_id`,
+        or None if the expression does not exist. Ungrouped components are keyed by their smallest id.
+        """
+        with self.get_session() as session:
+            records = list(session.run(Queries.expressions["fetch_relation_component"], id=expression_id))
+        if not records:
+            return None
+        relations = {record["id"]: record["relations"] for record in records}
+        return records[0]["relation_group"] or min(relations), relations
+
+    def backfill_relation_groups(self) -> int:
+        """Store relation_group on every ungrouped Expression component. Returns the number of rows processed."""
+        with self.get_session() as session:
+            # CALL { ... } IN TRANSACTIONS only runs in an auto-commit transaction
+            return session.run(Queries.expressions["backfill_relation_groups"]).single()["updated"]
+
+    def get_expression_relations_version(self) -> int:
+        """Version of the TRANSLATION_OF/COMMENTARY_OF graph, advanced by every write that changes it."""
+        with self.get_session() as session:
+            return session.run(Queries.expressions["relations_version"]).single()["version"]
+
     def get_expression_relations(self, expression_id: str) -> dict:
         with self.get_session() as session:
             record = session.run(Queries.expressions["fetch_relations_by_id"], id=expression_id).single()
@@ -103,61 +222,103 @@ class Neo4JDatabase:
                 raise DataNotFound(f"Expression with ID '{expression_id}' not found")
             return {"id": record["id"], "relations": record["relations"]}
 
-    def _process_manifestation_data(self, manifestation_data: dict) -> ManifestationModelOutput:
-        annotations = [
-            AnnotationModel(
-                id=annotation.get("id"),
-                type=AnnotationType(annotation.get("type")),
-                aligned_to=annotation.get("aligned_to"),
-            )
-            for annotation in manifestation_data.get("annotations", [])
-        ]
+    def backfill_expression_types(self) -> int:
+        """
+        Store the relationship-derived type on every Expression, then record that type-filtered
+        listings can rely on it. Returns the number of expressions updated.
+        """
+        with self.get_session() as session:
+            # CALL { ... } IN TRANSACTIONS only runs in an auto-commit transaction
+            updated = session.run(Queries.expressions["backfill_types"]).single()["updated"]
+            session.run(Queries.expressions["mark_types_backfilled"]).consume()
+            return updated
 
-        incipit_title = self.__convert_to_localized_text(manifestation_data.get("incipit_title"))
-        alt_incipit_titles = (
-            [self.__convert_to_localized_text(alt) for alt in manifestation_data.get("alt_incipit_titles", [])]
-            if manifestation_data.get("alt_incipit_titles")
-            else None
-        )
+    def backfill_annotation_types(self) -> int:
+        """Store the HAS_TYPE name on every Annotation without a type. Returns the number of annotations updated."""
+        with self.get_session() as session:
+            # CALL { ... } IN TRANSACTIONS only runs in an auto-commit transaction
+            return session.run(Queries.annotations["backfill_types"]).single()["updated"]
 
-        return ManifestationModelOutput(
-            id=manifestation_data["id"],
-            bdrc=manifestation_data.get("bdrc"),
-            wiki=manifestation_data.get("wiki"),
-            type=ManifestationType(manifestation_data["type"]),
-            annotations=annotations,
-            source=manifestation_data.get("source"),
-            colophon=manifestation_data.get("colophon"),
-            incipit_title=incipit_title,
-            alt_incipit_titles=alt_incipit_titles,
-            alignment_sources=manifestation_data.get("alignment_sources"),
-            alignment_targets=manifestation_data.get("alignment_targets"),
+    def backfill_segment_span_index(self) -> int:
+        """
+        Store annotation_id on the segments of every annotation without a max_span_length, then
+        set it. Returns the number of annotations updated.
+        """
+        with self.get_session() as session:
+            # CALL { ... } IN TRANSACTIONS only runs in an auto-commit transaction
+            return session.run(Queries.segments["backfill_span_index"]).single()["updated"]
+
+    @staticmethod
+    def _sparse_query(group: str, name: str, fields: frozenset[str] | None) -> str:
+        """Query `name` of `group` projecting only what the requested API `fields` of its fragment need."""
+        if fields is None:
+            return getattr(Queries, group)[name]
+        fragment, label = PROJECTED_FRAGMENTS[group]
+        allowed = {"expression": EXPRESSION_FIELDS, "manifestation": MANIFESTATION_FIELDS, "person": PERSON_FIELDS}
+        return Queries.with_fields(
+            QUERY_TEMPLATES[group][name], fragment, label, fragment_fields(fields, allowed[fragment])
         )
 
+    def _manifestation_values(self, manifestation_data: dict) -> dict:
+        """ManifestationModelOutput field values for the fragment keys present in `manifestation_data`"""
+        converters = {
+            "type": ManifestationType,
+            "annotations": lambda annotations: [
+                AnnotationModel(
+                    id=annotation.get("id"),
+                    type=AnnotationType(annotation.get("type")),
+                    aligned_to=annotation.get("aligned_to"),
+                )
+                for annotation in annotations or []
+            ],
+            "incipit_title": self.__convert_to_localized_text,
+            "alt_incipit_titles": lambda alts: (
+                [self.__convert_to_localized_text(alt) for alt in alts] if alts else None
+            ),
+        }
+        return {
+            key: converters[key](value) if key in converters else value for key, value in manifestation_data.items()
+        }
+
+    def _process_manifestation_data(self, manifestation_data: dict) -> ManifestationModelOutput:
+        return ManifestationModelOutput(**self._manifestation_values(manifestation_data))
+
+    def _manifestation_output(
+        self, manifestation_data: dict, fields: frozenset[str] | None
+    ) -> ManifestationModelOutput | dict:
+        if fields is None:
+            return self._process_manifestation_data(manifestation_data)
+        return select_fields(self._manifestation_values(manifestation_data), fields, MANIFESTATION_FIELDS)
+
+    def _expression_values(self, expression_data: dict) -> dict:
+        """ExpressionModelOutput field values for the fragment keys present in `expression_data`"""
+        converters = {
+            "type": TextType,
+            "contributors": self._build_contributions,
+            "title": self.__convert_to_localized_text,
+            "alt_titles": lambda alts: [self.__convert_to_localized_text(alt) for alt in alts or []],
+            "copyright": lambda status: CopyrightStatus(status or CopyrightStatus.PUBLIC_DOMAIN.value),
+            "license": lambda name: LicenseType(name or LicenseType.PUBLIC_DOMAIN_MARK.value),
+        }
+        values = {
+            "contributions" if key == "contributors" else key: converters[key](value) if key in converters else value
+            for key, value in expression_data.items()
+        }
+
+        # Convert None to "N/A" for standalone translations/commentaries
+        if values.get("type") in [TextType.TRANSLATION, TextType.COMMENTARY] and values.get("target", "") is None:
+            values["target"] = "N/A"
+
+        return values
+
     def _process_expression_data(self, expression_data: dict) -> ExpressionModelOutput:
         """Helper method to process expression data from query results"""
-        expression_type = TextType(expression_data.get("type"))
-        target = expression_data.get("target")
+        return ExpressionModelOutput(**self._expression_values(expression_data))
 
-        # Convert None to "N/A" for standalone translations/commentaries
-        if expression_type in [TextType.TRANSLATION, TextType.COMMENTARY] and target is None:
-            target = "N/A"
-
-        return ExpressionModelOutput(
-            id=expression_data.get("id"),
-            bdrc=expression_data.get("bdrc"),
-            wiki=expression_data.get("wiki"),
-            type=expression_type,
-            contributions=self._build_contributions(expression_data.get("contributors")),
-            date=expression_data.get("date"),
-            title=self.__convert_to_localized_text(expression_data.get("title")),
-            alt_titles=[self.__convert_to_localized_text(alt) for alt in expression_data.get("alt_titles", [])],
-            language=expression_data.get("language"),
-            target=target,
-            category_id=expression_data.get("category_id"),
-            copyright=CopyrightStatus(expression_data.get("copyright") or CopyrightStatus.PUBLIC_DOMAIN.value),
-            license=LicenseType(expression_data.get("license") or LicenseType.PUBLIC_DOMAIN_MARK.value),
-        )
+    def _expression_output(self, expression_data: dict, fields: frozenset[str] | None) -> ExpressionModelOutput | dict:
+        if fields is None:
+            return self._process_expression_data(expression_data)
+        return select_fields(self._expression_values(expression_data), fields, EXPRESSION_FIELDS)
 
     # ManifestationDatabase
     def get_manifestations_by_expression(self, expression_id: str) -> list[ManifestationModelOutput]:
@@ -209,11 +370,18 @@ class Neo4JDatabase:
         )
 
     # ManifestationDatabase
-    def get_manifestation(self, manifestation_id: str) -> tuple[ManifestationModelOutput, str]:
+    def get_manifestation(
+        self, manifestation_id: str, fields: frozenset[str] | None = None
+    ) -> tuple[ManifestationModelOutput | dict, str]:
+        """
+        The manifestation and its expression's id. With `fields` (see fieldsets.MANIFESTATION_FIELDS),
+        only those fields are fetched and returned as a dict.
+        """
+        query = self._sparse_query("manifestations", "fetch", fields)
         with self.get_session() as session:
             record = session.execute_read(
                 lambda tx: tx.run(
-                    Queries.manifestations["fetch"],
+                    query,
                     manifestation_id=manifestation_id,
                     expression_id=None,
                     manifestation_type=None,
@@ -222,7 +390,7 @@ class Neo4JDatabase:
             if record is None:
                 raise DataNotFound(f"Manifestation '{manifestation_id}' not found")
             d = record.data()
-            return self._process_manifestation_data(d["manifestation"]), d["expression_id"]
+            return self._manifestation_output(d["manifestation"], fields), d["expression_id"]
 
     def update_manifestation(
         self,
@@ -356,6 +524,51 @@ class Neo4JDatabase:
         result = self.get_expression_ids_by_manifestation_ids([manifestation_id])
         return result.get(manifestation_id)
 
+    # ManifestationDatabase
+    def set_base_text_generation(self, manifestation_id: str, generation: int) -> None:
+        """Record the storage generation of the manifestation's base text, keeping the one it replaces."""
+        with self.get_session() as session:
+            record = session.execute_write(
+                lambda tx: tx.run(
+                    Queries.manifestations["set_base_text_generation"],
+                    manifestation_id=manifestation_id,
+                    generation=generation,
+                ).single()
+            )
+            if record is None:
+                raise DataNotFound(f"Manifestation '{manifestation_id}' not found")
+
+    # ManifestationDatabase
+    def reset_base_text_generation(self, manifestation_id: str, generation: int) -> None:
+        """Record the storage generation of a rewritten base text that has no earlier version to restore."""
+        with self.get_session() as session:
+            record = session.execute_write(
+                lambda tx: tx.run(
+                    Queries.manifestations["reset_base_text_generation"],
+                    manifestation_id=manifestation_id,
+                    generation=generation,
+                ).single()
+            )
+            if record is None:
+                raise DataNotFound(f"Manifestation '{manifestation_id}' not found")
+
+    # ManifestationDatabase
+    def get_base_text_generations(self, manifestation_id: str) -> tuple[int | None, int | None]:
+        """
+        Return the (current, previous) storage generations recorded for the manifestation's base text.
+
+        Both are None for manifestations stored before generations were tracked.
+        """
+        with self.get_session() as session:
+            record = session.execute_read(
+                lambda tx: tx.run(
+                    Queries.manifestations["get_base_text_generations"], manifestation_id=manifestation_id
+                ).single()
+            )
+            if record is None:
+                raise DataNotFound(f"Manifestation '{manifestation_id}' not found")
+            return record["generation"], record["previous_generation"]
+
     # ManifestationDatabase
     def get_manifestation_by_annotation(self, annotation_id: str) -> tuple[ManifestationModelOutput, str] | None:
         with self.get_session() as session:
@@ -431,6 +644,7 @@ class Neo4JDatabase:
             if not record:
                 raise DataNotFound("Failed to update segmentation spans")
 
+            segment_layers.invalidate(*record["annotation_ids"])
             return int(record["updated_count"])
 
     # ExpressionDatabase
@@ -479,12 +693,15 @@ class Neo4JDatabase:
             )
             return {record["expression_id"]: record["work_id"] for record in result}
 
-    def get_manifestations_metadata_by_ids(self, manifestation_ids: list[str]) -> dict[str, dict]:
+    def get_manifestations_metadata_by_ids(
+        self, manifestation_ids: list[str], fields: frozenset[str] | None = None
+    ) -> dict[str, dict]:
         """
         Get metadata for a list of manifestation IDs.
 
         Args:
             manifestation_ids: List of manifestation IDs
+            fields: Manifestation fragment fields to fetch (all when None)
 
         Returns:
             Dictionary mapping manifestation_id to metadata dictionary
@@ -492,11 +709,12 @@ class Neo4JDatabase:
         if not manifestation_ids:
             return {}
 
+        query = self._sparse_query("manifestations", "get_manifestations_metadata_by_ids", fields)
         with self.get_session() as session:
             result = session.execute_read(
                 lambda tx: list(
                     tx.run(
-                        Queries.manifestations["get_manifestations_metadata_by_ids"],
+                        query,
                         manifestation_ids=manifestation_ids,
                     )
                 )
@@ -574,20 +792,21 @@ class Neo4JDatabase:
             for record in result:
                 data = record.data()["related_instance"]
 
-                # Process manifestation and expression using existing helper methods
-                manifestation = self._process_manifestation_data(data["manifestation"])
-                expression = self._process_expression_data(data["expression"])
+                # The queries only project the fields used below
+                manifestation = data["manifestation"]
+                expression_values = self._expression_values(data["expression"])
+                expression = select_fields(expression_values, frozenset(expression_values), EXPRESSION_FIELDS)
                 alignment_annotation_id = data["alignment_annotation_id"]
 
                 # Determine relationship type from expression type
                 # Related instances must be one of: ROOT, TRANSLATION, or COMMENTARY
-                if expression.type == TextType.TRANSLATION:
+                if expression["type"] == TextType.TRANSLATION:
                     relationship_type = "translation"
-                elif expression.type == TextType.COMMENTARY:
+                elif expression["type"] == TextType.COMMENTARY:
                     relationship_type = "commentary"
-                elif expression.type == TextType.TRANSLATION_SOURCE:
+                elif expression["type"] == TextType.TRANSLATION_SOURCE:
                     relationship_type = "translation_source"
-                elif expression.type == TextType.ROOT:  # TextType.ROOT
+                elif expression["type"] == TextType.ROOT:  # TextType.ROOT
                     relationship_type = "root"
                 else:
                     relationship_type = "none"
@@ -599,22 +818,21 @@ class Neo4JDatabase:
                 # Build the response object with essential metadata only
                 # Format contributions to only include person_id (not person_bdrc_id)
                 formatted_contributions = []
-                if expression.contributions:
-                    for contrib in expression.contributions:
-                        contrib_dict = contrib.model_dump()
+                if expression["contributions"]:
+                    for contrib_dict in expression["contributions"]:
                         # Remove person_bdrc_id if it exists
                         contrib_dict.pop("person_bdrc_id", None)
                         formatted_contributions.append(contrib_dict)
 
                 instance = {
-                    "instance_id": manifestation.id,
+                    "instance_id": manifestation["id"],
                     "metadata": {
-                        "instance_type": manifestation.type.value,
-                        "source": manifestation.source,
-                        "text_id": expression.id,
-                        "title": expression.title.root if expression.title else None,
-                        "alt_titles": [alt.root for alt in expression.alt_titles] if expression.alt_titles else [],
-                        "language": expression.language,
+                        "instance_type": manifestation["type"],
+                        "source": manifestation["source"],
+                        "text_id": expression["id"],
+                        "title": expression["title"],
+                        "alt_titles": expression["alt_titles"] or [],
+                        "language": expression["language"],
                         "contributions": formatted_contributions,
                     },
                     "annotation": alignment_annotation_id,
@@ -626,25 +844,19 @@ class Neo4JDatabase:
             return related_instances
 
     def find_segments_by_span(self, manifestation_id: str, span: SpanModel) -> list[SegmentModel]:
-        with self.get_session() as session:
-            result = session.execute_read(
-                lambda tx: list(
-                    tx.run(
-                        Queries.segments["find_by_span"],
-                        manifestation_id=manifestation_id,
-                        span_start=span.start,
-                        span_end=span.end,
-                    )
-                )
+        def transaction_function(tx):
+            versions = tx.run(
+                Queries.segments["get_segment_layer_versions"], manifestation_id=manifestation_id, types=None
+            ).data()
+            return self._overlapping_layer_segments(
+                self._get_segment_layers(tx, versions), span.start, span.end, inclusive=True
             )
 
-            return [
-                SegmentModel(
-                    id=record["segment_id"],
-                    span=SpanModel(start=record["span_start"], end=record["span_end"]),
-                )
-                for record in result
-            ]
+        with self.get_session() as session:
+            segments = session.execute_read(transaction_function)
+        return [
+            SegmentModel(id=segment_id, span=SpanModel(start=start, end=end)) for segment_id, start, end in segments
+        ]
 
     def find_aligned_segments(self, segment_id: str) -> dict[str, dict[str, list[SegmentModel]]]:
         """
@@ -714,7 +926,6 @@ class Neo4JDatabase:
         """
         Get related manifestations via alignment layer.
         """
-        query_name = "find_related_with_transfer" if transform else "find_related_alignment_only"
         layer_description = "with transfer to segmentation layer" if transform else "via alignment layer"
         segment_type = "segmentation" if transform else "alignment"
 
@@ -727,22 +938,24 @@ class Neo4JDatabase:
         )
 
         with self.get_session() as session:
-            result = session.execute_read(
-                lambda tx: list(
-                    tx.run(
-                        Queries.segments[query_name],
+            if transform:
+                result = session.execute_read(
+                    lambda tx: self._find_related_with_transfer(tx, manifestation_id, span_start, span_end)
+                )
+            else:
+                result = session.execute_read(
+                    lambda tx: tx.run(
+                        Queries.segments["find_related_alignment_only"],
                         manifestation_id=manifestation_id,
                         span_start=span_start,
                         span_end=span_end,
-                    )
+                    ).data()
                 )
-            )
 
             logger.info("Query returned %d related manifestation(s)", len(result))
 
             related = []
-            for record in result:
-                data = record.data()
+            for data in result:
                 # Get full manifestation and expression details
                 manifestation_model, _ = self.get_manifestation(data["manifestation_id"])
                 expression_model = self.get_expression(data["expression_id"])
@@ -774,28 +987,88 @@ class Neo4JDatabase:
             logger.info("Successfully built %d related manifestation response(s)", len(related))
             return related
 
-    def get_all_persons(self, offset: int = 0, limit: int = 20) -> list[PersonModelOutput]:
+    def _find_related_with_transfer(self, tx, manifestation_id: str, span_start: int, span_end: int) -> list[dict]:
+        """
+        Related manifestations with the segments of their segmentation layers that overlap the
+        aligned segments. The span is first widened to the source segmentation segments it
+        overlaps; both segmentation lookups go through the cached segment layers.
+        """
+        source_versions = tx.run(
+            Queries.segments["get_segment_layer_versions"], manifestation_id=manifestation_id, types=["segmentation"]
+        ).data()
+        source_segments = self._overlapping_layer_segments(
+            self._get_segment_layers(tx, source_versions), span_start, span_end
+        )
+        if not source_segments:
+            return []
+        records = tx.run(
+            Queries.segments["find_related_alignment_spans"],
+            manifestation_id=manifestation_id,
+            span_start=min(start for _, start, _ in source_segments),
+            span_end=max(end for _, _, end in source_segments),
+        ).data()
+        layers = self._get_segment_layers(tx, [version for record in records for version in record["annotations"]])
+        related = []
+        for record in records:
+            record_layers = {
+                version["annotation_id"]: layers[version["annotation_id"]] for version in record["annotations"]
+            }
+            segments = {}
+            for start, end in record["spans"]:
+                for segment in self._overlapping_layer_segments(record_layers, start, end):
+                    segments.setdefault(segment[0], segment)
+            if segments:
+                related.append(
+                    {
+                        "manifestation_id": record["manifestation_id"],
+                        "expression_id": record["expression_id"],
+                        "segments": [
+                            {"id": segment_id, "span_start": start, "span_end": end}
+                            for segment_id, start, end in sorted(segments.values(), key=lambda segment: segment[1])
+                        ],
+                    }
+                )
+        return related
+
+    def get_all_persons(
+        self, offset: int = 0, limit: int = 20, after: str | None = None, fields: frozenset[str] | None = None
+    ) -> list[PersonModelOutput | dict]:
+        """
+        List persons by offset, or in id order after the id `after` when given (keyset pagination).
+        With `fields` (see fieldsets.PERSON_FIELDS), only those fields are fetched and returned as dicts.
+        """
         params = {
             "offset": offset,
             "limit": limit,
+            "after": after,
         }
+        query = self._sparse_query("persons", "fetch_all" if after is None else "fetch_all_after", fields)
 
         with self.get_session() as session:
-            result = session.run(Queries.persons["fetch_all"], params)
+            result = session.run(query, params)
+            if fields is not None:
+                return [
+                    select_fields(self._person_values(record.data()["person"]), fields, PERSON_FIELDS)
+                    for record in result
+                ]
             return [
                 person_model
                 for record in result
                 if (person_model := self._create_person_model(record.data()["person"])) is not None
             ]
 
-    def get_person(self, person_id: str) -> PersonModelOutput:
+    def get_person(self, person_id: str, fields: frozenset[str] | None = None) -> PersonModelOutput | dict:
+        """The person, or only its `fields` (see fieldsets.PERSON_FIELDS) as a dict when given."""
+        query = self._sparse_query("persons", "fetch_by_id", fields)
         with self.get_session() as session:
-            result = session.run(Queries.persons["fetch_by_id"], id=person_id)
+            result = session.run(query, id=person_id)
             record = result.single()
             if not record:
                 raise DataNotFound(f"Person with ID '{person_id}' not found")
 
             person_data = record.data()["person"]
+            if fields is not None:
+                return select_fields(self._person_values(person_data), fields, PERSON_FIELDS)
             person_model = self._create_person_model(person_data)
             if person_model is None:
                 raise DataNotFound(f"Person with ID '{person_id}' has invalid data and cannot be retrieved")
@@ -823,7 +1096,11 @@ class Neo4JDatabase:
 
     def create_expression(self, expression: ExpressionModelInput) -> str:
         with self.get_session() as session:
-            return session.execute_write(lambda tx: self._execute_create_expression(tx, expression))
+            expression_id, relations_version = session.execute_write(
+                lambda tx: self._execute_create_expression(tx, expression)
+            )
+        relation_graph.add_expression(expression_id, expression, relations_version)
+        return expression_id
 
     def create_manifestation(
         self,
@@ -835,12 +1112,14 @@ class Neo4JDatabase:
         expression: ExpressionModelInput = None,
         bibliography_annotation: AnnotationModel = None,
         bibliography_segments: list[dict] = None,
+        base_text_generation: int = None,
     ) -> str:
         def transaction_function(tx):
+            relations_version = None
             if expression:
-                self._execute_create_expression(tx, expression, expression_id)
+                _, relations_version = self._execute_create_expression(tx, expression, expression_id)
 
-            self._execute_create_manifestation(tx, manifestation, expression_id, manifestation_id)
+            self._execute_create_manifestation(tx, manifestation, expression_id, manifestation_id, base_text_generation)
 
             if annotation:
                 self._execute_add_annotation(tx, manifestation_id, annotation)
@@ -856,10 +1135,13 @@ class Neo4JDatabase:
                 if bibliography_segments:
                     self._link_segment_and_bibliography_type(tx, bibliography_segments)
             
-            return manifestation_id
+            return relations_version
         
         with self.get_session() as session:
-            return session.execute_write(transaction_function)
+            relations_version = session.execute_write(transaction_function)
+        if expression:
+            relation_graph.add_expression(expression_id, expression, relations_version)
+        return manifestation_id
 
     def add_annotation_to_manifestation(
         self, manifestation_id: str, annotation: AnnotationModel, annotation_segments: list[dict]
@@ -924,10 +1206,11 @@ class Neo4JDatabase:
         alignments: list[dict],
         bibliography_annotation: AnnotationModel = None,
         bibliography_segments: list[dict] = None,
+        base_text_generation: int = None,
     ) -> str:
         def transaction_function(tx):
-            _ = self._execute_create_expression(tx, expression, expression_id)
-            self._execute_create_manifestation(tx, manifestation, expression_id, manifestation_id)
+            _, relations_version = self._execute_create_expression(tx, expression, expression_id)
+            self._execute_create_manifestation(tx, manifestation, expression_id, manifestation_id, base_text_generation)
 
             _ = self._execute_add_annotation(tx, manifestation_id, segmentation)
             self._create_segments(tx, segmentation.id, segmentation_segments)
@@ -950,8 +1233,11 @@ class Neo4JDatabase:
                 if bibliography_segments:
                     self._link_segment_and_bibliography_type(tx, bibliography_segments)
 
+            return relations_version
+
         with self.get_session() as session:
-            return session.execute_write(transaction_function)
+            relations_version = session.execute_write(transaction_function)
+        relation_graph.add_expression(expression_id, expression, relations_version)
 
     # NomenDatabase
     def _create_nomens(self, tx, primary_text: dict[str, str], alternative_texts: list[dict[str, str]] = None) -> str:
@@ -994,23 +1280,36 @@ class Neo4JDatabase:
         offset: int = 0,
         limit: int = 20,
         filters: dict[str, str] | None = None,
-    ) -> list[ExpressionModelOutput]:
+        after: str | None = None,
+        fields: frozenset[str] | None = None,
+    ) -> list[ExpressionModelOutput | dict]:
+        """
+        List expressions by offset, or in id order after the id `after` when given (keyset pagination).
+        With `fields` (see fieldsets.EXPRESSION_FIELDS), only those fields are fetched and returned as dicts.
+        """
         if filters is None:
             filters = {}
 
         params = {
             "offset": offset,
             "limit": limit,
+            "after": after,
             "type": filters.get("type"),
             "language": filters.get("language"),
             "author": filters.get("author"),
             "title": filters.get("title"),
         }
+        # Searches are driven by the fulltext index; one without searchable terms matches nothing
+        for field in ("title", "author"):
+            params[f"{field}_query"] = fulltext_query(params[field]) if params[field] is not None else None
 
         with self.get_session() as session:
             # Validate language filter against Neo4j if provided
             if params.get("language"):
                 self.__validator.validate_language_code_exists(session, params["language"])
+
+            if any(params[field] is not None and params[f"{field}_query"] is None for field in ("title", "author")):
+                return []
             
             # Choose appropriate query based on filters
             has_title = params.get("title") is not None
@@ -1018,21 +1317,28 @@ class Neo4JDatabase:
             
             if has_title and has_author:
                 # Both provided: fuzzy search on BOTH with AND logic (must match both)
-                query = Queries.expressions["fetch_all_fuzzy_both"]
+                query_name = "fetch_all_fuzzy_both"
                 logger.info("Using fuzzy search for BOTH title AND author with params: %s", params)
             elif has_title:
                 # Only title: fuzzy search on title only
-                query = Queries.expressions["fetch_all_fuzzy_title"]
+                query_name = "fetch_all_fuzzy_title"
                 logger.info("Using fuzzy title search with params: %s", params)
             elif has_author:
                 # Only author: fuzzy search on author only
-                query = Queries.expressions["fetch_all_fuzzy_author"]
+                query_name = "fetch_all_fuzzy_author"
                 logger.info("Using fuzzy author search with params: %s", params)
             else:
                 # No fuzzy search needed
-                query = Queries.expressions["fetch_all"]
+                query_name = "fetch_all"
                 logger.info("Using standard search with params: %s", params)
 
+            # Without a search, a type filter starts from the expression_type index
+            if params["type"] is not None and query_name == "fetch_all":
+                query_name = "fetch_all_by_type"
+            if after is not None:
+                query_name = f"{query_name}_after"
+            query = self._sparse_query("expressions", query_name, fields)
+
             result = session.run(query, params)
             logger.info("All Expressions Result: %s", result)
             expressions = []
@@ -1041,12 +1347,12 @@ class Neo4JDatabase:
                 expression_data = record.data()["expression"]
 
                 # Validate expression type
-                if expression_data["type"] is None:
+                if "type" in expression_data and expression_data["type"] is None:
                     raise ValueError(f"Expression type invalid for expression {expression_data['id']}")
 
                 # Use helper method to process expression data
                 logger.info("Processing expression data: %s", expression_data)
-                expression = self._process_expression_data(expression_data)
+                expression = self._expression_output(expression_data, fields)
                 logger.info("Processed expression: %s", expression)
                 expressions.append(expression)
 
@@ -1058,18 +1364,19 @@ class Neo4JDatabase:
         result = {entry["language"]: entry["text"] for entry in entries if "language" in entry and "text" in entry}
         return result or None
 
-    def _create_person_model(self, person_data, person_id=None) -> PersonModelOutput | None:
-        person = PersonModelOutput(
-            id=person_id or person_data.get("id"),
-            bdrc=person_data.get("bdrc"),
-            wiki=person_data.get("wiki"),
-            name=LocalizedString(self.__convert_to_localized_text(person_data["name"])),
-            alt_names=(
-                [LocalizedString(self.__convert_to_localized_text(alt)) for alt in person_data["alt_names"]]
-                if person_data.get("alt_names")
-                else None
+    def _person_values(self, person_data: dict) -> dict:
+        """PersonModelOutput field values for the fragment keys present in `person_data`"""
+        converters = {
+            "name": lambda name: LocalizedString(self.__convert_to_localized_text(name)),
+            "alt_names": lambda alts: (
+                [LocalizedString(self.__convert_to_localized_text(alt)) for alt in alts] if alts else None
             ),
-        )
+        }
+        return {key: converters[key](value) if key in converters else value for key, value in person_data.items()}
+
+    def _create_person_model(self, person_data, person_id=None) -> PersonModelOutput | None:
+        values = self._person_values(person_data)
+        person = PersonModelOutput(**{**values, "id": person_id or values.get("id")})
 
         return person
 
@@ -1112,21 +1419,25 @@ class Neo4JDatabase:
         limit: int = 20,
         language: str | None = None,
         instance_type: str | None = None,
+        after: str | None = None,
     ) -> list[dict]:
+        """List a category's texts by offset, or in id order after the id `after` when given (keyset pagination)."""
         params = {
             "category_id": category_id,
             "offset": offset,
             "limit": limit,
+            "after": after,
             "language": language,
             "instance_type": instance_type,
         }
+        query = Queries.expressions["fetch_by_category" if after is None else "fetch_by_category_after"]
 
         with self.get_session() as session:
             # Validate language filter against Neo4j if provided
             if language:
                 self.__validator.validate_language_code_exists(session, language)
 
-            result = session.run(Queries.expressions["fetch_by_category"], params)
+            result = session.run(query, params)
             out: list[dict] = []
 
             for record in result:
@@ -1162,7 +1473,13 @@ class Neo4JDatabase:
 
             return out
 
-    def _execute_create_expression(self, tx, expression: ExpressionModelInput, expression_id: str | None = None) -> str:
+    def _execute_create_expression(
+        self, tx, expression: ExpressionModelInput, expression_id: str | None = None
+    ) -> tuple[str, int | None]:
+        """
+        Create the expression and return its id with the relation graph version its relationship
+        advanced to (None for standalone expressions, which change no relations).
+        """
         # TODO: move the validation based on language to the database validator
         expression_id = expression_id or generate_id()
         target_id = expression.target if expression.target != "N/A" else None
@@ -1196,6 +1513,7 @@ class Neo4JDatabase:
             "license": expression.license.value,
         }
 
+        relations_version = None
         match expression.type:
             case TextType.ROOT:
                 tx.run(Queries.expressions["create_standalone"], work_id=work_id, original=True, **common_params)
@@ -1203,11 +1521,13 @@ class Neo4JDatabase:
                 if expression.target == "N/A":
                     tx.run(Queries.expressions["create_standalone"], work_id=work_id, original=False, **common_params)
                 else:
-                    tx.run(Queries.expressions["create_translation"], **common_params)
+                    record = tx.run(Queries.expressions["create_translation"], **common_params).single()
+                    relations_version = record["relations_version"] if record else None
             case TextType.COMMENTARY:
                 if expression.target == "N/A":
                     raise NotImplementedError("Standalone COMMENTARY texts (target='N/A') are not yet supported")
-                tx.run(Queries.expressions["create_commentary"], work_id=work_id, **common_params)
+                record = tx.run(Queries.expressions["create_commentary"], work_id=work_id, **common_params).single()
+                relations_version = record["relations_version"] if record else None
 
         # Link work to category if category_id is provided
         if expression.category_id:
@@ -1254,10 +1574,15 @@ class Neo4JDatabase:
                 else:
                     raise ValueError(f"Unknown contribution type: {type(contribution)}")
 
-        return expression_id
+        return expression_id, relations_version
 
     def _execute_create_manifestation(
-        self, tx, manifestation: ManifestationModelInput, expression_id: str, manifestation_id: str
+        self,
+        tx,
+        manifestation: ManifestationModelInput,
+        expression_id: str,
+        manifestation_id: str,
+        base_text_generation: int = None,
     ) -> str:
         self.__validator.validate_expression_exists(tx, expression_id)
 
@@ -1278,6 +1603,7 @@ class Neo4JDatabase:
             source=manifestation.source,
             colophon=manifestation.colophon,
             incipit_element_id=incipit_element_id,
+            base_text_generation=base_text_generation,
         )
 
         if not result.single():
@@ -1386,92 +1712,26 @@ class Neo4JDatabase:
     def get_annotation(self, annotation_id: str) -> dict:
         """Get all segments for an annotation. Returns uniform structure with all possible keys."""
         with self.get_session() as session:
-            # Get annotation type
-            annotation_result = session.run(Queries.annotations["get_annotation_type"], annotation_id=annotation_id)
-            annotation_record = annotation_result.single()
-
-            if not annotation_record:
-                raise DataNotFound(f"Annotation with ID '{annotation_id}' not found")
-
-            annotation_type = annotation_record["annotation_type"]
-
-            # Initialize uniform response structure
-            response = {"id": annotation_id, "type": annotation_type, "data": None}
-
-            # Get aligned annotation ID if it exists
-            aligned_to_id = None
-            if annotation_type == "alignment":
-                aligned_result = session.run(
-                    Queries.annotations["get_aligned_annotation"],
-                    annotation_id=annotation_id,
-                )
-                aligned_record = aligned_result.single()
-                if aligned_record:
-                    aligned_to_id = aligned_record["aligned_to_id"]
-
-            if annotation_type == "alignment" and aligned_to_id:
-                # For alignment annotations, return both source and target segments
-                source_segments = self._get_annotation_segments(annotation_id)
-                target_segments = self._get_annotation_segments(aligned_to_id)
-
-                response["data"] = {"alignment_annotation": source_segments, "target_annotation": target_segments}
-            elif annotation_type == "table_of_contents":
-                # For table of contents annotations, return sections
-                sections = self._get_annotation_sections(annotation_id)
-                response["data"] = sections
-
-            elif annotation_type == "durchen":
-                durchen_notes = self._get_durchen_annotation(annotation_id)
-                response["data"] = durchen_notes
-
-            else:
-                # For segmentation and pagination annotations, return segments
-                segments_result = self._get_annotation_segments(annotation_id)
-                response["data"] = segments_result
-
-            return response
-
-    def _get_durchen_annotation(self, annotation_id: str) -> list[dict]:
-        """Helper method to get durchen annotation for a specific annotation."""
-        with self.get_session() as session:
-            result = session.run(Queries.annotations["get_durchen_annotation"], annotation_id=annotation_id)
-            durchen_annotation = []
-            for record in result:
-                durchen_annotation.append(
-                    {
-                        "id": record["id"],
-                        "span": {"start": record["span_start"], "end": record["span_end"]},
-                        "note": record["note"],
-                    }
-                )
-            return durchen_annotation
-
-    def _get_annotation_sections(self, annotation_id: str) -> list[dict]:
-        """Helper method to get sections for a specific annotation."""
-        with self.get_session() as session:
-            result = session.run(Queries.annotations["get_sections"], annotation_id=annotation_id)
-            sections = []
-            for record in result:
-                section = {"id": record["id"], "title": record["title"], "segments": record["segments"]}
-                sections.append(section)
-        return sections
-
-    def _get_annotation_segments(self, annotation_id: str) -> list[dict]:
-        """Helper method to get segments for a specific annotation."""
-        with self.get_session() as session:
-            result = session.run(Queries.annotations["get_segments"], annotation_id=annotation_id)
-            segments = []
-            for record in result:
-                segment = {"id": record["id"], "span": {"start": record["start"], "end": record["end"]}}
-                if record["reference"]:
-                    segment["reference"] = record["reference"]
-                if record["bibliography_type"]:
-                    segment["type"] = record["bibliography_type"]
-                if record["aligned_segments"]:
-                    segment["aligned_segments"] = record["aligned_segments"]
-                segments.append(segment)
-
-        return segments
+            record = session.execute_read(
+                lambda tx: tx.run(Queries.annotations["fetch_by_id"], annotation_id=annotation_id).single()
+            )
+        if record is None:
+            raise DataNotFound(f"Annotation with ID '{annotation_id}' not found")
+
+        data = record["data"]
+        if record["type"] == "alignment" and isinstance(data, dict):
+            # Aligned source annotations return both their own and the target annotation's segments
+            data = {key: self._annotation_segments(segments) for key, segments in data.items()}
+        elif record["type"] not in ("table_of_contents", "durchen"):
+            data = self._annotation_segments(data)
+        return {"id": annotation_id, "type": record["type"], "data": data}
+
+    @staticmethod
+    def _annotation_segments(segments: list[dict]) -> list[dict]:
+        """Segments from Queries.annotation_segments, without the optional keys they have no value for."""
+        return [
+            {key: value for key, value in segment.items() if value or key in ("id", "span")} for segment in segments
+        ]
 
     def get_annotation_segments(self, annotation_id: str) -> list[dict]:
         """
@@ -1586,6 +1846,7 @@ class Neo4JDatabase:
 
         with self.get_session() as session:
             session.execute_write(transaction_function)
+        segment_layers.invalidate(source_annotation_id, target_annotation_id)
 
     def create_category(self, application: str, title: dict[str, str], parent_id: str | None = None) -> str:
         """Create a category with localized title and optional parent relationship."""
@@ -1635,6 +1896,7 @@ class Neo4JDatabase:
         with self.get_session() as session:
             session.run(Queries.segments["delete_all_segments_by_annotation_id"], annotation_id=annotation_id)
             session.run(Queries.annotations["delete"], annotation_id=annotation_id)
+        segment_layers.invalidate(annotation_id)
 
     def delete_table_of_content_annotation(self, annotation_id: str) -> None:
         with self.get_session() as session:
@@ -1682,32 +1944,48 @@ class Neo4JDatabase:
                 case _:
                     return []
 
-    def _get_alignment_pairs_by_manifestation(self, manifestation_id: str) -> list[dict]:
-        with self.get_session() as session:
-            result = session.execute_read(
-                lambda tx: tx.run(
-                    Queries.annotations["get_alignment_pairs_by_manifestation"], manifestation_id=manifestation_id
-                ).data()
-            )
-            return result
+    @staticmethod
+    def _get_segment_layers(tx, versions: list[dict]) -> dict[str, SegmentIntervals]:
+        """
+        Segment layers of the annotations in `versions` ({"annotation_id", "segments_version"}),
+        from the worker's segment layer cache, loading the ones it misses with one query.
+        """
+        layers, missing = {}, []
+        for version in versions:
+            if (intervals := segment_layers.get((version["annotation_id"], version["segments_version"]))) is None:
+                missing.append(version["annotation_id"])
+            else:
+                layers[version["annotation_id"]] = intervals
+        if missing:
+            for record in tx.run(Queries.segments["get_segment_layers"], annotation_ids=missing).data():
+                intervals = SegmentIntervals((start, end, segment_id) for segment_id, start, end in record["segments"])
+                segment_layers.put((record["annotation_id"], record["segments_version"]), intervals)
+                layers[record["annotation_id"]] = intervals
+        return layers
+
+    @staticmethod
+    def _overlapping_layer_segments(
+        layers: dict[str, SegmentIntervals], start: int, end: int, inclusive: bool = False
+    ) -> list[tuple[str, int, int]]:
+        """(id, start, end) of the segments of `layers` that overlap the span, in start order."""
+        segments = [segment for layer in layers.values() for segment in layer.overlapping_spans(start, end, inclusive)]
+        return sorted(segments, key=lambda segment: segment[1]) if len(layers) > 1 else segments
 
     def _get_overlapping_segments(self, manifestation_id: str, start: int, end: int) -> list[dict]:
+        def transaction_function(tx):
+            versions = tx.run(
+                Queries.segments["get_segment_layer_versions"],
+                manifestation_id=manifestation_id,
+                types=["segmentation"],
+            ).data()
+            return self._overlapping_layer_segments(self._get_segment_layers(tx, versions), start, end)
+
         with self.get_session() as session:
-            result = session.execute_read(
-                lambda tx: tx.run(
-                    Queries.segments["get_overlapping_segments"],
-                    manifestation_id=manifestation_id,
-                    span_start=start,
-                    span_end=end,
-                ).data()
-            )
-            return [
-                {
-                    "segment_id": record["segment_id"],
-                    "span": {"start": record["span_start"], "end": record["span_end"]},
-                }
-                for record in result
-            ]
+            segments = session.execute_read(transaction_function)
+        return [
+            {"segment_id": segment_id, "span": {"start": span_start, "end": span_end}}
+            for segment_id, span_start, span_end in segments
+        ]
 
     def _get_overlapping_segments_batch(self, segment_ids: list[str]) -> dict[str, list[dict]]:
         """
@@ -1717,77 +1995,186 @@ class Neo4JDatabase:
         if not segment_ids:
             return {}
 
+        def transaction_function(tx):
+            records = tx.run(Queries.segments["get_segment_layer_versions_by_segments"], segment_ids=segment_ids).data()
+            layers = self._get_segment_layers(tx, [version for record in records for version in record["annotations"]])
+            overlapping = {}
+            for record in records:
+                record_layers = {
+                    version["annotation_id"]: layers[version["annotation_id"]] for version in record["annotations"]
+                }
+                segments = self._overlapping_layer_segments(record_layers, record["span_start"], record["span_end"])
+                if segments:
+                    overlapping[record["segment_id"]] = [segment_id for segment_id, _, _ in segments]
+            return overlapping
+
         with self.get_session() as session:
-            result = session.execute_read(
-                lambda tx: tx.run(Queries.segments["get_overlapping_segments_batch"], segment_ids=segment_ids).data()
-            )
-            # Convert to dict format
-            return {record["input_segment_id"]: record["overlapping_segments"] for record in result}
+            return session.execute_read(transaction_function)
 
-    def _get_aligned_segments(self, alignment_1_id: str, start: int, end: int) -> list[dict]:
+    def _get_related_segments(self, manifestation_id: str, start: int, end: int, transform: bool = False) -> list[dict]:
+        """
+        Breadth-first walk over the alignments reachable from a span of a manifestation.
+
+        The walk is level-synchronous: a whole frontier is expanded with one query, and with
+        `transform`, the segmentation segments of the manifestations it reached with one more.
+        """
         with self.get_session() as session:
-            result = session.execute_read(
+
+            def expand(frontier: list[dict]) -> list[dict]:
+                return session.execute_read(
+                    lambda tx: tx.run(Queries.segments["get_aligned_segments_by_frontier"], frontier=frontier).data()
+                )
+
+            def overlapping(spans: list[dict]) -> list[list[dict]]:
+                records = session.execute_read(
+                    lambda tx: tx.run(Queries.segments["get_overlapping_segments_by_spans"], spans=spans).data()
+                )
+                segments = {record["idx"]: record["segments"] for record in records}
+                return [segments.get(idx, []) for idx in range(len(spans))]
+
+            return self._walk_related_segments(manifestation_id, start, end, expand, overlapping if transform else None)
+
+    def get_segments_relations(self, manifestation_id: str, segments: list[dict]) -> list[dict]:
+        """
+        `_get_related_segments(..., transform=True)` of each of `segments`, walked in memory.
+
+        The alignment layers of every manifestation reachable from `manifestation_id` are loaded
+        with one query per hop, and their segmentation layers with one more. Each segment's walk
+        then looks spans up in the sorted layers by binary search instead of querying Neo4j.
+        """
+        if not segments:
+            return []
+        alignment_pairs: dict[str, list[tuple[str, str, str]]] = {}
+        alignment_links: dict[str, SegmentIntervals] = {}
+        reached, frontier = {manifestation_id}, [manifestation_id]
+        with self.get_session() as session:
+            while frontier:
+                records = session.execute_read(
+                    lambda tx, ids=frontier: tx.run(
+                        Queries.segments["get_alignment_layers"], manifestation_ids=ids
+                    ).data()
+                )
+                frontier = []
+                for record in records:
+                    alignment_1_id = record["alignment_1_id"]
+                    alignment_links[alignment_1_id] = SegmentIntervals(
+                        (s1_start, s1_end, (s2_id, s2_start, s2_end))
+                        for s1_start, s1_end, s2_id, s2_start, s2_end in record["links"]
+                    )
+                    for alignment_pair in record["pairs"]:
+                        alignment_pairs.setdefault(record["manifestation_id"], []).append(
+                            (alignment_1_id, alignment_pair["alignment_2_id"], alignment_pair["manifestation_id"])
+                        )
+                        if alignment_pair["manifestation_id"] not in reached:
+                            reached.add(alignment_pair["manifestation_id"])
+                            frontier.append(alignment_pair["manifestation_id"])
+            records = session.execute_read(
                 lambda tx: tx.run(
-                    Queries.segments["get_aligned_segments"],
-                    alignment_1_id=alignment_1_id,
-                    span_start=start,
-                    span_end=end,
+                    Queries.segments["get_segmentation_layers"], manifestation_ids=list(reached - {manifestation_id})
                 ).data()
             )
+        segmentation_layers = {
+            record["manifestation_id"]: SegmentIntervals(
+                (span_start, span_end, (segment_id, span_start, span_end))
+                for segment_id, span_start, span_end in record["segments"]
+            )
+            for record in records
+        }
+        for pairs in alignment_pairs.values():
+            pairs.sort()  # get_aligned_segments_by_frontier orders each item's pairs by id
+
+        def as_segments(spans: list[tuple[str, int, int]]) -> list[dict]:
             return [
-                {
-                    "segment_id": record["segment_id"],
-                    "span": {"start": record["span_start"], "end": record["span_end"]},
-                }
-                for record in result
+                {"segment_id": segment_id, "span": {"start": start, "end": end}} for segment_id, start, end in spans
             ]
 
-    def _get_related_segments(self, manifestation_id: str, start: int, end: int, transform: bool = False) -> list[dict]:
-        transformed_related_segments, untransformed_related_segments, traversed_alignment_pairs = [], [], []
-        visited_manifestations = set()  # Track visited manifestations to prevent infinite loops
-        queue = queue_module.Queue()
-        queue.put({"manifestation_id": manifestation_id, "span_start": start, "span_end": end})
-        visited_manifestations.add(manifestation_id)  # Mark initial manifestation as visited
-        while not queue.empty():
-            item = queue.get()  # get() removes and returns the item (like pop())
-            manifestation_1_id = item["manifestation_id"]
-            span_start = item["span_start"]
-            span_end = item["span_end"]
-            alignment_list = self._get_alignment_pairs_by_manifestation(manifestation_1_id)
-            for alignment in alignment_list:
-                if (alignment["alignment_1_id"], alignment["alignment_2_id"]) not in traversed_alignment_pairs:
-                    segments_list = self._get_aligned_segments(alignment["alignment_1_id"], span_start, span_end)
-                    # Skip if no segments found
-                    if not segments_list:
-                        continue
-                    overall_start = min(segments_list, key=lambda x: x["span"]["start"])["span"]["start"]
-                    overall_end = max(segments_list, key=lambda x: x["span"]["end"])["span"]["end"]
-                    manifestation_2_id = self.get_manifestation_id_by_annotation_id(alignment["alignment_2_id"])
-                    # Skip if manifestation already visited (prevents infinite loops)
-                    if manifestation_2_id in visited_manifestations:
-                        continue
-                    visited_manifestations.add(manifestation_2_id)
-
-                    if transform:
-                        transformed_segments = self._get_overlapping_segments(
-                            manifestation_id=manifestation_2_id, start=overall_start, end=overall_end
-                        )
-                        transformed_related_segments.append(
-                            {"manifestation_id": manifestation_2_id, "segments": transformed_segments}
-                        )
-                    else:
-                        untransformed_related_segments.append(
-                            {"manifestation_id": manifestation_2_id, "segments": segments_list}
+        def expand(frontier: list[dict]) -> list[dict]:
+            records = []
+            for idx, item in enumerate(frontier):
+                for alignment_1_id, alignment_2_id, manifestation_2_id in alignment_pairs.get(
+                    item["manifestation_id"], []
+                ):
+                    aligned = alignment_links[alignment_1_id].overlapping(item["span_start"], item["span_end"])
+                    if aligned:
+                        records.append(
+                            {
+                                "idx": idx,
+                                "alignment_1_id": alignment_1_id,
+                                "alignment_2_id": alignment_2_id,
+                                "manifestation_id": manifestation_2_id,
+                                "segments": as_segments(
+                                    sorted(dict.fromkeys(aligned), key=lambda span: (span[1], span[2], span[0]))
+                                ),
+                            }
                         )
-                    traversed_alignment_pairs.append((alignment["alignment_1_id"], alignment["alignment_2_id"]))
-                    traversed_alignment_pairs.append((alignment["alignment_2_id"], alignment["alignment_1_id"]))
-                    queue.put(
-                        {"manifestation_id": manifestation_2_id, "span_start": overall_start, "span_end": overall_end}
+            return records
+
+        def overlapping(spans: list[dict]) -> list[list[dict]]:
+            unsegmented = SegmentIntervals(())
+            return [
+                as_segments(
+                    segmentation_layers.get(span["manifestation_id"], unsegmented).overlapping(
+                        span["span_start"], span["span_end"]
                     )
-        if transform:
-            return transformed_related_segments
-        else:
-            return untransformed_related_segments
+                )
+                for span in spans
+            ]
+
+        return [
+            {
+                "segment_id": segment["id"],
+                "related_segments": self._walk_related_segments(
+                    manifestation_id, int(segment["span"]["start"]), int(segment["span"]["end"]), expand, overlapping
+                ),
+            }
+            for segment in segments
+        ]
+
+    @staticmethod
+    def _walk_related_segments(
+        manifestation_id: str,
+        start: int,
+        end: int,
+        expand: Callable[[list[dict]], list[dict]],
+        overlapping: Callable[[list[dict]], list[list[dict]]] | None,
+    ) -> list[dict]:
+        """
+        Walk the alignments from a span one BFS level at a time. `expand` returns the alignment
+        pairs of a frontier that have segments aligned to its spans, ordered by frontier item, and
+        `overlapping` maps spans onto segmentation segments. Frontier items and their pairs are
+        visited in the order a per-item walk would visit them, so each manifestation is reached
+        through the same pair and span.
+        """
+        related_segments, traversed_alignment_pairs = [], set()
+        visited_manifestations = {manifestation_id}  # Track visited manifestations to prevent infinite loops
+        frontier = [{"manifestation_id": manifestation_id, "span_start": start, "span_end": end}]
+        while frontier:
+            next_frontier = []
+            for record in expand(frontier):
+                if (record["alignment_1_id"], record["alignment_2_id"]) in traversed_alignment_pairs:
+                    continue
+                manifestation_2_id = record["manifestation_id"]
+                # Skip if manifestation already visited (prevents infinite loops)
+                if manifestation_2_id in visited_manifestations:
+                    continue
+                visited_manifestations.add(manifestation_2_id)
+                segments_list = record["segments"]
+                related_segments.append({"manifestation_id": manifestation_2_id, "segments": segments_list})
+                traversed_alignment_pairs.add((record["alignment_1_id"], record["alignment_2_id"]))
+                traversed_alignment_pairs.add((record["alignment_2_id"], record["alignment_1_id"]))
+                next_frontier.append(
+                    {
+                        "manifestation_id": manifestation_2_id,
+                        "span_start": min(segment["span"]["start"] for segment in segments_list),
+                        "span_end": max(segment["span"]["end"] for segment in segments_list),
+                    }
+                )
+            if overlapping and next_frontier:
+                transformed = overlapping(next_frontier)
+                for item, segments in zip(related_segments[-len(next_frontier) :], transformed):
+                    item["segments"] = segments
+            frontier = next_frontier
+        return related_segments
 
     def get_texts_group(self, texts_id: str) -> dict:
         with self.get_session() as session:
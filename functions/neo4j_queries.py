@@ -1,3 +1,17 @@
+"""
+Cypher queries of the Neo4j database, built from shared fragments.
+
+Lookups start from the indexes in neo4j_constraints.cypher wherever one applies: title and author
+search from the localized_text_fulltext index, segment overlaps from segment_annotation_span
+(bounded by Annotation.max_span_length), and expression and annotation types from their
+materialized properties, falling back to inferring them for nodes written before those existed.
+List queries select and order one page of ids before projecting it, and the projections are
+narrowed to the requested fields so the subqueries behind other fields never run.
+"""
+
+import functools
+
+
 class Queries:
     @staticmethod
     def primary_nomen(label, relationship):
@@ -37,16 +51,43 @@ class Queries:
     """
 
     @staticmethod
-    def person_fragment(label):
-        return f"""
-{{
-    id: {label}.id,
-    bdrc: {label}.bdrc,
-    wiki: {label}.wiki,
-    name: [{Queries.primary_nomen(label, "HAS_NAME")}],
-    alt_names: [{Queries.alternative_nomen(label, "HAS_NAME")}]
-}}
-"""
+    def map_projection(entries, fields=None):
+        """
+        Cypher map literal of `entries` (key -> expression). With `fields`, only those keys are
+        projected, so the subqueries behind the other entries never run.
+        """
+        items = ",\n".join(f"    {key}: {value}" for key, value in entries.items() if fields is None or key in fields)
+        return f"\n{{\n{items}\n}}\n"
+
+    @staticmethod
+    def projection(fragment, label):
+        """Slot of a query template that `with_fields` fills with `{fragment}_fragment({label})`"""
+        return f"<{fragment}_fragment({label})>"
+
+    @staticmethod
+    @functools.cache
+    def with_fields(template, fragment, label, fields=None):
+        """
+        `template` with its `projection(fragment, label)` slot filled with that fragment, narrowed to the
+        keys in `fields` when given (a frozenset, so the generated query is built once per field set).
+        """
+        slot = Queries.projection(fragment, label)
+        if template.count(slot) != 1:
+            raise ValueError(f"Query template must contain exactly one {slot} slot")
+        return template.replace(slot, getattr(Queries, f"{fragment}_fragment")(label, fields))
+
+    @staticmethod
+    def person_fragment(label, fields=None):
+        return Queries.map_projection(
+            {
+                "id": f"{label}.id",
+                "bdrc": f"{label}.bdrc",
+                "wiki": f"{label}.wiki",
+                "name": f"[{Queries.primary_nomen(label, 'HAS_NAME')}]",
+                "alt_names": f"[{Queries.alternative_nomen(label, 'HAS_NAME')}]",
+            },
+            fields,
+        )
 
     @staticmethod
     def expression_compact_fragment(label):
@@ -55,33 +96,34 @@ class Queries:
     id: {label}.id,
     title: [{Queries.primary_nomen(label, "HAS_TITLE")}],
     language: [({label})-[:HAS_LANGUAGE]->({label}_l:Language) | {label}_l.code][0],
-    type: {Queries.get_expression_type(label)},
+    type: {Queries.stored_expression_type(label)},
 }}
 """
 
     @staticmethod
-    def manifestation_fragment(label):
-        return f"""
-{{
-    id: {label}.id,
-    bdrc: {label}.bdrc,
-    wiki: {label}.wiki,
-    type: [({label})-[:HAS_TYPE]->(mf_mt:ManifestationType) | mf_mt.name][0],
-    annotations: [
+    def manifestation_fragment(label, fields=None):
+        return Queries.map_projection(
+            {
+                "id": f"{label}.id",
+                "bdrc": f"{label}.bdrc",
+                "wiki": f"{label}.wiki",
+                "type": f"[({label})-[:HAS_TYPE]->(mf_mt:ManifestationType) | mf_mt.name][0]",
+                "annotations": f"""[
         ({label})<-[:ANNOTATION_OF]-(mf_ann:Annotation) | {{
             id: mf_ann.id,
-            type: [(mf_ann)-[:HAS_TYPE]->(mf_at:AnnotationType) | mf_at.name][0],
+            type: {Queries.stored_annotation_type('mf_ann')},
             aligned_to: [(mf_ann)-[:ALIGNED_TO]->(mf_target:Annotation) | mf_target.id][0]
         }}
-    ],
-    colophon: {label}.colophon,
-    source: [({label})-[:HAS_SOURCE]->(mf_s:Source) | mf_s.name][0],
-    incipit_title: [{Queries.primary_nomen(label, 'HAS_INCIPIT_TITLE')}],
-    alt_incipit_titles: [{Queries.alternative_nomen(label, 'HAS_INCIPIT_TITLE')}],
-    alignment_sources: {Queries.manifestation_alignment_sources(label)},
-    alignment_targets: {Queries.manifestation_alignment_targets(label)}
-}}
-"""
+    ]""",
+                "colophon": f"{label}.colophon",
+                "source": f"[({label})-[:HAS_SOURCE]->(mf_s:Source) | mf_s.name][0]",
+                "incipit_title": f"[{Queries.primary_nomen(label, 'HAS_INCIPIT_TITLE')}]",
+                "alt_incipit_titles": f"[{Queries.alternative_nomen(label, 'HAS_INCIPIT_TITLE')}]",
+                "alignment_sources": Queries.manifestation_alignment_sources(label),
+                "alignment_targets": Queries.manifestation_alignment_targets(label),
+            },
+            fields,
+        )
 
     @staticmethod
     def get_expression_type(label):
@@ -97,81 +139,83 @@ END
 """
 
     @staticmethod
-    def expression_fragment(label):
-        return f"""
-        {{
-            id: {label}.id,
-            bdrc: {label}.bdrc,
-            wiki: {label}.wiki,
-            type: {Queries.get_expression_type(label)},
-            target: COALESCE(
-                [({label})-[:TRANSLATION_OF]->(ef_target:Expression) | ef_target.id][0],
-                [({label})-[:COMMENTARY_OF]->(ef_target:Expression) | ef_target.id][0]
-            ),
-            contributors: (
-                [({label})-[:HAS_CONTRIBUTION]->(ef_contrib:Contribution)-[:BY]->(ef_person:Person) | {{
-                    person_id: ef_person.id,
-                    person_bdrc_id: ef_person.bdrc,
-                    role: [(ef_contrib)-[:WITH_ROLE]->(ef_role:RoleType) | ef_role.name][0],
-                    person_name: [{Queries.primary_nomen('ef_person', 'HAS_NAME')}],
-                    alt_names: [{Queries.alternative_nomen('ef_person', 'HAS_NAME')}]
-                }}]
-                +
-                [({label})-[:HAS_CONTRIBUTION]->(ef_contrib:Contribution)-[:BY]->(ef_ai:AI) | {{
-                    ai_id: ef_ai.id,
-                    role: [(ef_contrib)-[:WITH_ROLE]->(ef_role:RoleType) | ef_role.name][0]
-                }}]
-            ),
-            date: {label}.date,
-            title: [{Queries.primary_nomen(label, 'HAS_TITLE')}],
-            alt_titles: [{Queries.alternative_nomen(label, 'HAS_TITLE')}],
-            language: [({label})-[:HAS_LANGUAGE]->(ef_lang:Language) | ef_lang.code][0],
-            category_id: [({label})-[:EXPRESSION_OF]->(ef_work:Work)-[:BELONGS_TO]->(ef_cat:Category) | ef_cat.id][0],
-            copyright: [({label})-[:HAS_COPYRIGHT]->(ef_copyright:Copyright) | ef_copyright.status][0],
-            license: [({label})-[:HAS_LICENSE]->(ef_license:License) | ef_license.name][0]
-        }}
-        """
+    def stored_expression_type(label):
+        """Materialized expression type, inferred for expressions written before it was stored"""
+        return f"COALESCE({label}.type, {Queries.get_expression_type(label)})"
 
     @staticmethod
-    def create_expression_base(label):
-        return f"CREATE ({label}:Expression {{id: $expression_id, bdrc: $bdrc, wiki: $wiki, date: $date}})"
+    def stored_annotation_type(label):
+        """Materialized annotation type, read through HAS_TYPE for annotations written before it was stored"""
+        return f"COALESCE({label}.type, [({label})-[:HAS_TYPE]->({label}_at:AnnotationType) | {label}_at.name][0])"
 
     @staticmethod
-    def create_copyright_and_license(expression_label):
+    def set_expression_type(*labels):
         """
-        Matches existing Copyright node by status and links it to the expression.
-        Also matches existing License node by name and links it.
+        SET clause refreshing the materialized type of the given expressions. Must follow every write
+        that adds or removes a TRANSLATION_OF/COMMENTARY_OF relationship, for both of its ends.
+        """
+        return "SET " + ", ".join(f"{label}.type = {Queries.get_expression_type(label)}" for label in labels)
 
-        Returns Cypher fragment that:
-        1. Matches Copyright node by status value
-        2. Links Expression to Copyright
-        3. Matches License node by name (creates if not exists)
-        4. Links Expression to License
+    @staticmethod
+    def bump_relations_version():
         """
-        return f"""
-MATCH (copyright:Copyright {{status: $copyright}})
-MATCH (license:License {{name: $license}})
-MERGE ({expression_label})-[:HAS_COPYRIGHT]->(copyright)
-MERGE ({expression_label})-[:HAS_LICENSE]->(license)
-"""
+        Clause advancing the relation graph version (see relation_graph.py). Must follow every write
+        that adds or removes a TRANSLATION_OF/COMMENTARY_OF relationship, in the same transaction.
+        """
+        return """MERGE (relations_version:RelationsVersion {id: 'expressions'})
+SET relations_version.version = COALESCE(relations_version.version, 0) + 1"""
 
+    @staticmethod
+    def expression_relations(label):
+        """TRANSLATION_OF/COMMENTARY_OF relations of ({label}) as {type, direction, otherId} maps"""
+        return f"""[ ({label})-[r:TRANSLATION_OF|COMMENTARY_OF]-(other:Expression)
+        | {{
+            type: type(r),
+            direction: CASE WHEN startNode(r) = {label} THEN 'out' ELSE 'in' END,
+            otherId: other.id
+          }}
+      ]"""
 
-Queries.expressions = {
-    "fetch_by_id": f"""
-    MATCH (e:Expression {{id: $id}})
+    @staticmethod
+    def authored_by_search(label):
+        """
+        Expressions ({label}) with an author whose primary or alternative name matches the
+        $author_query fulltext search and contains $author.
+        """
+        return f"""
+    CALL db.index.fulltext.queryNodes('localized_text_fulltext', $author_query) YIELD node AS {label}_lt
+    WHERE toLower({label}_lt.text) CONTAINS toLower($author)
+    MATCH ({label}_lt)<-[:HAS_LOCALIZATION]-(:Nomen)-[:ALTERNATIVE_OF*0..1]->(:Nomen)<-[:HAS_NAME]-(:Person)
+          <-[:BY]-({label}_c:Contribution)<-[:HAS_CONTRIBUTION]-({label}:Expression)
+    MATCH ({label}_c)-[:WITH_ROLE]->(:RoleType {{name: 'author'}})
+"""
 
-    RETURN {Queries.expression_fragment('e')} AS expression
-""",
-    "fetch_by_bdrc": f"""
-    MATCH (e:Expression {{bdrc: $bdrc_id}})
+    @staticmethod
+    def expressions_of_type(label):
+        """
+        Expressions ({label}) of type $type. Starts from the expression_type index once
+        scripts/backfill_expression_types.py recorded that every expression has a stored type; until
+        then scans and infers the type of the expressions without one, like the fulltext searches.
+        """
+        return f"""OPTIONAL MATCH (backfill:Backfill {{id: 'expression_types'}})
+    CALL (backfill) {{
+        WHEN backfill IS NOT NULL THEN {{
+            MATCH ({label}:Expression {{type: $type}})
+            RETURN {label}
+        }}
+        ELSE {{
+            MATCH ({label}:Expression)
+            WHERE {Queries.stored_expression_type(label)} = $type
+            RETURN {label}
+        }}
+    }}"""
 
-    RETURN {Queries.expression_fragment('e')} AS expression
-""",
-    "fetch_all": f"""
-    MATCH (e:Expression)
+    @staticmethod
+    def filtered_expressions(source):
+        """Expressions (e) bound by the `source` clauses, narrowed to the $language, $title and $author filters"""
+        return f"""{source}
     WITH e
-    WHERE ($type IS NULL OR {Queries.get_expression_type('e')} = $type)
-    AND ($language IS NULL OR [(e)-[:HAS_LANGUAGE]->(l:Language) | l.code][0] = $language)
+    WHERE ($language IS NULL OR [(e)-[:HAS_LANGUAGE]->(l:Language) | l.code][0] = $language)
     AND ($title IS NULL OR (
         EXISTS {{
             MATCH (e)-[:HAS_TITLE]->(titleNomen:Nomen)-[:HAS_LOCALIZATION]->(lt:LocalizedText)
@@ -198,144 +242,215 @@ Queries.expressions = {
                   -[:HAS_LOCALIZATION]->(altNameText:LocalizedText)
             WHERE toLower(altNameText.text) CONTAINS toLower($author)
         }}
-    ))
+    ))"""
 
+    @staticmethod
+    def expression_fragment(label, fields=None):
+        return Queries.map_projection(
+            {
+                "id": f"{label}.id",
+                "bdrc": f"{label}.bdrc",
+                "wiki": f"{label}.wiki",
+                "type": Queries.stored_expression_type(label),
+                "target": f"""COALESCE(
+        [({label})-[:TRANSLATION_OF]->(ef_target:Expression) | ef_target.id][0],
+        [({label})-[:COMMENTARY_OF]->(ef_target:Expression) | ef_target.id][0]
+    )""",
+                "contributors": f"""(
+        [({label})-[:HAS_CONTRIBUTION]->(ef_contrib:Contribution)-[:BY]->(ef_person:Person) | {{
+            person_id: ef_person.id,
+            person_bdrc_id: ef_person.bdrc,
+            role: [(ef_contrib)-[:WITH_ROLE]->(ef_role:RoleType) | ef_role.name][0],
+            person_name: [{Queries.primary_nomen('ef_person', 'HAS_NAME')}],
+            alt_names: [{Queries.alternative_nomen('ef_person', 'HAS_NAME')}]
+        }}]
+        +
+        [({label})-[:HAS_CONTRIBUTION]->(ef_contrib:Contribution)-[:BY]->(ef_ai:AI) | {{
+            ai_id: ef_ai.id,
+            role: [(ef_contrib)-[:WITH_ROLE]->(ef_role:RoleType) | ef_role.name][0]
+        }}]
+    )""",
+                "date": f"{label}.date",
+                "title": f"[{Queries.primary_nomen(label, 'HAS_TITLE')}]",
+                "alt_titles": f"[{Queries.alternative_nomen(label, 'HAS_TITLE')}]",
+                "language": f"[({label})-[:HAS_LANGUAGE]->(ef_lang:Language) | ef_lang.code][0]",
+                "category_id": (
+                    f"[({label})-[:EXPRESSION_OF]->(ef_work:Work)-[:BELONGS_TO]->(ef_cat:Category) | ef_cat.id][0]"
+                ),
+                "copyright": f"[({label})-[:HAS_COPYRIGHT]->(ef_copyright:Copyright) | ef_copyright.status][0]",
+                "license": f"[({label})-[:HAS_LICENSE]->(ef_license:License) | ef_license.name][0]",
+            },
+            fields,
+        )
+
+    @staticmethod
+    def page(label, keyset=False):
+        """
+        Clauses keeping one page of the rows bound so far: $limit rows from $offset, or with `keyset`
+        the first $limit rows in {label}.id order after $after, so a page costs the same however deep it is.
+        """
+        if keyset:
+            return f"""WITH * WHERE {label}.id > $after
+    ORDER BY {label}.id
+    LIMIT $limit"""
+        return """WITH *
     OFFSET $offset
-    LIMIT $limit
+    LIMIT $limit"""
 
-    RETURN {Queries.expression_fragment('e')} AS expression
-""",
-    "fetch_all_fuzzy_title": f"""
-    // Cypher 25 - Search by title using CONTAINS (works for all languages including Tibetan)
-    MATCH (e:Expression)
-    WHERE ($title IS NULL OR (
-        EXISTS {{
-            MATCH (e)-[:HAS_TITLE]->(titleNomen:Nomen)-[:HAS_LOCALIZATION]->(lt:LocalizedText)
-            WHERE toLower(lt.text) CONTAINS toLower($title)
-        }}
-        OR EXISTS {{
-            MATCH (e)-[:HAS_TITLE]->(:Nomen)<-[:ALTERNATIVE_OF]-(altNomen:Nomen)
-                  -[:HAS_LOCALIZATION]->(lt:LocalizedText)
-            WHERE toLower(lt.text) CONTAINS toLower($title)
+    @staticmethod
+    def list_query(rows, label, projection, keyset=False):
+        """List query: `rows` (clauses binding ({label})), cut to a `page` before `projection` runs on it"""
+        return f"""
+    {rows}
+
+    {Queries.page(label, keyset)}
+
+    {projection}
+"""
+
+    @staticmethod
+    def annotation_segments(annotation):
+        """Segments of ({annotation}) in span order, with reference, bibliography type and alignment"""
+        return f"""COLLECT {{
+        MATCH ({annotation})<-[:SEGMENTATION_OF]-(s:Segment)
+        WITH s
+        ORDER BY s.span_start
+        RETURN {{
+            id: s.id,
+            span: {{start: s.span_start, end: s.span_end}},
+            reference: [(s)-[:HAS_REFERENCE]->(r:Reference) | r.name][0],
+            type: [(s)-[:HAS_TYPE]->(bt:BibliographyType) | bt.name][0],
+            aligned_segments: [(s)-[:ALIGNED_TO]->(aligned:Segment) | aligned.id]
         }}
-    ))
-    AND ($type IS NULL OR {Queries.get_expression_type('e')} = $type)
-    AND ($language IS NULL OR [(e)-[:HAS_LANGUAGE]->(l:Language) | l.code][0] = $language)
-    
-    WITH DISTINCT e
-    OFFSET $offset
-    LIMIT $limit
+    }}"""
+
+    @staticmethod
+    def overlapping_segments(annotation, segment, start, end, inclusive=False):
+        """
+        CALL binding each ({segment}:Segment) of ({annotation}) that overlaps [start, end), or
+        [start, end] when `inclusive` (segments that only touch the span also count).
+
+        Annotations with a max_span_length seek the segment_annotation_span index: a segment can
+        only overlap if its span_start lies within max_span_length before `start`. Annotations
+        without it (created before the bound was kept) expand all their segments instead.
+        """
+        lt, gt = ("<=", ">=") if inclusive else ("<", ">")
+        overlaps = f"{segment}.span_start {lt} {end} AND {segment}.span_end {gt} {start}"
+        return f"""
+CALL (*) {{
+    WHEN {annotation}.max_span_length IS NOT NULL THEN {{
+        MATCH ({segment}:Segment)
+        WHERE {segment}.annotation_id = {annotation}.id
+          AND {segment}.span_start >= {start} - {annotation}.max_span_length
+          AND {overlaps}
+        RETURN {segment}
+    }}
+    ELSE {{
+        MATCH ({annotation})<-[:SEGMENTATION_OF]-({segment}:Segment)
+        WHERE {overlaps}
+        RETURN {segment}
+    }}
+}}"""
+
+    @staticmethod
+    def create_expression_base(label):
+        return f"CREATE ({label}:Expression {{id: $expression_id, bdrc: $bdrc, wiki: $wiki, date: $date}})"
 
-    RETURN {Queries.expression_fragment('e')} AS expression
+    @staticmethod
+    def create_copyright_and_license(expression_label):
+        """
+        Matches existing Copyright node by status and links it to the expression.
+        Also matches existing License node by name and links it.
+
+        Returns Cypher fragment that:
+        1. Matches Copyright node by status value
+        2. Links Expression to Copyright
+        3. Matches License node by name (creates if not exists)
+        4. Links Expression to License
+        """
+        return f"""
+MATCH (copyright:Copyright {{status: $copyright}})
+MATCH (license:License {{name: $license}})
+MERGE ({expression_label})-[:HAS_COPYRIGHT]->(copyright)
+MERGE ({expression_label})-[:HAS_LICENSE]->(license)
+"""
+
+
+Queries.expressions = {
+    "fetch_by_id": f"""
+    MATCH (e:Expression {{id: $id}})
+
+    RETURN {Queries.projection('expression', 'e')} AS expression
 """,
-    "fetch_all_fuzzy_author": f"""
-    // Cypher 25 - Search by author using CONTAINS (works for all languages including Tibetan)
-    MATCH (e:Expression)
-    WHERE ($author IS NULL OR (
-        EXISTS {{
-            MATCH (e)-[:HAS_CONTRIBUTION]->(contrib:Contribution)-[:WITH_ROLE]->(role:RoleType)
-            WHERE role.name = 'author'
-            MATCH (contrib)-[:BY]->(person:Person)-[:HAS_NAME]->(nameNomen:Nomen)
-                  -[:HAS_LOCALIZATION]->(nameText:LocalizedText)
-            WHERE toLower(nameText.text) CONTAINS toLower($author)
-        }}
-        OR EXISTS {{
-            MATCH (e)-[:HAS_CONTRIBUTION]->(contrib:Contribution)-[:WITH_ROLE]->(role:RoleType)
-            WHERE role.name = 'author'
-            MATCH (contrib)-[:BY]->(person:Person)-[:HAS_NAME]->(:Nomen)<-[:ALTERNATIVE_OF]-(altName:Nomen)
-                  -[:HAS_LOCALIZATION]->(altNameText:LocalizedText)
-            WHERE toLower(altNameText.text) CONTAINS toLower($author)
-        }}
-    ))
-    AND ($type IS NULL OR {Queries.get_expression_type('e')} = $type)
-    AND ($language IS NULL OR [(e)-[:HAS_LANGUAGE]->(l:Language) | l.code][0] = $language)
-    
-    WITH DISTINCT e
-    OFFSET $offset
-    LIMIT $limit
+    "fetch_by_bdrc": f"""
+    MATCH (e:Expression {{bdrc: $bdrc_id}})
 
-    RETURN {Queries.expression_fragment('e')} AS expression
+    RETURN {Queries.projection('expression', 'e')} AS expression
 """,
-    "fetch_all_fuzzy_both": f"""
-    // Cypher 25 - Search by BOTH title AND author using CONTAINS (must match both)
+    "backfill_types": f"""
     MATCH (e:Expression)
-    WHERE (
-        EXISTS {{
-            MATCH (e)-[:HAS_TITLE]->(titleNomen:Nomen)-[:HAS_LOCALIZATION]->(lt:LocalizedText)
-            WHERE toLower(lt.text) CONTAINS toLower($title)
-        }}
-        OR EXISTS {{
-            MATCH (e)-[:HAS_TITLE]->(:Nomen)<-[:ALTERNATIVE_OF]-(altNomen:Nomen)
-                  -[:HAS_LOCALIZATION]->(lt:LocalizedText)
-            WHERE toLower(lt.text) CONTAINS toLower($title)
-        }}
-    )
-    AND (
-        EXISTS {{
-            MATCH (e)-[:HAS_CONTRIBUTION]->(contrib:Contribution)-[:WITH_ROLE]->(role:RoleType)
-            WHERE role.name = 'author'
-            MATCH (contrib)-[:BY]->(person:Person)-[:HAS_NAME]->(nameNomen:Nomen)
-                  -[:HAS_LOCALIZATION]->(nameText:LocalizedText)
-            WHERE toLower(nameText.text) CONTAINS toLower($author)
-        }}
-        OR EXISTS {{
-            MATCH (e)-[:HAS_CONTRIBUTION]->(contrib:Contribution)-[:WITH_ROLE]->(role:RoleType)
-            WHERE role.name = 'author'
-            MATCH (contrib)-[:BY]->(person:Person)-[:HAS_NAME]->(:Nomen)<-[:ALTERNATIVE_OF]-(altName:Nomen)
-                  -[:HAS_LOCALIZATION]->(altNameText:LocalizedText)
-            WHERE toLower(altNameText.text) CONTAINS toLower($author)
-        }}
-    )
-    AND ($type IS NULL OR {Queries.get_expression_type('e')} = $type)
-    AND ($language IS NULL OR [(e)-[:HAS_LANGUAGE]->(l:Language) | l.code][0] = $language)
-    
-    WITH DISTINCT e
-    OFFSET $offset
-    LIMIT $limit
-
-    RETURN {Queries.expression_fragment('e')} AS expression
+    CALL (e) {{
+        {Queries.set_expression_type('e')}
+    }} IN TRANSACTIONS OF 1000 ROWS
+    RETURN count(e) AS updated
+""",
+    # Recorded once backfill_types finished, from when every expression has a stored type
+    "mark_types_backfilled": """
+    MERGE (backfill:Backfill {id: 'expression_types'})
+    SET backfill.completed_at = datetime()
+""",
+    "relations_version": """
+    OPTIONAL MATCH (v:RelationsVersion {id: 'expressions'})
+    RETURN COALESCE(v.version, 0) AS version
 """,
-    "fetch_all_relations": """
+    "fetch_all_relations": f"""
     MATCH (e:Expression)
     RETURN e.id AS id,
-      [ (e)-[r:TRANSLATION_OF|COMMENTARY_OF]-(other:Expression)
-        | {
-            type: type(r),
-            direction: CASE WHEN startNode(r) = e THEN 'out' ELSE 'in' END,
-            otherId: other.id
-          }
-      ] AS relations
+      {Queries.expression_relations('e')} AS relations
     ORDER BY id
+""",
+    "fetch_relation_component": f"""
+    MATCH (start:Expression {{id: $id}})
+    CALL (start) {{
+        // A group is only complete if no member relates to an expression outside it, which an
+        // expression created while the backfill grouped its target's component would
+        WHEN start.relation_group IS NOT NULL AND NOT EXISTS {{
+            MATCH (:Expression {{relation_group: start.relation_group}})
+                  -[:TRANSLATION_OF|COMMENTARY_OF]-(other:Expression)
+            WHERE other.relation_group IS NULL OR other.relation_group <> start.relation_group
+        }} THEN {{
+            MATCH (e:Expression {{relation_group: start.relation_group}})
+            RETURN e
+        }}
+        ELSE {{
+            // Expressions written before relation_group was stored, or groups missing a neighbour
+            MATCH (start)-[:TRANSLATION_OF|COMMENTARY_OF*0..]-(e:Expression)
+            RETURN DISTINCT e
+        }}
+    }}
+    RETURN start.relation_group AS relation_group,
+      e.id AS id,
+      {Queries.expression_relations('e')} AS relations
+""",
+    "backfill_relation_groups": """
+    MATCH (e:Expression)
+    WHERE e.relation_group IS NULL
+    CALL (e) {
+        // An earlier row of this run may already have grouped e's component
+        WITH e WHERE e.relation_group IS NULL
+        MATCH (e)-[:TRANSLATION_OF|COMMENTARY_OF*0..]-(member:Expression)
+        WITH collect(DISTINCT member) AS members
+        WITH members, reduce(smallest = members[0].id, m IN members |
+            CASE WHEN m.id < smallest THEN m.id ELSE smallest END) AS relation_group
+        UNWIND members AS member
+        SET member.relation_group = relation_group
+    } IN TRANSACTIONS OF 100 ROWS
+    RETURN count(e) AS updated
 """,
     "get_expressions_metadata_by_ids": f"""
 MATCH (e:Expression)
 WHERE e.id IN $expression_ids
 RETURN e.id as expression_id, {Queries.expression_fragment('e')} as metadata
-""",
-    "fetch_by_category": f"""
-    MATCH (c:Category {{id: $category_id}})
-    MATCH (e:Expression)-[:EXPRESSION_OF]->(:Work)-[:BELONGS_TO]->(c)
-    WITH e
-    WHERE {Queries.get_expression_type('e')} <> 'commentary'
-      AND ($language IS NULL OR [(e)-[:HAS_LANGUAGE]->(l:Language) | l.code][0] = $language)
-      AND (
-        $instance_type IS NULL OR EXISTS {{
-          MATCH (e)<-[:MANIFESTATION_OF]-(m:Manifestation)-[:HAS_TYPE]->(mt:ManifestationType)
-          WHERE mt.name = $instance_type
-          RETURN 1
-        }}
-      )
-    OPTIONAL MATCH (e)<-[:MANIFESTATION_OF]-(m:Manifestation)-[:HAS_TYPE]->(mt:ManifestationType)
-    WHERE $instance_type IS NULL OR mt.name = $instance_type
-    WITH e, collect(m) as ms
-
-    OFFSET $offset
-    LIMIT $limit
-
-    RETURN {{
-      text_metadata: {Queries.expression_fragment('e')},
-      instance_metadata: [m IN ms | {Queries.manifestation_fragment('m')}]
-    }} AS item
 """,
     "fetch_related": f"""
     MATCH (e:Expression {{id: $id}})
@@ -356,6 +471,8 @@ MERGE (e)-[:EXPRESSION_OF {{original: $original}}]->(w)
 MERGE (e)-[:HAS_LANGUAGE {{bcp47: $bcp47_tag}}]->(l)
 MERGE (e)-[:HAS_TITLE]->(n)
 {Queries.create_copyright_and_license('e')}
+{Queries.set_expression_type('e')}
+SET e.relation_group = e.id
 RETURN e.id as expression_id
 """,
     "_old_create_contribution": """
@@ -395,7 +512,12 @@ MERGE (e)-[:TRANSLATION_OF]->(target)
 MERGE (e)-[:HAS_LANGUAGE {{bcp47: $bcp47_tag}}]->(l)
 MERGE (e)-[:HAS_TITLE]->(n)
 {Queries.create_copyright_and_license('e')}
-RETURN e.id as expression_id
+{Queries.set_expression_type('e', 'target')}
+// Joins the target's component, ungrouped (NULL) until scripts/backfill_relation_groups.py ran
+SET e.relation_group = target.relation_group
+WITH e
+{Queries.bump_relations_version()}
+RETURN e.id as expression_id, relations_version.version AS relations_version
 """,
     "create_commentary": f"""
 MATCH (target:Expression {{id: $target_id}})
@@ -409,7 +531,12 @@ MERGE (e)-[:EXPRESSION_OF {{original: true}}]->(commentary_work)
 MERGE (e)-[:HAS_LANGUAGE {{bcp47: $bcp47_tag}}]->(l)
 MERGE (e)-[:HAS_TITLE]->(n)
 {Queries.create_copyright_and_license('e')}
-RETURN e.id as expression_id
+{Queries.set_expression_type('e', 'target')}
+// Joins the target's component, ungrouped (NULL) until scripts/backfill_relation_groups.py ran
+SET e.relation_group = target.relation_group
+WITH e
+{Queries.bump_relations_version()}
+RETURN e.id as expression_id, relations_version.version AS relations_version
 """,
     "get_texts_group": f"""
 MATCH (e1:Expression {{id: $expression_id}})
@@ -507,15 +634,79 @@ RETURN e.id as expression_id
 """,
 }
 
+# List queries as the clauses binding their rows and the projection of a page. Each gets an offset
+# variant and a cursor (keyset) one, "{name}_after", selected when a cursor is given
+_expression = f"RETURN {Queries.projection('expression', 'e')} AS expression"
+_expression_listings = {
+    "fetch_all": (Queries.filtered_expressions("MATCH (e:Expression)"), _expression),
+    "fetch_all_by_type": (Queries.filtered_expressions(Queries.expressions_of_type("e")), _expression),
+    "fetch_all_fuzzy_title": (
+        f"""// Title candidates come from the fulltext index; CONTAINS keeps the substring semantics
+    CALL db.index.fulltext.queryNodes('localized_text_fulltext', $title_query) YIELD node AS lt
+    WHERE toLower(lt.text) CONTAINS toLower($title)
+    MATCH (lt)<-[:HAS_LOCALIZATION]-(:Nomen)-[:ALTERNATIVE_OF*0..1]->(:Nomen)<-[:HAS_TITLE]-(e:Expression)
+    WHERE ($type IS NULL OR {Queries.stored_expression_type('e')} = $type)
+    AND ($language IS NULL OR [(e)-[:HAS_LANGUAGE]->(l:Language) | l.code][0] = $language)
+
+    WITH DISTINCT e""",
+        _expression,
+    ),
+    "fetch_all_fuzzy_author": (
+        f"""// Author candidates come from the fulltext index; CONTAINS keeps the substring semantics
+    {Queries.authored_by_search('e')}
+    WHERE ($type IS NULL OR {Queries.stored_expression_type('e')} = $type)
+    AND ($language IS NULL OR [(e)-[:HAS_LANGUAGE]->(l:Language) | l.code][0] = $language)
+
+    WITH DISTINCT e""",
+        _expression,
+    ),
+    "fetch_all_fuzzy_both": (
+        f"""// Expressions matching BOTH title AND author: intersect the two fulltext lookups
+    CALL () {{
+        {Queries.authored_by_search('author_e')}
+        RETURN collect(DISTINCT author_e) AS authored
+    }}
+    CALL db.index.fulltext.queryNodes('localized_text_fulltext', $title_query) YIELD node AS lt
+    WHERE toLower(lt.text) CONTAINS toLower($title)
+    MATCH (lt)<-[:HAS_LOCALIZATION]-(:Nomen)-[:ALTERNATIVE_OF*0..1]->(:Nomen)<-[:HAS_TITLE]-(e:Expression)
+    WHERE e IN authored
+    AND ($type IS NULL OR {Queries.stored_expression_type('e')} = $type)
+    AND ($language IS NULL OR [(e)-[:HAS_LANGUAGE]->(l:Language) | l.code][0] = $language)
+
+    WITH DISTINCT e""",
+        _expression,
+    ),
+    "fetch_by_category": (
+        f"""MATCH (c:Category {{id: $category_id}})
+    MATCH (e:Expression)-[:EXPRESSION_OF]->(:Work)-[:BELONGS_TO]->(c)
+    WITH e
+    WHERE {Queries.stored_expression_type('e')} <> 'commentary'
+      AND ($language IS NULL OR [(e)-[:HAS_LANGUAGE]->(l:Language) | l.code][0] = $language)
+      AND (
+        $instance_type IS NULL OR EXISTS {{
+          MATCH (e)<-[:MANIFESTATION_OF]-(m:Manifestation)-[:HAS_TYPE]->(mt:ManifestationType)
+          WHERE mt.name = $instance_type
+          RETURN 1
+        }}
+      )""",
+        f"""// Manifestations are only collected for the expressions on this page
+    RETURN {{
+      text_metadata: {Queries.expression_fragment('e')},
+      instance_metadata: [
+        (e)<-[:MANIFESTATION_OF]-(m:Manifestation)-[:HAS_TYPE]->(mt:ManifestationType)
+        WHERE $instance_type IS NULL OR mt.name = $instance_type | {Queries.manifestation_fragment('m')}
+      ]
+    }} AS item""",
+    ),
+}
+for _name, (_rows, _projection) in _expression_listings.items():
+    Queries.expressions[_name] = Queries.list_query(_rows, "e", _projection)
+    Queries.expressions[f"{_name}_after"] = Queries.list_query(_rows, "e", _projection, keyset=True)
+
 Queries.persons = {
     "fetch_by_id": f"""
 MATCH (person:Person {{id: $id}})
-RETURN {Queries.person_fragment('person')} AS person
-""",
-    "fetch_all": f"""
-MATCH (person:Person)
-RETURN {Queries.person_fragment('person')} AS person
-SKIP $offset LIMIT $limit
+RETURN {Queries.projection('person', 'person')} AS person
 """,
     "create": """
 MATCH (n:Nomen) WHERE elementId(n) = $primary_name_element_id
@@ -525,6 +716,11 @@ RETURN p.id as person_id
 """,
 }
 
+for _keyset, _name in ((False, "fetch_all"), (True, "fetch_all_after")):
+    Queries.persons[_name] = Queries.list_query(
+        "MATCH (person:Person)", "person", f"RETURN {Queries.projection('person', 'person')} AS person", keyset=_keyset
+    )
+
 Queries.nomens = {
     "create": """
 OPTIONAL MATCH (primary:Nomen)
@@ -542,6 +738,12 @@ RETURN elementId(n) as element_id
 """,
 }
 
+# Fragment fields of the related-instance summaries built by Neo4JDatabase.find_related_instances
+RELATED_INSTANCE_FIELDS = {
+    "manifestation": ("id", "type", "source"),
+    "expression": ("id", "type", "title", "alt_titles", "language", "contributors"),
+}
+
 Queries.manifestations = {
     "fetch": f"""
     MATCH (m:Manifestation)
@@ -550,14 +752,14 @@ Queries.manifestations = {
     MATCH (m)-[:MANIFESTATION_OF]->(e:Expression)
     WHERE $manifestation_type IS NULL OR [(m)-[:HAS_TYPE]->(mt:ManifestationType) | mt.name][0] = $manifestation_type
 
-    RETURN {Queries.manifestation_fragment('m')} AS manifestation, e.id AS expression_id
+    RETURN {Queries.projection('manifestation', 'm')} AS manifestation, e.id AS expression_id
 """,
     "fetch_by_annotation_id": """
     MATCH (a:Annotation {id: $annotation_id})-[:ANNOTATION_OF]->(m:Manifestation)
     RETURN m.id AS manifestation_id
 """,
-    "fetch_by_annotation": """
-    MATCH (a:Annotation {id: $annotation_id})-[:ANNOTATION_OF]->(m:Manifestation)
+    "fetch_by_annotation": f"""
+    MATCH (a:Annotation {{id: $annotation_id}})-[:ANNOTATION_OF]->(m:Manifestation)
     MATCH (m)-[:MANIFESTATION_OF]->(e:Expression)
 
     RETURN {Queries.manifestation_fragment('m')} AS manifestation, e.id AS expression_id
@@ -572,7 +774,8 @@ CREATE (m:Manifestation {
   id: $manifestation_id,
   bdrc: $bdrc,
   wiki: $wiki,
-  colophon: $colophon
+  colophon: $colophon,
+  base_text_generation: $base_text_generation
 })
 WITH m, e, mt, S, it
 
@@ -588,7 +791,7 @@ RETURN m.id AS manifestation_id
     // Find all alignment annotations on the given manifestation
     MATCH (m:Manifestation {{id: $manifestation_id}})
           <-[:ANNOTATION_OF]-(ann:Annotation)
-          -[:HAS_TYPE]->(at:AnnotationType {{name: 'alignment'}})
+    WHERE {Queries.stored_annotation_type('ann')} = 'alignment'
 
     // Case 1: This annotation has aligned_to (manifestation is translation/commentary)
     // Follow the aligned_to relationship to find the target manifestation
@@ -610,8 +813,8 @@ RETURN m.id AS manifestation_id
     WHERE related_m IS NOT NULL
 
     RETURN DISTINCT {{
-        manifestation: {Queries.manifestation_fragment('related_m')},
-        expression: {Queries.expression_fragment('related_e')},
+        manifestation: {Queries.manifestation_fragment('related_m', RELATED_INSTANCE_FIELDS["manifestation"])},
+        expression: {Queries.expression_fragment('related_e', RELATED_INSTANCE_FIELDS["expression"])},
         alignment_annotation_id: CASE
             WHEN related_m1 IS NOT NULL THEN ann.id
             ELSE source_ann.id
@@ -630,10 +833,26 @@ RETURN m.id AS manifestation_id
     WHERE related_m.id <> $manifestation_id
 
     RETURN DISTINCT {{
-        manifestation: {Queries.manifestation_fragment('related_m')},
-        expression: {Queries.expression_fragment('related_e')},
+        manifestation: {Queries.manifestation_fragment('related_m', RELATED_INSTANCE_FIELDS["manifestation"])},
+        expression: {Queries.expression_fragment('related_e', RELATED_INSTANCE_FIELDS["expression"])},
         alignment_annotation_id: null
     }} as related_instance
+""",
+    "set_base_text_generation": """
+MATCH (m:Manifestation {id: $manifestation_id})
+SET m.previous_base_text_generation = m.base_text_generation,
+    m.base_text_generation = $generation
+RETURN m.id AS manifestation_id
+""",
+    "reset_base_text_generation": """
+MATCH (m:Manifestation {id: $manifestation_id})
+SET m.base_text_generation = $generation,
+    m.previous_base_text_generation = null
+RETURN m.id AS manifestation_id
+""",
+    "get_base_text_generations": """
+MATCH (m:Manifestation {id: $manifestation_id})
+RETURN m.base_text_generation AS generation, m.previous_base_text_generation AS previous_generation
 """,
     "get_expression_ids_by_manifestation_ids": """
 MATCH (m:Manifestation)-[:MANIFESTATION_OF]->(e:Expression)
@@ -643,7 +862,7 @@ RETURN m.id as manifestation_id, e.id as expression_id
     "get_manifestations_metadata_by_ids": f"""
 MATCH (m:Manifestation)
 WHERE m.id IN $manifestation_ids
-RETURN m.id as manifestation_id, {Queries.manifestation_fragment('m')} as metadata
+RETURN m.id as manifestation_id, {Queries.projection('manifestation', 'm')} as metadata
 """,
     "cleanup_for_update": """
     MATCH (m:Manifestation {id: $manifestation_id})
@@ -692,27 +911,27 @@ RETURN m.id as manifestation_id, {Queries.manifestation_fragment('m')} as metada
         CREATE (m)-[:HAS_SOURCE]->(s)
     )
 """,
-    "get_annotation_segment_ids": """
-        MATCH (m:Manifestation {id: $manifestation_id})
+    "get_annotation_segment_ids": f"""
+        MATCH (m:Manifestation {{id: $manifestation_id}})
 
         // 1. Get search_segmentation segment IDs
         OPTIONAL MATCH (m)<-[:ANNOTATION_OF]-(search_ann:Annotation)
-            -[:HAS_TYPE]->(:AnnotationType {name: 'search_segmentation'})
+        WHERE {Queries.stored_annotation_type('search_ann')} = 'search_segmentation'
         OPTIONAL MATCH (search_ann)<-[:SEGMENTATION_OF]-(search_seg:Segment)
         WITH m, collect(DISTINCT search_seg.id) AS search_segmentation_ids
 
         // 2. Get segmentation/pagination segment IDs
-        OPTIONAL MATCH (m)<-[:ANNOTATION_OF]-(seg_ann:Annotation)-[:HAS_TYPE]->(seg_at:AnnotationType)
-        WHERE seg_at.name IN ['segmentation', 'pagination']
+        OPTIONAL MATCH (m)<-[:ANNOTATION_OF]-(seg_ann:Annotation)
+        WHERE {Queries.stored_annotation_type('seg_ann')} IN ['segmentation', 'pagination']
         OPTIONAL MATCH (seg_ann)<-[:SEGMENTATION_OF]-(seg_segment:Segment)
         WITH search_segmentation_ids, collect(DISTINCT seg_segment.id) AS segmentation_ids
 
         RETURN search_segmentation_ids, segmentation_ids
     """,
-    "delete_segmentation_and_pagination": """
-        MATCH (m:Manifestation {id: $manifestation_id})
-        OPTIONAL MATCH (m)<-[:ANNOTATION_OF]-(ann:Annotation)-[:HAS_TYPE]->(at:AnnotationType)
-        WHERE at.name IN ['segmentation', 'pagination']
+    "delete_segmentation_and_pagination": f"""
+        MATCH (m:Manifestation {{id: $manifestation_id}})
+        OPTIONAL MATCH (m)<-[:ANNOTATION_OF]-(ann:Annotation)
+        WHERE {Queries.stored_annotation_type('ann')} IN ['segmentation', 'pagination']
         OPTIONAL MATCH (ann)<-[:SEGMENTATION_OF]-(seg:Segment)
         OPTIONAL MATCH (seg)-[:HAS_REFERENCE]->(ref:Reference)
         WITH collect(DISTINCT ref) AS refs,
@@ -722,30 +941,30 @@ RETURN m.id as manifestation_id, {Queries.manifestation_fragment('m')} as metada
         FOREACH (s IN segs | DETACH DELETE s)
         FOREACH (a IN anns | DETACH DELETE a)
     """,
-    "delete_search_segmentation": """
-        MATCH (m:Manifestation {id: $manifestation_id})
+    "delete_search_segmentation": f"""
+        MATCH (m:Manifestation {{id: $manifestation_id}})
         OPTIONAL MATCH (m)<-[:ANNOTATION_OF]-(ann:Annotation)
-            -[:HAS_TYPE]->(:AnnotationType {name: 'search_segmentation'})
+        WHERE {Queries.stored_annotation_type('ann')} = 'search_segmentation'
         OPTIONAL MATCH (ann)<-[:SEGMENTATION_OF]-(seg:Segment)
         WITH collect(DISTINCT seg) AS segs,
              collect(DISTINCT ann) AS anns
         FOREACH (s IN segs | DETACH DELETE s)
         FOREACH (a IN anns | DETACH DELETE a)
     """,
-    "delete_bibliography_annotations": """
-        MATCH (m:Manifestation {id: $manifestation_id})
+    "delete_bibliography_annotations": f"""
+        MATCH (m:Manifestation {{id: $manifestation_id}})
         OPTIONAL MATCH (m)<-[:ANNOTATION_OF]-(bib_ann:Annotation)
-            -[:HAS_TYPE]->(:AnnotationType {name: 'bibliography'})
+        WHERE {Queries.stored_annotation_type('bib_ann')} = 'bibliography'
         OPTIONAL MATCH (bib_ann)<-[:SEGMENTATION_OF]-(bib_seg:Segment)
         WITH collect(DISTINCT bib_seg) AS segs,
              collect(DISTINCT bib_ann) AS anns
         FOREACH (s IN segs | DETACH DELETE s)
         FOREACH (a IN anns | DETACH DELETE a)
     """,
-    "delete_toc_annotations": """
-        MATCH (m:Manifestation {id: $manifestation_id})
+    "delete_toc_annotations": f"""
+        MATCH (m:Manifestation {{id: $manifestation_id}})
         OPTIONAL MATCH (m)<-[:ANNOTATION_OF]-(toc_ann:Annotation)
-            -[:HAS_TYPE]->(:AnnotationType {name: 'table_of_contents'})
+        WHERE {Queries.stored_annotation_type('toc_ann')} = 'table_of_contents'
         OPTIONAL MATCH (toc_ann)<-[:SECTION_OF]-(section:Section)
         OPTIONAL MATCH (section)<-[:PART_OF]-(seg_in_section:Segment)
         WITH collect(DISTINCT seg_in_section) AS segs,
@@ -755,10 +974,10 @@ RETURN m.id as manifestation_id, {Queries.manifestation_fragment('m')} as metada
         FOREACH (sec IN sections | DETACH DELETE sec)
         FOREACH (a IN anns | DETACH DELETE a)
     """,
-    "delete_durchen_annotations": """
-        MATCH (m:Manifestation {id: $manifestation_id})
+    "delete_durchen_annotations": f"""
+        MATCH (m:Manifestation {{id: $manifestation_id}})
         OPTIONAL MATCH (m)<-[:ANNOTATION_OF]-(durchen_ann:Annotation)
-            -[:HAS_TYPE]->(:AnnotationType {name: 'durchen'})
+        WHERE {Queries.stored_annotation_type('durchen_ann')} = 'durchen'
         OPTIONAL MATCH (durchen_ann)<-[:SEGMENTATION_OF]-(durchen_seg:Segment)
         OPTIONAL MATCH (durchen_seg)-[:HAS_DURCHEN_NOTE]->(durchen_note:DurchenNote)
         WITH collect(DISTINCT durchen_note) AS notes,
@@ -768,10 +987,10 @@ RETURN m.id as manifestation_id, {Queries.manifestation_fragment('m')} as metada
         FOREACH (s IN segs | DETACH DELETE s)
         FOREACH (a IN anns | DETACH DELETE a)
     """,
-    "delete_alignment_annotations": """
-        MATCH (m:Manifestation {id: $manifestation_id})
+    "delete_alignment_annotations": f"""
+        MATCH (m:Manifestation {{id: $manifestation_id}})
         OPTIONAL MATCH (m)<-[:ANNOTATION_OF]-(this_align_ann:Annotation)
-            -[:HAS_TYPE]->(:AnnotationType {name: 'alignment'})
+        WHERE {Queries.stored_annotation_type('this_align_ann')} = 'alignment'
         OPTIONAL MATCH (this_align_ann)-[:ALIGNED_TO]-(other_align_ann:Annotation)
         OPTIONAL MATCH (this_align_ann)<-[:SEGMENTATION_OF]-(this_align_seg:Segment)
         OPTIONAL MATCH (other_align_ann)<-[:SEGMENTATION_OF]-(other_align_seg:Segment)
@@ -806,7 +1025,7 @@ MERGE (at:AnnotationType {name: $type})
 WITH m, at
 OPTIONAL MATCH (target:Annotation {id: $aligned_to_id})
 
-CREATE (a:Annotation {id: $annotation_id})-[:HAS_TYPE]->(at),
+CREATE (a:Annotation {id: $annotation_id, type: $type})-[:HAS_TYPE]->(at),
        (a)-[:ANNOTATION_OF]->(m)
 
 CALL (*) {
@@ -815,13 +1034,50 @@ CALL (*) {
 
 RETURN a.id AS annotation_id
 """,
-    "get_annotation_type": """
-MATCH (a:Annotation {id: $annotation_id})-[:HAS_TYPE]->(at:AnnotationType)
-RETURN at.name as annotation_type
+    "fetch_by_id": f"""
+MATCH (a:Annotation {{id: $annotation_id}})
+WITH a, {Queries.stored_annotation_type('a')} AS annotation_type
+CALL (a, annotation_type) {{
+    WHEN annotation_type = 'alignment' AND EXISTS {{ (a)-[:ALIGNED_TO]->(:Annotation) }} THEN {{
+        MATCH (a)-[:ALIGNED_TO]->(target:Annotation)
+        WITH a, target
+        LIMIT 1
+        RETURN {{
+            alignment_annotation: {Queries.annotation_segments('a')},
+            target_annotation: {Queries.annotation_segments('target')}
+        }} AS data
+    }}
+    WHEN annotation_type = 'table_of_contents' THEN {{
+        RETURN COLLECT {{
+            MATCH (a)<-[:SECTION_OF]-(sec:Section)
+            WITH sec
+            ORDER BY sec.title
+            RETURN {{id: sec.id, title: sec.title, segments: [(seg:Segment)-[:PART_OF]->(sec) | seg.id]}}
+        }} AS data
+    }}
+    WHEN annotation_type = 'durchen' THEN {{
+        RETURN COLLECT {{
+            MATCH (a)<-[:SEGMENTATION_OF]-(s:Segment)-[:HAS_DURCHEN_NOTE]->(n:DurchenNote)
+            RETURN DISTINCT {{id: s.id, span: {{start: s.span_start, end: s.span_end}}, note: n.note}}
+        }} AS data
+    }}
+    ELSE {{
+        RETURN {Queries.annotation_segments('a')} AS data
+    }}
+}}
+RETURN annotation_type AS type, data
+""",
+    "get_annotation_type": f"""
+MATCH (a:Annotation {{id: $annotation_id}})
+RETURN {Queries.stored_annotation_type('a')} as annotation_type
 """,
-    "get_aligned_annotation": """
-MATCH (a:Annotation {id: $annotation_id})-[:ALIGNED_TO]->(target_ann:Annotation)
-RETURN target_ann.id as aligned_to_id
+    "backfill_types": """
+MATCH (a:Annotation)-[:HAS_TYPE]->(at:AnnotationType)
+WHERE a.type IS NULL
+CALL (a, at) {
+    SET a.type = at.name
+} IN TRANSACTIONS OF 1000 ROWS
+RETURN count(a) AS updated
 """,
     "get_alignment_pair": """
 MATCH (a:Annotation {id: $annotation_id})
@@ -838,35 +1094,12 @@ MATCH (target:Annotation {id: $target_annotation_id})
 OPTIONAL MATCH (source)-[aligned:ALIGNED_TO]-(target)
 DELETE aligned
 DETACH DELETE source, target
-""",
-    "get_segments": """
-MATCH (a:Annotation {id: $annotation_id})
-<-[:SEGMENTATION_OF]-(s:Segment)
-OPTIONAL MATCH (s)-[:HAS_REFERENCE]->(r:Reference)
-OPTIONAL MATCH (s)-[:HAS_TYPE]->(bt:BibliographyType)
-OPTIONAL MATCH (s)-[:ALIGNED_TO]->(aligned_seg:Segment)
-WITH s, r, bt, collect(aligned_seg.id) as aligned_segments
-RETURN s.id as id,
-       s.span_start as start,
-       s.span_end as end,
-       r.name as reference,
-       bt.name as bibliography_type,
-       aligned_segments
-ORDER BY s.span_start
 """,
     "get_annotation_segments": """
     MATCH (a:Annotation {id: $annotation_id})
     <-[:SEGMENTATION_OF]-(s:Segment)
     RETURN s.id as id, s.span_start as start, s.span_end as end
     ORDER BY s.span_start
-""",
-    "get_sections": """
-MATCH (a:Annotation {id: $annotation_id})
-<-[:SECTION_OF]-(s:Section)
-OPTIONAL MATCH (seg:Segment)-[:PART_OF]->(s)
-WITH s, collect(seg.id) as segment_ids
-RETURN s.id as id, s.title as title, segment_ids as segments
-ORDER BY s.title
 """,
     "get_alignment_indices": """
 // First, get all target segments ordered by span to establish indices
@@ -886,51 +1119,37 @@ WHERE aligned.id = seg_id
 RETURN segment_index as index
 ORDER BY segment_index
 """,
-    "get_durchen_annotation": """
-MATCH (a:Annotation {id: $annotation_id})<-[:SEGMENTATION_OF]-(s:Segment)-[:HAS_DURCHEN_NOTE]->(n:DurchenNote)
-RETURN DISTINCT
-    s.id as id,
-    s.span_start as span_start,
-    s.span_end as span_end,
-    n.note as note
-""",
-    "get_alignment_pairs_by_manifestation": """
-MATCH (m:Manifestation {id: $manifestation_id})
-MATCH (m)<-[:ANNOTATION_OF]-(a1:Annotation)-[:HAS_TYPE]->(:AnnotationType {name: 'alignment'})
-MATCH (a1)-[:ALIGNED_TO]-(a2:Annotation)
-WITH a1, a2, m.id as manifestation_id
-
-RETURN manifestation_id, a1.id as alignment_1_id, a2.id as alignment_2_id
-""",
-    "get_segmentation_annotation_by_manifestation": """
-MATCH (m:Manifestation {id: $manifestation_id})
-MATCH (m)<-[:ANNOTATION_OF]-(a:Annotation)-[:HAS_TYPE]->(at:AnnotationType)
-WHERE at.name IN ['segmentation', 'pagination']
+    "get_segmentation_annotation_by_manifestation": f"""
+MATCH (m:Manifestation {{id: $manifestation_id}})
+MATCH (m)<-[:ANNOTATION_OF]-(a:Annotation)
+WHERE {Queries.stored_annotation_type('a')} IN ['segmentation', 'pagination']
 WITH a
 LIMIT 1
 OPTIONAL MATCH (a)<-[:SEGMENTATION_OF]-(s:Segment)
-WITH collect(DISTINCT {
+WITH collect(DISTINCT {{
     id: s.id,
     span_start: s.span_start,
     span_end: s.span_end
-}) as segments
+}}) as segments
 RETURN segments
 """,
-    "check_annotation_type_exists": """
-MATCH (m:Manifestation {id: $manifestation_id})<-[:ANNOTATION_OF]-(a:Annotation)
-      -[:HAS_TYPE]->(at:AnnotationType {name: $annotation_type})
+    "check_annotation_type_exists": f"""
+MATCH (m:Manifestation {{id: $manifestation_id}})<-[:ANNOTATION_OF]-(a:Annotation)
+WHERE {Queries.stored_annotation_type('a')} = $annotation_type
 RETURN count(a) > 0 as exists
 """,
-    "check_alignment_relationship_exists": """
-MATCH (source_m:Manifestation {id: $source_manifestation_id})
-MATCH (target_m:Manifestation {id: $target_manifestation_id})
+    "check_alignment_relationship_exists": f"""
+MATCH (source_m:Manifestation {{id: $source_manifestation_id}})
+MATCH (target_m:Manifestation {{id: $target_manifestation_id}})
 
 // Check if source has alignment annotation pointing to target
-OPTIONAL MATCH (source_m)<-[:ANNOTATION_OF]-(source_ann:Annotation)-[:HAS_TYPE]->(:AnnotationType {name: 'alignment'})
+OPTIONAL MATCH (source_m)<-[:ANNOTATION_OF]-(source_ann:Annotation)
+WHERE {Queries.stored_annotation_type('source_ann')} = 'alignment'
 OPTIONAL MATCH (source_ann)-[:ALIGNED_TO]->(target_ann:Annotation)-[:ANNOTATION_OF]->(target_m)
 
 // Check if target has alignment annotation pointing to source
-OPTIONAL MATCH (target_m)<-[:ANNOTATION_OF]-(target_ann2:Annotation)-[:HAS_TYPE]->(:AnnotationType {name: 'alignment'})
+OPTIONAL MATCH (target_m)<-[:ANNOTATION_OF]-(target_ann2:Annotation)
+WHERE {Queries.stored_annotation_type('target_ann2')} = 'alignment'
 OPTIONAL MATCH (target_ann2)-[:ALIGNED_TO]->(source_ann2:Annotation)-[:ANNOTATION_OF]->(source_m)
 
 RETURN (target_ann IS NOT NULL OR source_ann2 IS NOT NULL) as exists
@@ -975,9 +1194,23 @@ DETACH DELETE source_seg, target_seg
 """,
     "create_batch": """
 MATCH (a:Annotation {id: $annotation_id})
+// segments_version keys the annotation's cached segment layer (see segment_intervals.SegmentLayerCache)
+SET a.segments_version = COALESCE(a.segments_version, 0) + 1
+// max_span_length bounds every segment of the annotation; it is only kept while all of them
+// carry annotation_id (see Queries.overlapping_segments)
+SET a.max_span_length = CASE
+    WHEN a.max_span_length IS NOT NULL OR NOT EXISTS { (a)<-[:SEGMENTATION_OF]-(:Segment) }
+    THEN reduce(
+        longest = COALESCE(a.max_span_length, 0),
+        seg IN $segments | CASE WHEN seg.span.end - seg.span.start > longest
+                                THEN seg.span.end - seg.span.start ELSE longest END
+    )
+END
+WITH a
 UNWIND $segments AS seg
 CREATE (s:Segment {
     id: seg.id,
+    annotation_id: a.id,
     span_start: seg.span.start,
     span_end: seg.span.end
 })
@@ -988,15 +1221,6 @@ UNWIND $alignments AS alignment
 MATCH (source:Segment {id: alignment.source_id})
 MATCH (target:Segment {id: alignment.target_id})
 CREATE (source)-[:ALIGNED_TO]->(target)
-""",
-    "find_by_span": """
-MATCH (m:Manifestation {id: $manifestation_id})
-      <-[:ANNOTATION_OF]-(:Annotation)
-      <-[:SEGMENTATION_OF]-(seg:Segment)
-WHERE seg.span_start <= $span_end AND seg.span_end >= $span_start
-RETURN seg.id as segment_id,
-       seg.span_start as span_start,
-       seg.span_end as span_end
 """,
     "find_aligned_segments_outgoing": """
 MATCH (source_seg:Segment {id: $segment_id})-[:ALIGNED_TO]->(target_seg:Segment)
@@ -1021,15 +1245,6 @@ WITH m.id as manifestation_id,
          span_end: source_of_seg.span_end
      }) as segments
 RETURN manifestation_id, segments
-""",
-    "get_aligned_segments": """
-MATCH (a1:Annotation {id: $alignment_1_id})<-[:SEGMENTATION_OF]-(s1:Segment)
-WHERE s1.span_start < $span_end AND s1.span_end > $span_start
-MATCH (s1)-[:ALIGNED_TO]-(s2:Segment)
-RETURN DISTINCT s2.id as segment_id,
-       s2.span_start as span_start,
-       s2.span_end as span_end
-ORDER BY s2.span_start
 """,
     "get_by_id": """
 MATCH (seg:Segment {id: $segment_id})
@@ -1049,25 +1264,46 @@ RETURN seg.id as segment_id,
        seg.span_start as span_start,
        seg.span_end as span_end
 ORDER BY seg.id
+""",
+    "backfill_span_index": """
+MATCH (a:Annotation)
+WHERE a.max_span_length IS NULL AND EXISTS { (a)<-[:SEGMENTATION_OF]-(:Segment) }
+CALL (a) {
+    MATCH (a)<-[:SEGMENTATION_OF]-(s:Segment)
+    SET s.annotation_id = a.id
+    WITH a, max(s.span_end - s.span_start) AS longest
+    SET a.max_span_length = longest
+} IN TRANSACTIONS OF 10 ROWS
+RETURN count(a) AS updated
 """,
     "update_segmentation_spans_batch": """
 UNWIND $segments AS seg
 MATCH (s:Segment {id: seg.id})
 SET s.span_start = seg.span_start,
     s.span_end = seg.span_end
-RETURN count(s) as updated_count
+WITH collect(s) AS updated
+// Keep max_span_length an upper bound of the segment lengths in its annotation (it stays NULL
+// until backfilled), and move the annotation to a new segments_version
+CALL (updated) {
+    UNWIND updated AS s
+    MATCH (s)-[:SEGMENTATION_OF]->(a:Annotation)
+    WITH a, max(s.span_end - s.span_start) AS longest
+    SET a.max_span_length = CASE WHEN longest > a.max_span_length THEN longest ELSE a.max_span_length END,
+        a.segments_version = COALESCE(a.segments_version, 0) + 1
+    RETURN collect(a.id) AS annotation_ids
+}
+RETURN size(updated) as updated_count, annotation_ids
 """,
-    "find_related_alignment_only": """
-MATCH (source_manif:Manifestation {id: $manifestation_id})
+    "find_related_alignment_only": f"""
+MATCH (source_manif:Manifestation {{id: $manifestation_id}})
       <-[:ANNOTATION_OF]-(align_annot:Annotation)
-      -[:HAS_TYPE]->(at:AnnotationType {name: 'alignment'})
-MATCH (align_annot)<-[:SEGMENTATION_OF]-(source_seg:Segment)
-WHERE source_seg.span_start < $span_end AND source_seg.span_end > $span_start
+WHERE {Queries.stored_annotation_type('align_annot')} = 'alignment'
+{Queries.overlapping_segments('align_annot', 'source_seg', '$span_start', '$span_end')}
 
 // Follow bidirectional ALIGNED_TO relationships
 MATCH (source_seg)-[:ALIGNED_TO]-(target_seg:Segment)
 MATCH (target_seg)-[:SEGMENTATION_OF]->(target_align_annot:Annotation)
-      -[:HAS_TYPE]->(tat:AnnotationType {name: 'alignment'})
+WHERE {Queries.stored_annotation_type('target_align_annot')} = 'alignment'
 MATCH (target_align_annot)-[:ANNOTATION_OF]->(target_manif:Manifestation)
 MATCH (target_manif)-[:MANIFESTATION_OF]->(target_expr:Expression)
 
@@ -1076,85 +1312,131 @@ WITH target_manif, target_expr, COLLECT(DISTINCT target_seg) as target_segments
 RETURN
     target_manif.id as manifestation_id,
     target_expr.id as expression_id,
-    [seg IN target_segments | {
+    [seg IN target_segments | {{
         id: seg.id,
         span_start: seg.span_start,
         span_end: seg.span_end
-    }] as segments
-""",
-    "find_related_with_transfer": """
-// Step 1: Find overlapping segments in source segmentation annotation
-MATCH (source_manif:Manifestation {id: $manifestation_id})
-      <-[:ANNOTATION_OF]-(source_seg_annot:Annotation)
-      -[:HAS_TYPE]->(sat:AnnotationType {name: 'segmentation'})
-MATCH (source_seg_annot)<-[:SEGMENTATION_OF]-(source_seg_seg:Segment)
-WHERE source_seg_seg.span_start < $span_end AND source_seg_seg.span_end > $span_start
-
-WITH source_manif,
-     MIN(source_seg_seg.span_start) as expanded_start,
-     MAX(source_seg_seg.span_end) as expanded_end
-
-// Step 2: Find ALL alignment annotations in source manifestation
-MATCH (source_manif)<-[:ANNOTATION_OF]-(source_align_annot:Annotation)
-      -[:HAS_TYPE]->(aat:AnnotationType {name: 'alignment'})
-MATCH (source_align_annot)<-[:SEGMENTATION_OF]-(source_align_seg:Segment)
-WHERE source_align_seg.span_start < expanded_end AND source_align_seg.span_end > expanded_start
-
-// Step 3: Follow ALIGNED_TO to target alignment segments
+    }}] as segments
+""",
+    "find_related_alignment_spans": f"""
+// Aligned target segment spans per target manifestation for get_segment_related(transform=True),
+// which maps them onto the target segmentation layers in memory
+MATCH (source_manif:Manifestation {{id: $manifestation_id}})
+      <-[:ANNOTATION_OF]-(source_align_annot:Annotation)
+WHERE {Queries.stored_annotation_type('source_align_annot')} = 'alignment'
+{Queries.overlapping_segments('source_align_annot', 'source_align_seg', '$span_start', '$span_end')}
+
+// Follow bidirectional ALIGNED_TO relationships
 MATCH (source_align_seg)-[:ALIGNED_TO]-(target_align_seg:Segment)
 MATCH (target_align_seg)-[:SEGMENTATION_OF]->(target_align_annot:Annotation)
-      -[:HAS_TYPE]->(taat:AnnotationType {name: 'alignment'})
+WHERE {Queries.stored_annotation_type('target_align_annot')} = 'alignment'
 MATCH (target_align_annot)-[:ANNOTATION_OF]->(target_manif:Manifestation)
 MATCH (target_manif)-[:MANIFESTATION_OF]->(target_expr:Expression)
 
-// Step 4: Find overlapping segments in target segmentation annotation
-MATCH (target_manif)<-[:ANNOTATION_OF]-(target_seg_annot:Annotation)
-      -[:HAS_TYPE]->(tsat:AnnotationType {name: 'segmentation'})
-MATCH (target_seg_annot)<-[:SEGMENTATION_OF]-(target_seg_seg:Segment)
-WHERE target_seg_seg.span_start < target_align_seg.span_end AND target_seg_seg.span_end > target_align_seg.span_start
-
-// Step 5: Collect and group by target manifestation
-WITH target_manif, target_expr, COLLECT(DISTINCT target_seg_seg) as target_segments
+WITH target_manif, target_expr,
+     COLLECT(DISTINCT [target_align_seg.span_start, target_align_seg.span_end]) as spans
 
 RETURN
     target_manif.id as manifestation_id,
     target_expr.id as expression_id,
-    [seg IN target_segments | {
-        id: seg.id,
-        span_start: seg.span_start,
-        span_end: seg.span_end
-    }] as segments
-""",
-    "get_related_segments": """
-MATCH (a1:Annotation {id: $alignment_1_id})<-[:SEGMENTATION_OF]-(s1:Segment)
-WHERE s1.span_start < $span_end AND s1.span_end > $span_start
+    spans,
+    COLLECT {{
+        MATCH (target_manif)<-[:ANNOTATION_OF]-(a:Annotation)
+        WHERE {Queries.stored_annotation_type('a')} = 'segmentation'
+        RETURN {{annotation_id: a.id, segments_version: COALESCE(a.segments_version, 0)}}
+    }} as annotations
+""",
+    "get_related_segments": f"""
+MATCH (a1:Annotation {{id: $alignment_1_id}})
+{Queries.overlapping_segments('a1', 's1', '$span_start', '$span_end')}
 MATCH (s1)-[:ALIGNED_TO]-(s2:Segment)
 RETURN DISTINCT s2.id as segment_id,
        s2.span_start as span_start,
        s2.span_end as span_end
 ORDER BY s2.span_start
 """,
-    "get_overlapping_segments": """
-MATCH (m:Manifestation {id: $manifestation_id})<-[:ANNOTATION_OF]-(ann:Annotation)
-      -[:HAS_TYPE]->(:AnnotationType {name: 'segmentation'})
-MATCH (ann)<-[:SEGMENTATION_OF]-(s:Segment)
-WHERE s.span_start < $span_end AND s.span_end > $span_start
-RETURN s.id as segment_id,
-       s.span_start as span_start,
-       s.span_end as span_end
-ORDER BY s.span_start
-""",
-    "get_overlapping_segments_batch": """
-UNWIND $segment_ids AS input_segment_id
-MATCH (input_seg:Segment {id: input_segment_id})
-      -[:SEGMENTATION_OF]->(input_ann:Annotation)
-      -[:ANNOTATION_OF]->(m:Manifestation)
-MATCH (seg_ann:Annotation)-[:HAS_TYPE]->(:AnnotationType {name: 'segmentation'})
-MATCH (seg_ann)-[:ANNOTATION_OF]->(m)
-MATCH (seg:Segment)-[:SEGMENTATION_OF]->(seg_ann)
-WHERE seg.span_start < input_seg.span_end AND seg.span_end > input_seg.span_start
-RETURN input_segment_id,
-       collect(seg.id) as overlapping_segments
+    "get_aligned_segments_by_frontier": f"""
+// One BFS level of _get_related_segments: for every frontier item, each alignment pair of its
+// manifestation with the segments aligned to the item's span (pairs without any are left out)
+UNWIND range(0, size($frontier) - 1) AS idx
+WITH idx, $frontier[idx] AS item
+MATCH (:Manifestation {{id: item.manifestation_id}})<-[:ANNOTATION_OF]-(a1:Annotation)
+WHERE {Queries.stored_annotation_type('a1')} = 'alignment'
+MATCH (a1)-[:ALIGNED_TO]-(a2:Annotation)-[:ANNOTATION_OF]->(m2:Manifestation)
+{Queries.overlapping_segments('a1', 's1', 'item.span_start', 'item.span_end')}
+MATCH (s1)-[:ALIGNED_TO]-(s2:Segment)
+WITH DISTINCT idx, a1, a2, m2, s2
+ORDER BY idx, s2.span_start, s2.span_end, s2.id
+WITH idx, a1, a2, m2, collect({{
+    segment_id: s2.id,
+    span: {{start: s2.span_start, end: s2.span_end}}
+}}) AS segments
+RETURN idx,
+       a1.id AS alignment_1_id,
+       a2.id AS alignment_2_id,
+       m2.id AS manifestation_id,
+       segments
+ORDER BY idx, alignment_1_id, alignment_2_id
+""",
+    "get_overlapping_segments_by_spans": f"""
+UNWIND range(0, size($spans) - 1) AS idx
+WITH idx, $spans[idx] AS item
+MATCH (:Manifestation {{id: item.manifestation_id}})<-[:ANNOTATION_OF]-(ann:Annotation)
+WHERE {Queries.stored_annotation_type('ann')} = 'segmentation'
+{Queries.overlapping_segments('ann', 's', 'item.span_start', 'item.span_end')}
+WITH idx, s
+ORDER BY idx, s.span_start, s.span_end, s.id
+RETURN idx, collect({{segment_id: s.id, span: {{start: s.span_start, end: s.span_end}}}}) AS segments
+""",
+    "get_alignment_layers": f"""
+// Every alignment annotation of the manifestations with its pairs and its segment links, for
+// walking segments-relation in memory
+UNWIND $manifestation_ids AS manifestation_id
+MATCH (:Manifestation {{id: manifestation_id}})<-[:ANNOTATION_OF]-(a1:Annotation)
+WHERE {Queries.stored_annotation_type('a1')} = 'alignment'
+MATCH (a1)-[:ALIGNED_TO]-(a2:Annotation)-[:ANNOTATION_OF]->(m2:Manifestation)
+WITH manifestation_id, a1, collect({{alignment_2_id: a2.id, manifestation_id: m2.id}}) AS pairs
+RETURN manifestation_id,
+       a1.id AS alignment_1_id,
+       pairs,
+       COLLECT {{
+           MATCH (a1)<-[:SEGMENTATION_OF]-(s1:Segment)-[:ALIGNED_TO]-(s2:Segment)
+           RETURN [s1.span_start, s1.span_end, s2.id, s2.span_start, s2.span_end]
+       }} AS links
+""",
+    "get_segmentation_layers": f"""
+UNWIND $manifestation_ids AS manifestation_id
+MATCH (:Manifestation {{id: manifestation_id}})<-[:ANNOTATION_OF]-(a:Annotation)
+      <-[:SEGMENTATION_OF]-(s:Segment)
+WHERE {Queries.stored_annotation_type('a')} = 'segmentation'
+RETURN manifestation_id, collect([s.id, s.span_start, s.span_end]) AS segments
+""",
+    "get_segment_layer_versions": f"""
+MATCH (:Manifestation {{id: $manifestation_id}})<-[:ANNOTATION_OF]-(a:Annotation)
+WHERE $types IS NULL OR {Queries.stored_annotation_type('a')} IN $types
+RETURN a.id AS annotation_id, COALESCE(a.segments_version, 0) AS segments_version
+""",
+    "get_segment_layer_versions_by_segments": f"""
+UNWIND $segment_ids AS segment_id
+MATCH (seg:Segment {{id: segment_id}})-[:SEGMENTATION_OF]->(:Annotation)-[:ANNOTATION_OF]->(m:Manifestation)
+RETURN segment_id,
+       seg.span_start AS span_start,
+       seg.span_end AS span_end,
+       COLLECT {{
+           MATCH (m)<-[:ANNOTATION_OF]-(a:Annotation)
+           WHERE {Queries.stored_annotation_type('a')} = 'segmentation'
+           RETURN {{annotation_id: a.id, segments_version: COALESCE(a.segments_version, 0)}}
+       }} AS annotations
+""",
+    "get_segment_layers": """
+UNWIND $annotation_ids AS annotation_id
+MATCH (a:Annotation {id: annotation_id})
+RETURN annotation_id,
+       COALESCE(a.segments_version, 0) AS segments_version,
+       COLLECT {
+           MATCH (a)<-[:SEGMENTATION_OF]-(s:Segment)
+           RETURN [s.id, s.span_start, s.span_end]
+       } AS segments
 """,
 }
 
@@ -1309,3 +1591,18 @@ RETURN at.name AS name
 ORDER BY name ASC
 """,
 }
+
+# Fragment and label each group's query templates project through a `Queries.projection` slot
+PROJECTED_FRAGMENTS = {
+    "expressions": ("expression", "e"),
+    "manifestations": ("manifestation", "m"),
+    "persons": ("person", "person"),
+}
+# The templates are kept for Neo4JDatabase to narrow to requested fields; the groups hold them fully projected
+QUERY_TEMPLATES = {
+    group: {name: query for name, query in getattr(Queries, group).items() if Queries.projection(*projection) in query}
+    for group, projection in PROJECTED_FRAGMENTS.items()
+}
+for _group, _templates in QUERY_TEMPLATES.items():
+    for _name, _template in _templates.items():
+        getattr(Queries, _group)[_name] = Queries.with_fields(_template, *PROJECTED_FRAGMENTS[_group])
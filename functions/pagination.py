@@ -0,0 +1,46 @@
+import base64
+import binascii
+import json
+
+from exceptions import InvalidRequest
+
+
+def encode_cursor(last_id: str) -> str:
+    """Opaque cursor pointing after the row with id `last_id`."""
+    return base64.urlsafe_b64encode(json.dumps({"after": last_id}).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Return the id a cursor points after; the empty cursor starts at the first page.
+
+    Raises InvalidRequest for cursors that were not produced by `encode_cursor`.
+    """
+    if not cursor:
+        return ""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        after = data["after"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError) as e:
+        raise InvalidRequest("Invalid cursor") from e
+    if not isinstance(after, str):
+        raise InvalidRequest("Invalid cursor")
+    return after
+
+
+def next_cursor(ids: list[str], limit: int) -> str | None:
+    """Cursor for the page after one that returned `ids`, or None if that page was the last."""
+    return encode_cursor(ids[-1]) if ids and len(ids) == limit else None
+
+
+def cursor_from_args(args) -> str | None:
+    """
+    Id to page after for the request's `cursor` parameter, or None for offset pagination.
+
+    `cursor=` (empty) requests the first page in cursor mode.
+    """
+    if (cursor := args.get("cursor")) is None:
+        return None
+    if "offset" in args:
+        raise InvalidRequest("Use either offset or cursor, not both")
+    return decode_cursor(cursor)
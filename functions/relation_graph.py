@@ -0,0 +1,138 @@
+"""
+Per-worker cache of the TRANSLATION_OF/COMMENTARY_OF relations between expressions.
+
+Relation lookups only ever reach the connected component of the expression they start from. Each
+expression stores its component as Expression.relation_group, set when it is created and indexed
+as expression_relation_group, so a component is fetched with one indexed query even by a cold
+worker. Expressions created before relation groups existed are found by traversing their
+relations until scripts/backfill_relation_groups.py has grouped them.
+"""
+
+import threading
+
+from models import ExpressionModelInput, TextType
+
+# Relationship written from a new expression to its target, per expression type
+_RELATIONSHIP_OF = {TextType.TRANSLATION: "TRANSLATION_OF", TextType.COMMENTARY: "COMMENTARY_OF"}
+
+
+class RelationGraph:
+    """
+    Thread-safe snapshot of the TRANSLATION_OF/COMMENTARY_OF graph between expressions.
+
+    The snapshot holds the connected components (relation groups) looked up so far. Each one is
+    fetched with a single query on the indexed Expression.relation_group, and maps every member
+    to its relations ({"type", "direction", "otherId"}). The snapshot is versioned by the
+    RelationsVersion counter, which every relation write increments in its own transaction and
+    which is read on every lookup: a mismatch means another worker wrote, and drops every cached
+    component. Relations created in this worker are added to their cached component when they
+    advanced the counter by exactly one, so no other write can have been missed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._relations: dict[str, list[dict]] = {}
+        self._component_of: dict[str, str] = {}
+        self._members: dict[str, set[str]] = {}
+        self._version: int | None = None
+        self.loads = 0
+        self.incremental_updates = 0
+
+    def component(self, db, expression_id: str) -> dict[str, list[dict]] | None:
+        """Relations of every expression connected to `expression_id`, or None if it does not exist."""
+        return self.components(db, [expression_id])[expression_id]
+
+    def components(self, db, expression_ids: list[str]) -> dict[str, dict[str, list[dict]] | None]:
+        """
+        `component` of each of `expression_ids` after a single version check. Each component is
+        fetched at most once, and connected expressions share the same returned dict.
+
+        Missing components are fetched without holding the lock, and only cached if no relation
+        was written in the meantime. A version older than the cached one (read by a request that
+        raced a newer one) never replaces it.
+        """
+        version = db.get_expression_relations_version()
+        components: dict[str, dict[str, list[dict]]] = {}
+        result = {}
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._relations, self._component_of, self._members = {}, {}, {}
+                self._version = version
+            for expression_id in expression_ids:
+                if (group := self._component_of.get(expression_id)) is not None:
+                    if group not in components:
+                        components[group] = {member: self._relations[member] for member in self._members[group]}
+                    result[expression_id] = components[group]
+
+        fetched: dict[str, dict[str, list[dict]]] = {}
+        for expression_id in expression_ids:
+            if expression_id in result or any(expression_id in relations for relations in fetched.values()):
+                continue
+            if (component := db.get_expression_relation_component(expression_id)) is None:
+                result[expression_id] = None
+                continue
+            group, relations = component
+            fetched[group] = relations
+        if not fetched:
+            return result
+
+        with self._lock:
+            self.loads += len(fetched)
+            if self._version == version:
+                for group, relations in fetched.items():
+                    self._relations.update(relations)
+                    self._component_of.update(dict.fromkeys(relations, group))
+                    self._members[group] = set(relations)
+        for relations in fetched.values():
+            result.update(dict.fromkeys((e for e in expression_ids if e in relations), relations))
+        return result
+
+    def add_expression(
+        self, expression_id: str, expression: ExpressionModelInput, relations_version: int | None
+    ) -> None:
+        """
+        Record an expression committed by this worker, linking it to its target if it has one.
+        `relations_version` is the version its relationship advanced the counter to, None when it
+        has none (standalone expressions change no relations and are fetched on lookup).
+        """
+        relationship = _RELATIONSHIP_OF.get(expression.type)
+        if relations_version is None or relationship is None:
+            return
+        with self._lock:
+            # Another worker wrote in between: the next lookup sees the newer version and reloads
+            if self._version is None or relations_version != self._version + 1 or expression_id in self._relations:
+                return
+            # Components that are not cached are fetched whole on their first lookup
+            if (group := self._component_of.get(expression.target)) is not None:
+                self._relations[expression_id] = [
+                    {"type": relationship, "direction": "out", "otherId": expression.target}
+                ]
+                # Copied, not appended to: lists handed out by `components` may be read concurrently
+                self._relations[expression.target] = [
+                    *self._relations[expression.target],
+                    {"type": relationship, "direction": "in", "otherId": expression_id},
+                ]
+                self._component_of[expression_id] = group
+                self._members[group].add(expression_id)
+            self._version = relations_version
+            self.incremental_updates += 1
+
+    def clear(self) -> None:
+        """Drop the snapshot; lookups fetch components again."""
+        with self._lock:
+            self._relations, self._component_of, self._members = {}, {}, {}
+            self._version = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self._version,
+                "expressions": len(self._relations),
+                "components": len(self._members),
+                "loads": self.loads,
+                "incremental_updates": self.incremental_updates,
+            }
+
+
+# Shared by every request in the worker
+relation_graph = RelationGraph()
@@ -0,0 +1,79 @@
+"""
+In-memory segment layers for span lookups.
+
+Span lookups on segment layers run against a per-worker copy of each annotation's segments
+instead of Neo4j. Neo4j only answers which annotations an instance has and their
+Annotation.segments_version, which every segment create or span update increments, so a layer
+written by another worker is reloaded on its next lookup. Annotations without a version count as
+version 0.
+"""
+
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+
+from lru import SizedLRUCache
+
+
+class SegmentIntervals:
+    """
+    Spans of a segment layer as parallel arrays sorted by start, with a value per span. Spans
+    sharing a start are ordered by end, then value, as the segment queries order them by id.
+
+    Overlap lookups binary-search the starts between `start - max_length` and `end`, the same
+    bound the segment_annotation_span index is sought with (see Queries.overlapping_segments).
+    """
+
+    def __init__(self, spans: Iterable[tuple[int, int, object]]) -> None:
+        ordered = sorted(spans)
+        self.starts = array("q", (start for start, _, _ in ordered))
+        self.ends = array("q", (end for _, end, _ in ordered))
+        self.values: list = [value for _, _, value in ordered]
+        self.max_length = max((end - start for start, end, _ in ordered), default=0)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _overlapping(self, start: int, end: int, inclusive: bool) -> list[int]:
+        first = bisect_left(self.starts, start - self.max_length)
+        if inclusive:
+            last = bisect_right(self.starts, end, lo=first)
+            return [i for i in range(first, last) if self.ends[i] >= start]
+        last = bisect_left(self.starts, end, lo=first)
+        return [i for i in range(first, last) if self.ends[i] > start]
+
+    def overlapping(self, start: int, end: int, inclusive: bool = False) -> list:
+        """
+        Values of the spans overlapping [start, end), or [start, end] when `inclusive` (spans that
+        only touch it also count), in start order.
+        """
+        return [self.values[i] for i in self._overlapping(start, end, inclusive)]
+
+    def overlapping_spans(self, start: int, end: int, inclusive: bool = False) -> list[tuple[object, int, int]]:
+        """(value, start, end) of the spans `overlapping` would return."""
+        return [(self.values[i], self.starts[i], self.ends[i]) for i in self._overlapping(start, end, inclusive)]
+
+
+class SegmentLayerCache(SizedLRUCache):
+    """
+    Thread-safe LRU of annotation segment layers (SegmentIntervals of segment IDs), bounded by the
+    total number of segments.
+
+    Entries are keyed by (annotation_id, segments_version). Every segment write through
+    Neo4JDatabase bumps Annotation.segments_version, so a layer changed by another instance is
+    never read from a stale entry.
+    """
+
+    def __init__(self, max_segments: int) -> None:
+        super().__init__(max_segments, "segments")
+
+    def put(self, key: tuple[str, int], intervals: SegmentIntervals) -> None:  # pylint: disable=arguments-differ
+        super().put(key, intervals, len(intervals))
+
+    def invalidate(self, *annotation_ids: str) -> None:
+        self.invalidate_where(lambda key: key[0] in annotation_ids)
+
+
+# Shared by every request in the worker
+segment_layers = SegmentLayerCache(max_segments=int(os.environ.get("SEGMENT_LAYER_CACHE_MAX_SEGMENTS", "500000")))
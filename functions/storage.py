@@ -1,110 +1,643 @@
+"""
+Base-text storage on top of a StorageBackend (see storage_backends.default_backend).
+
+Base texts are stored either as one blob per manifestation (monolithic) or, with
+BASE_TEXT_LAYOUT=chunked, as fixed-size chunks plus a manifest.json listing each chunk's code
+point offset and generation. Range reads fetch only the covering bytes: a monolithic text through
+its offset index (the .idx blob next to it, tagged with the text generation it was built for), a
+chunked one through the overlapping chunks. Reads never write an index; texts without a current
+one are downloaded in full.
+
+The codec of each blob (BASE_TEXT_COMPRESSION) is recorded in its metadata, and per chunk in the
+manifest, so texts written under different settings stay readable and rollbacks restore the codec
+with the content. Compressed monolithic texts have no offset index.
+
+Each Manifestation records the generation of its base text and the one it replaced. Writes are
+conditioned on the recorded generation, and a failed graph update rolls the text back to the
+replaced generation under the same precondition instead of listing every version of the object.
+Decoded texts are cached per worker, keyed by generation, so a read costs one metadata request.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
 import logging
-import tempfile
-from pathlib import Path
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
 
-from firebase_admin import storage
-from google.cloud.storage.blob import Blob
+from exceptions import DataConflict
+from lru import SizedLRUCache
+from storage_backends import GenerationMismatch, StorageBackend, StoredObject, default_backend
 
 logger = logging.getLogger(__name__)
 
+MONOLITHIC_LAYOUT = "monolithic"
+CHUNKED_LAYOUT = "chunked"
+
+# Codecs a stored blob may use; the choice is recorded per blob in its "compression" metadata.
+NO_COMPRESSION = "none"
+COMPRESSIONS = (NO_COMPRESSION, "gzip", "zstd")
+# Content-Encoding public readers are served blobs with, so gzip blobs are decoded by browsers and
+# GCS transcoding; zstd has none browsers decode, so zstd blobs are not made public. Internal reads
+# use raw downloads, which bypass transcoding, so byte sizes and ranges refer to the stored bytes.
+PUBLIC_CONTENT_ENCODINGS = {NO_COMPRESSION: None, "gzip": "gzip"}
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        import zstandard  # pylint: disable=import-outside-toplevel
+
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def decompress(data: bytes | memoryview, compression: str | None) -> bytes | memoryview:
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        import zstandard  # pylint: disable=import-outside-toplevel
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+# Code points between two entries of a base text's byte offset index
+OFFSET_INDEX_STRIDE = 1024
+
+
+class OffsetIndex:
+    """
+    Sparse map from code point positions to UTF-8 byte offsets in a stored base text.
+
+    offsets[i] is the byte offset of code point i * stride, so any span can be turned into a
+    byte range that over-reads by at most one stride on each side.
+    """
+
+    def __init__(self, offsets: array, stride: int, chars: int, size: int) -> None:
+        self.offsets = offsets
+        self.stride = stride
+        self.chars = chars
+        self.size = size
+
+    @classmethod
+    def build(cls, text: str, stride: int = OFFSET_INDEX_STRIDE) -> OffsetIndex:
+        offsets = array("Q", [0])
+        position = 0
+        for start in range(0, len(text), stride):
+            position += len(text[start : start + stride].encode("utf-8"))
+            offsets.append(position)
+        return cls(offsets, stride, len(text), position)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | memoryview, stride: int, chars: int) -> OffsetIndex:
+        offsets = array("Q")
+        offsets.frombytes(data)
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        return cls(offsets, stride, chars, offsets[-1])
+
+    def to_bytes(self) -> bytes:
+        offsets = array("Q", self.offsets)
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        return offsets.tobytes()
+
+    def byte_range(self, start: int, end: int) -> tuple[int, int, int]:
+        """Return (first_byte, end_byte, first_char) covering code points [start, end)."""
+        first = start // self.stride
+        last = min(-(-end // self.stride), len(self.offsets) - 1)
+        return self.offsets[first], self.offsets[last], first * self.stride
+
+
+class ChunkManifest:
+    """
+    Layout of a chunked base text: ordered chunks with their code point offsets and generations.
+
+    Chunks are read at the generation recorded here, so restoring an older manifest generation
+    restores the text it describes.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, chunk_chars: int, chunks: list[dict], next_id: int) -> None:
+        self.chunk_chars = chunk_chars
+        self.chunks = chunks
+        self.next_id = next_id
+
+    @property
+    def chars(self) -> int:
+        return self.chunks[-1]["start"] + self.chunks[-1]["chars"] if self.chunks else 0
+
+    @classmethod
+    def from_json(cls, data: bytes | memoryview) -> ChunkManifest:
+        manifest = json.loads(bytes(data))
+        return cls(manifest["chunk_chars"], manifest["chunks"], manifest["next_id"])
+
+    def to_json(self) -> bytes:
+        return json.dumps(
+            {
+                "format": self.FORMAT,
+                "chunk_chars": self.chunk_chars,
+                "chars": self.chars,
+                "next_id": self.next_id,
+                "chunks": self.chunks,
+            }
+        ).encode("utf-8")
+
+    def split(self, text: str) -> list[str]:
+        """Cut text into chunk-sized pieces; an edited region up to two chunks long stays whole."""
+        if len(text) <= 2 * self.chunk_chars:
+            return [text] if text else []
+        return [text[i : i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+
+    def overlapping(self, start: int, end: int) -> tuple[int, int]:
+        """Return the [first, last) chunk positions holding code points [start, end)."""
+        if end <= start or not self.chunks:
+            return 0, 0
+        starts = [chunk["start"] for chunk in self.chunks]
+        return max(bisect_right(starts, start) - 1, 0), bisect_left(starts, end)
+
+    def affected(self, start: int, end: int) -> tuple[int, int]:
+        """Like overlapping(), but an insertion at start == end still targets the chunk holding start."""
+        if not self.chunks:
+            return 0, 0
+        starts = [chunk["start"] for chunk in self.chunks]
+        first = max(bisect_right(starts, start) - 1, 0)
+        return first, min(max(bisect_left(starts, end), first + 1), len(self.chunks))
+
+    def copy(self) -> ChunkManifest:
+        return ChunkManifest(self.chunk_chars, [dict(chunk) for chunk in self.chunks], self.next_id)
+
+    def replace(self, first: int, last: int, chunks: list[dict]) -> None:
+        """Swap chunks [first, last) for new ones and recompute every start offset after them."""
+        self.chunks[first:last] = chunks
+        position = self.chunks[first - 1]["start"] + self.chunks[first - 1]["chars"] if first else 0
+        for chunk in self.chunks[first:]:
+            chunk["start"] = position
+            position += chunk["chars"]
+
+
+class BaseTextCache(SizedLRUCache):
+    """
+    Thread-safe LRU of decoded base-text data, bounded by the total size of the stored bytes.
+
+    Entries are keyed by (expression_id, manifestation_id, generation). A new blob generation
+    therefore never hits a stale entry, even when another instance wrote it.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(max_bytes, "bytes")
+
+    def invalidate(self, expression_id: str, manifestation_id: str) -> None:
+        self.invalidate_where(lambda key: key[:2] == (expression_id, manifestation_id))
+
+
+# Shared by every Storage instance in the worker
+base_text_cache = BaseTextCache(max_bytes=int(os.environ.get("BASE_TEXT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+offset_index_cache = BaseTextCache(max_bytes=8 * 1024 * 1024)
+chunk_manifest_cache = BaseTextCache(max_bytes=4 * 1024 * 1024)
+
 
 class Storage:
-    def __init__(self) -> None:
-        self.bucket = storage.bucket()
+    def __init__(self, layout: str | None = None, backend: StorageBackend | None = None) -> None:
+        self.backend = backend or default_backend()
+        # Layout for new texts; existing texts keep theirs until migrated
+        self.layout = layout or os.environ.get("BASE_TEXT_LAYOUT", MONOLITHIC_LAYOUT)
+        self.chunk_chars = int(os.environ.get("BASE_TEXT_CHUNK_CHARS", "65536"))
+        # Codec for newly written blobs; existing blobs are read with the codec they were written with
+        self.compression = os.environ.get("BASE_TEXT_COMPRESSION", NO_COMPRESSION)
+        if self.compression not in COMPRESSIONS:
+            raise ValueError(f"BASE_TEXT_COMPRESSION must be one of {', '.join(COMPRESSIONS)}")
+
+    def store_base_text(
+        self, expression_id: str, manifestation_id: str, base_text: str, if_generation_match: int | None = None
+    ) -> int:
+        """
+        Write a new version of the base text and return its generation.
 
-    def store_base_text(self, expression_id: str, manifestation_id: str, base_text: str) -> str:
-        # Write base_text to temp file for streaming upload
-        temp_dir = Path(tempfile.gettempdir())
-        temp_file = temp_dir / f"{expression_id}_{manifestation_id}.txt"
+        The generation is what the Manifestation records (see `rollback_base_text`). With
+        if_generation_match the write only succeeds while that generation is still live.
+        """
+        if (self._existing_layout(expression_id, manifestation_id) or self.layout) == CHUNKED_LAYOUT:
+            return self._store_chunked(expression_id, manifestation_id, base_text, if_generation_match)
 
-        try:
-            temp_file.write_text(base_text, encoding="utf-8")
+        path = Storage._base_text_path(expression_id, manifestation_id)
+        raw = base_text.encode("utf-8")
+        stored = self._upload(
+            path, compress(raw, self.compression), expression_id, manifestation_id, if_generation_match
+        )
+        logger.info("Uploaded base text to storage: %s (generation %s)", path, stored.generation)
+
+        base_text_cache.invalidate(expression_id, manifestation_id)
+        offset_index_cache.invalidate(expression_id, manifestation_id)
+        base_text_cache.put((expression_id, manifestation_id, stored.generation), base_text, len(raw))
+        # Byte ranges cannot be read out of a compressed blob, so it gets no offset index
+        if self.compression == NO_COMPRESSION:
+            self._store_offset_index(expression_id, manifestation_id, stored.generation, OffsetIndex.build(base_text))
 
-            blob = self._blob(Storage._base_text_path(expression_id, manifestation_id))
-            blob.upload_from_filename(str(temp_file))
-            logger.info("Uploaded base text to storage: %s", blob.public_url)
-            blob.make_public()
+        return stored.generation
 
-            return blob.public_url
-        finally:
-            # Clean up temp file
-            if temp_file.exists():
-                temp_file.unlink()
+    def _upload(
+        self,
+        path: str,
+        data: bytes,
+        expression_id: str,
+        manifestation_id: str,
+        if_generation_match: int | None = None,
+    ) -> StoredObject:
+        # Uploaded straight from memory: no temp file copy on the (memory-backed) /tmp
+        metadata = {"compression": self.compression} if self.compression != NO_COMPRESSION else None
+        try:
+            stored = self.backend.write(
+                path,
+                data,
+                content_type="text/plain; charset=utf-8",
+                metadata=metadata,
+                if_generation_match=if_generation_match,
+                public=self.compression in PUBLIC_CONTENT_ENCODINGS,
+                content_encoding=PUBLIC_CONTENT_ENCODINGS.get(self.compression),
+            )
+        except GenerationMismatch as e:
+            raise DataConflict(
+                f"Base text {expression_id}/{manifestation_id} was modified concurrently; retry the update"
+            ) from e
+        logger.info("Uploaded %s bytes for %s/%s", len(data), expression_id, manifestation_id)
+        return stored
 
     def delete_base_text(self, expression_id: str, manifestation_id: str) -> None:
+        base_text_cache.invalidate(expression_id, manifestation_id)
+        offset_index_cache.invalidate(expression_id, manifestation_id)
+        if self._existing_layout(expression_id, manifestation_id) == CHUNKED_LAYOUT:
+            for stored in self.backend.list(Storage._chunk_prefix(expression_id, manifestation_id)):
+                self.backend.delete(stored.path)
+            logger.info("Deleted chunked base text: %s/%s", expression_id, manifestation_id)
+            return
+        self.backend.delete(Storage._offset_index_path(expression_id, manifestation_id))
         self._delete(Storage._base_text_path(expression_id, manifestation_id))
 
-    def rollback_base_text(self, expression_id: str, manifestation_id: str) -> None:
-        self._rollback(Storage._base_text_path(expression_id, manifestation_id))
+    def rollback_base_text(
+        self,
+        expression_id: str,
+        manifestation_id: str,
+        generation: int | None = None,
+        previous_generation: int | None = None,
+    ) -> int | None:
+        """
+        Restore the version of the base text that preceded `generation` and return the new live generation.
+
+        Pass the generations recorded on the Manifestation: the previous version is then copied
+        back directly, on the condition that `generation` is still live (DataConflict otherwise).
+        Without them the object's versions are listed to find the previous one, which gets
+        slower as the edit history grows. Returns None when there is no previous version.
+        """
+        base_text_cache.invalidate(expression_id, manifestation_id)
+        offset_index_cache.invalidate(expression_id, manifestation_id)
+        if self._existing_layout(expression_id, manifestation_id) == CHUNKED_LAYOUT:
+            path = Storage._manifest_path(expression_id, manifestation_id)
+        else:
+            path = Storage._base_text_path(expression_id, manifestation_id)
+
+        if generation is None:
+            restored_generation = self._rollback(path)
+        elif previous_generation is None:
+            logger.warning("No previous version available to rollback for: %s", path)
+            return None
+        else:
+            restored_generation = self._restore(path, expression_id, manifestation_id, generation, previous_generation)
+        # The offset index carries the generation it was built for, so the restored text needs its own
+        if restored_generation is not None:
+            self.index_base_text(expression_id, manifestation_id)
+        return restored_generation
+
+    def _restore(
+        self, path: str, expression_id: str, manifestation_id: str, generation: int, previous_generation: int
+    ) -> int:
+        try:
+            restored = self.backend.restore(path, previous_generation, if_generation_match=generation)
+        except GenerationMismatch as e:
+            raise DataConflict(
+                f"Base text {expression_id}/{manifestation_id} changed since generation {generation}"
+            ) from e
+        logger.info(
+            "Rolled back %s from generation %s to previous generation %s (new generation %s)",
+            path,
+            generation,
+            previous_generation,
+            restored.generation,
+        )
+        return restored.generation
+
+    def index_base_text(self, expression_id: str, manifestation_id: str) -> bool:
+        """
+        Write the offset index of the live base text unless it already has a current one.
+
+        Returns whether an index was written. Chunked and compressed texts get none (their
+        range reads do not use it).
+        """
+        layout, stored = self._resolve(expression_id, manifestation_id)
+        if layout == CHUNKED_LAYOUT or stored.metadata.get("compression") is not None:
+            return False
+        if self._load_offset_index(expression_id, manifestation_id, stored.generation) is not None:
+            return False
+
+        text = self.retrieve_base_text(expression_id, manifestation_id)
+        self._store_offset_index(expression_id, manifestation_id, stored.generation, OffsetIndex.build(text))
+        return True
 
     def base_text_exists(self, expression_id: str, manifestation_id: str) -> bool:
-        return self._file_exists(Storage._base_text_path(expression_id, manifestation_id))
+        return self._existing_layout(expression_id, manifestation_id) is not None
+
+    def base_text_generation(self, expression_id: str, manifestation_id: str) -> int:
+        """Return the live generation of the base text, i.e. what `store_base_text` last returned."""
+        _, stored = self._resolve(expression_id, manifestation_id)
+        return stored.generation
+
+    def convert_to_chunked(self, expression_id: str, manifestation_id: str) -> bool:
+        """Rewrite a monolithic base text in the chunked layout. Returns False if it already was chunked."""
+        layout, _ = self._resolve(expression_id, manifestation_id)
+        if layout == CHUNKED_LAYOUT:
+            return False
+
+        text = self.retrieve_base_text(expression_id, manifestation_id)
+        self._store_chunked(expression_id, manifestation_id, text)
+        self.backend.delete(Storage._base_text_path(expression_id, manifestation_id))
+        self.backend.delete(Storage._offset_index_path(expression_id, manifestation_id))
+        logger.info("Converted base text %s/%s to the chunked layout", expression_id, manifestation_id)
+        return True
 
     @staticmethod
     def _base_text_path(expression_id: str, manifestation_id: str) -> str:
         return f"base_texts/{expression_id}/{manifestation_id}.txt"
 
-    def _blob(self, path: str) -> Blob:
-        blob = self.bucket.blob(path)
-        blob.cache_control = "no-store"
+    @staticmethod
+    def _chunk_prefix(expression_id: str, manifestation_id: str) -> str:
+        return f"base_texts/{expression_id}/{manifestation_id}/"
 
-        return blob
+    @staticmethod
+    def _manifest_path(expression_id: str, manifestation_id: str) -> str:
+        return f"{Storage._chunk_prefix(expression_id, manifestation_id)}manifest.json"
 
-    def _delete(self, storage_path: str) -> None:
-        blob = self.bucket.blob(storage_path)
-        blob.delete()
-        logger.info("Rolled back: %s", blob.name)
+    @staticmethod
+    def _chunk_path(expression_id: str, manifestation_id: str, name: str) -> str:
+        return f"{Storage._chunk_prefix(expression_id, manifestation_id)}chunks/{name}.txt"
+
+    def _existing_layout(self, expression_id: str, manifestation_id: str) -> str | None:
+        if self.backend.exists(Storage._base_text_path(expression_id, manifestation_id)):
+            return MONOLITHIC_LAYOUT
+        if self.backend.exists(Storage._manifest_path(expression_id, manifestation_id)):
+            return CHUNKED_LAYOUT
+        return None
+
+    def _resolve(self, expression_id: str, manifestation_id: str) -> tuple[str, StoredObject]:
+        """Return the layout of a stored text and its top-level object (the text or its manifest)."""
+        path = Storage._base_text_path(expression_id, manifestation_id)
+        if (stored := self.backend.stat(path)) is not None:
+            return MONOLITHIC_LAYOUT, stored
+        if (stored := self.backend.stat(Storage._manifest_path(expression_id, manifestation_id))) is not None:
+            return CHUNKED_LAYOUT, stored
+        raise FileNotFoundError(f"File not found in storage: {path}")
+
+    def _load_manifest(self, expression_id: str, manifestation_id: str, stored: StoredObject) -> ChunkManifest:
+        key = (expression_id, manifestation_id, stored.generation)
+        if (cached := chunk_manifest_cache.get(key)) is not None:
+            return cached
+
+        data = self.backend.read(stored.path, stored.generation)
+        manifest = ChunkManifest.from_json(data)
+        chunk_manifest_cache.put(key, manifest, len(data))
+        return manifest
+
+    def _write_manifest(
+        self, expression_id: str, manifestation_id: str, manifest: ChunkManifest, if_generation_match: int | None
+    ) -> int:
+        data = manifest.to_json()
+        try:
+            stored = self.backend.write(
+                Storage._manifest_path(expression_id, manifestation_id),
+                data,
+                content_type="application/json",
+                if_generation_match=if_generation_match,
+                public=True,
+            )
+        except GenerationMismatch as e:
+            raise DataConflict(
+                f"Base text {expression_id}/{manifestation_id} was modified concurrently; retry the update"
+            ) from e
+
+        chunk_manifest_cache.put((expression_id, manifestation_id, stored.generation), manifest, len(data))
+        return stored.generation
+
+    def _upload_chunks(
+        self, expression_id: str, manifestation_id: str, names: list[str], pieces: list[str]
+    ) -> list[dict]:
+        compression = self.compression
+        metadata = {"compression": compression} if compression != NO_COMPRESSION else None
+
+        def upload(name: str, piece: str) -> dict:
+            stored = self.backend.write(
+                Storage._chunk_path(expression_id, manifestation_id, name),
+                compress(piece.encode("utf-8"), compression),
+                content_type="text/plain; charset=utf-8",
+                metadata=metadata,
+                public=compression in PUBLIC_CONTENT_ENCODINGS,
+                content_encoding=PUBLIC_CONTENT_ENCODINGS.get(compression),
+            )
+            chunk = {"name": name, "start": 0, "chars": len(piece), "generation": stored.generation}
+            if compression != NO_COMPRESSION:
+                # Chunks are read by generation without a metadata request, so the manifest carries the codec
+                chunk["compression"] = compression
+            return chunk
+
+        return self._map_chunks(upload, names, pieces)
 
-    def _rollback(self, storage_path: str) -> None:
-        self.bucket.reload()
+    def _delete_chunks(self, expression_id: str, manifestation_id: str, names: list[str]) -> None:
+        for name in names:
+            self.backend.delete(Storage._chunk_path(expression_id, manifestation_id, name))
+
+    def _download_chunks(self, expression_id: str, manifestation_id: str, chunks: list[dict]) -> list[str]:
+        def download(chunk: dict) -> str:
+            path = Storage._chunk_path(expression_id, manifestation_id, chunk["name"])
+            data = self.backend.read(path, chunk["generation"])
+            return str(decompress(data, chunk.get("compression")), "utf-8")
+
+        return self._map_chunks(download, chunks)
+
+    @staticmethod
+    def _map_chunks(func, *iterables) -> list:
+        items = list(zip(*iterables))
+        if len(items) <= 1:
+            return [func(*item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(len(items), 8)) as executor:
+            return list(executor.map(lambda item: func(*item), items))
+
+    def _fetch_chunked_ranges(
+        self, expression_id: str, manifestation_id: str, stored: StoredObject, spans: list[tuple[int, int]]
+    ) -> list[str]:
+        manifest = self._load_manifest(expression_id, manifestation_id, stored)
+        if any(start < 0 or end < 0 for start, end in spans):
+            text = self.retrieve_base_text(expression_id, manifestation_id)
+            return [text[start:end] for start, end in spans]
+
+        low = min(min(start, manifest.chars) for start, _ in spans)
+        high = max(min(end, manifest.chars) for _, end in spans)
+        first, last = manifest.overlapping(low, high)
+        if first == last:
+            return ["" for _ in spans]
+
+        window = "".join(self._download_chunks(expression_id, manifestation_id, manifest.chunks[first:last]))
+        first_char = manifest.chunks[first]["start"]
+        return [window[start - first_char : end - first_char] for start, end in spans]
+
+    def _store_chunked(
+        self, expression_id: str, manifestation_id: str, base_text: str, if_generation_match: int | None = None
+    ) -> int:
+        manifest = ChunkManifest(self.chunk_chars, [], 0)
+        pieces = [base_text[i : i + self.chunk_chars] for i in range(0, len(base_text), self.chunk_chars)]
+        names = [f"{i:06d}" for i in range(len(pieces))]
+        manifest.next_id = len(pieces)
+        manifest.replace(0, 0, self._upload_chunks(expression_id, manifestation_id, names, pieces))
+
+        generation = self._write_manifest(expression_id, manifestation_id, manifest, if_generation_match)
+        logger.info("Uploaded chunked base text %s/%s (%s chunks)", expression_id, manifestation_id, len(pieces))
+        # A shorter text leaves chunks of the previous one behind; older manifests read them by generation
+        self._delete_chunks(
+            expression_id,
+            manifestation_id,
+            [
+                name
+                for stored in self.backend.list(f"{Storage._chunk_prefix(expression_id, manifestation_id)}chunks/")
+                if (name := stored.path.rsplit("/", 1)[1].removesuffix(".txt")) >= f"{manifest.next_id:06d}"
+            ],
+        )
+
+        base_text_cache.invalidate(expression_id, manifestation_id)
+        base_text_cache.put(
+            (expression_id, manifestation_id, generation), base_text, sum(len(p.encode("utf-8")) for p in pieces)
+        )
+        return generation
+
+    def _update_chunked_range(
+        self, expression_id: str, manifestation_id: str, stored: StoredObject, start: int, end: int, new_content: str
+    ) -> int:
+        """Rewrite only the chunks touched by [start, end) and publish them with a new manifest."""
+        # Cached manifests are shared, so edit a copy
+        manifest = self._load_manifest(expression_id, manifestation_id, stored).copy()
+        start, end = min(max(start, 0), manifest.chars), min(max(end, 0), manifest.chars)
+        first, last = manifest.affected(start, end)
+        affected = manifest.chunks[first:last]
+
+        region_start = affected[0]["start"] if affected else 0
+        region = "".join(self._download_chunks(expression_id, manifestation_id, affected))
+        region = region[: start - region_start] + new_content + region[end - region_start :]
+
+        pieces = manifest.split(region)
+        names = [chunk["name"] for chunk in affected][: len(pieces)]
+        while len(names) < len(pieces):
+            names.append(f"{manifest.next_id:06d}")
+            manifest.next_id += 1
+
+        manifest.replace(first, last, self._upload_chunks(expression_id, manifestation_id, names, pieces))
+        generation = self._write_manifest(
+            expression_id, manifestation_id, manifest, if_generation_match=stored.generation
+        )
+        # Chunks the edited region no longer needs
+        self._delete_chunks(expression_id, manifestation_id, [chunk["name"] for chunk in affected][len(pieces) :])
 
-        versions = [
-            blob for blob in self.bucket.list_blobs(prefix=storage_path, versions=True) if blob.name == storage_path
-        ]
+        base_text_cache.invalidate(expression_id, manifestation_id)
+        logger.info("Updated chunks %s-%s of base text %s/%s", first, last, expression_id, manifestation_id)
+        return generation
 
-        if not versions:
+    @staticmethod
+    def _offset_index_path(expression_id: str, manifestation_id: str) -> str:
+        return f"base_texts/{expression_id}/{manifestation_id}.idx"
+
+    def _store_offset_index(
+        self, expression_id: str, manifestation_id: str, generation: int, index: OffsetIndex
+    ) -> None:
+        self.backend.write(
+            Storage._offset_index_path(expression_id, manifestation_id),
+            index.to_bytes(),
+            content_type="application/octet-stream",
+            metadata={"text_generation": str(generation), "stride": str(index.stride), "chars": str(index.chars)},
+        )
+        offset_index_cache.put((expression_id, manifestation_id, generation), index, len(index.offsets) * 8)
+
+    def _load_offset_index(self, expression_id: str, manifestation_id: str, generation: int) -> OffsetIndex | None:
+        """Return the offset index built for this text generation, or None if it is missing or stale."""
+        key = (expression_id, manifestation_id, generation)
+        if (cached := offset_index_cache.get(key)) is not None:
+            return cached
+
+        stored = self.backend.stat(Storage._offset_index_path(expression_id, manifestation_id))
+        if stored is None or stored.metadata.get("text_generation") != str(generation):
+            return None
+
+        data = self.backend.read(stored.path, stored.generation)
+        index = OffsetIndex.from_bytes(data, int(stored.metadata["stride"]), int(stored.metadata["chars"]))
+        offset_index_cache.put(key, index, len(index.offsets) * 8)
+        return index
+
+    def _delete(self, storage_path: str) -> None:
+        self.backend.delete(storage_path)
+        logger.info("Rolled back: %s", storage_path)
+
+    def _rollback(self, storage_path: str) -> int | None:
+        generations = self.backend.generations(storage_path)
+
+        if not generations:
             raise FileNotFoundError(f"File not found in storage: {storage_path}")
 
-        if len(versions) < 2:
+        if len(generations) < 2:
             logger.warning("No previous version available to rollback for: %s", storage_path)
-            return
+            return None
 
-        versions.sort(key=lambda b: int(b.generation), reverse=True)
-        current_version = versions[0]
-        previous_version = versions[1]
-
-        restored_blob = self.bucket.copy_blob(previous_version, self.bucket, storage_path)
+        current_generation, previous_generation = generations[-1], generations[-2]
+        restored = self.backend.restore(storage_path, previous_generation)
 
         logger.info(
             "Rolled back %s from generation %s to previous generation %s (new generation %s)",
             storage_path,
-            current_version.generation,
-            previous_version.generation,
-            restored_blob.generation,
+            current_generation,
+            previous_generation,
+            restored.generation,
         )
+        return restored.generation
 
-    def _get_file(self, storage_path: str) -> bytes:
-        blob = self.bucket.blob(storage_path)
-        blob.reload()
-
-        if not blob.exists():
-            raise FileNotFoundError(f"File not found in storage: {storage_path}")
+    def _download(self, stored: StoredObject) -> bytes | memoryview:
         logger.info("Retrieving file from storage")
-        file_data = blob.download_as_bytes()
-        logger.info("Retrieved from storage: %s, size: %s", storage_path, len(file_data))
+        file_data = self.backend.read(stored.path, stored.generation)
+        logger.info("Retrieved from storage: %s, size: %s", stored.path, len(file_data))
         return file_data
 
-    def _file_exists(self, storage_path: str) -> bool:
-        return self.bucket.blob(storage_path).exists()
-
     def retrieve_base_text(self, expression_id: str, manifestation_id: str) -> str:
-        """Fetch base text content from Firebase Storage.
+        """Fetch base text content from the storage backend.
 
         Expects the file stored at base_texts/{expression_id}/{manifestation_id}.txt
-        (consistent with existing storage utilities).
+        (consistent with existing storage utilities). Decoded texts are cached per blob
+        generation, so a warm read costs one metadata request.
         """
-        data = self._get_file(Storage._base_text_path(expression_id, manifestation_id))
-        return data.decode("utf-8")
+        layout, stored = self._resolve(expression_id, manifestation_id)
+        key = (expression_id, manifestation_id, stored.generation)
+
+        if (cached := base_text_cache.get(key)) is not None:
+            return cached
+
+        if layout == CHUNKED_LAYOUT:
+            manifest = self._load_manifest(expression_id, manifestation_id, stored)
+            text = "".join(self._download_chunks(expression_id, manifestation_id, manifest.chunks))
+            base_text_cache.put(key, text, len(text.encode("utf-8")))
+            return text
+
+        data = decompress(self._download(stored), stored.metadata.get("compression"))
+        text = str(data, "utf-8")
+        base_text_cache.put(key, text, len(data))
+        return text
 
     def update_base_text_range(
         self,
@@ -113,11 +646,71 @@ class Storage:
         start: int,
         end: int,
         new_content: str,
-    ) -> str:
+        if_generation_match: int | None = None,
+    ) -> int:
+        """
+        Replace [start, end) of the base text and return the new generation.
+
+        The edit is applied to the live version and written on the condition that it is still
+        live, so concurrent edits raise DataConflict instead of overwriting each other. Passing
+        the generation the caller last saw (e.g. the one recorded on the Manifestation) also
+        rejects edits based on an outdated view of the text.
+        """
+        layout, stored = self._resolve(expression_id, manifestation_id)
+        if if_generation_match is not None and stored.generation != if_generation_match:
+            raise DataConflict(
+                f"Base text {expression_id}/{manifestation_id} changed since generation {if_generation_match}"
+            )
+        if layout == CHUNKED_LAYOUT:
+            return self._update_chunked_range(expression_id, manifestation_id, stored, start, end, new_content)
+
         current_text = self.retrieve_base_text(expression_id, manifestation_id)
         updated_text = current_text[:start] + new_content + current_text[end:]
-        return self.store_base_text(expression_id, manifestation_id, updated_text)
+        return self.store_base_text(
+            expression_id, manifestation_id, updated_text, if_generation_match=stored.generation
+        )
 
     def fetch_base_text_range(self, expression_id: str, manifestation_id: str, start: int, end: int) -> str:
-        current_text = self.retrieve_base_text(expression_id, manifestation_id)
-        return current_text[start:end]
\ No newline at end of file
+        return self.fetch_base_text_ranges(expression_id, manifestation_id, [(start, end)])[0]
+
+    def fetch_base_text_ranges(
+        self, expression_id: str, manifestation_id: str, spans: list[tuple[int, int]]
+    ) -> list[str]:
+        """
+        Return the text of each (start, end) code point span.
+
+        Uses a single ranged read covering all spans when the text is not cached and an
+        offset index exists for the current generation. Otherwise the whole text is read; reads
+        never write the index, which `store_base_text` and `rollback_base_text` maintain (see
+        scripts/backfill_offset_indexes.py for texts stored before). Chunked texts only
+        download the chunks overlapping the spans.
+        """
+        layout, stored = self._resolve(expression_id, manifestation_id)
+        if not spans:
+            return []
+
+        text = base_text_cache.get((expression_id, manifestation_id, stored.generation))
+        if text is not None:
+            return [text[start:end] for start, end in spans]
+
+        if layout == CHUNKED_LAYOUT:
+            return self._fetch_chunked_ranges(expression_id, manifestation_id, stored, spans)
+
+        if stored.metadata.get("compression") is not None:
+            text = self.retrieve_base_text(expression_id, manifestation_id)
+            return [text[start:end] for start, end in spans]
+
+        index = self._load_offset_index(expression_id, manifestation_id, stored.generation)
+        if index is None or any(start < 0 or end < 0 for start, end in spans):
+            text = self.retrieve_base_text(expression_id, manifestation_id)
+            return [text[start:end] for start, end in spans]
+
+        low = min(min(start, index.chars) for start, _ in spans)
+        high = max(min(end, index.chars) for _, end in spans)
+        if high <= low:
+            return ["" for _ in spans]
+
+        first_byte, end_byte, first_char = index.byte_range(low, high)
+        window = str(self.backend.read(stored.path, stored.generation, start=first_byte, end=end_byte), "utf-8")
+        logger.info("Range read %s bytes %s-%s", stored.path, first_byte, end_byte)
+        return [window[start - first_char : end - first_char] for start, end in spans]
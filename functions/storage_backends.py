@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from google.cloud.storage.bucket import Bucket
+
+logger = logging.getLogger(__name__)
+
+# Payloads above 8 MiB go through a resumable upload. Without an explicit chunk size the client
+# buffers up to 100 MiB per request, i.e. a second full copy of any base text we store.
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class GenerationMismatch(Exception):
+    """An if_generation_match precondition failed: the object changed since it was read."""
+
+
+class StoredObject:
+    """Metadata of one generation of a stored object."""
+
+    def __init__(self, path: str, generation: int, size: int | None, metadata: dict[str, str] | None) -> None:
+        self.path = path
+        self.generation = generation
+        self.size = size
+        self.metadata = metadata or {}
+
+
+class StorageBackend(ABC):
+    """
+    Versioned object store used by `Storage`.
+
+    Every write creates a new generation; older generations stay readable (the GCS bucket has
+    object versioning enabled) and can be restored. `end` offsets are exclusive.
+    """
+
+    @abstractmethod
+    def stat(self, path: str) -> StoredObject | None:
+        """Return the live generation of `path`, or None if it does not exist."""
+
+    @abstractmethod
+    def read(
+        self, path: str, generation: int | None = None, start: int | None = None, end: int | None = None
+    ) -> bytes | memoryview:
+        """Read bytes [start, end) of `path` at `generation` (the live one if None)."""
+
+    @abstractmethod
+    def write(
+        self,
+        path: str,
+        data: bytes | IO[bytes],
+        content_type: str,
+        metadata: dict[str, str] | None = None,
+        if_generation_match: int | None = None,
+        public: bool = False,
+        content_encoding: str | None = None,
+    ) -> StoredObject:
+        """
+        Store `data` as a new generation of `path`.
+
+        if_generation_match=0 requires that `path` does not exist yet; any other value must
+        equal its live generation. Raises GenerationMismatch otherwise. `content_encoding` is
+        served to public readers; reads through the backend always return the stored bytes.
+        """
+
+    @abstractmethod
+    def delete(self, path: str) -> None:
+        """Remove the live generation of `path`; missing objects are ignored."""
+
+    @abstractmethod
+    def list(self, prefix: str) -> list[StoredObject]:
+        """Return the live objects whose path starts with `prefix`."""
+
+    @abstractmethod
+    def generations(self, path: str) -> list[int]:
+        """Return every stored generation of `path`, oldest first."""
+
+    @abstractmethod
+    def restore(self, path: str, generation: int, if_generation_match: int | None = None) -> StoredObject:
+        """Make a copy of `generation` the new live generation of `path`."""
+
+    @abstractmethod
+    def public_url(self, path: str) -> str:
+        pass
+
+    def exists(self, path: str) -> bool:
+        return self.stat(path) is not None
+
+
+class GcsBackend(StorageBackend):
+    """Firebase Storage (GCS) bucket backend."""
+
+    def __init__(self, bucket: Bucket | None = None) -> None:
+        if bucket is None:
+            # The GCS client is only loaded by requests that actually touch storage.
+            from firebase_admin import storage  # pylint: disable=import-outside-toplevel
+
+            bucket = storage.bucket()
+        self.bucket = bucket
+
+    def stat(self, path: str) -> StoredObject | None:
+        blob = self.bucket.get_blob(path)
+        if blob is None:
+            return None
+        return StoredObject(path, int(blob.generation), blob.size, blob.metadata)
+
+    def read(self, path: str, generation: int | None = None, start: int | None = None, end: int | None = None) -> bytes:
+        if start is not None and end is not None and end <= start:
+            return b""
+        blob = self.bucket.blob(path, generation=generation)
+        # GCS byte ranges are inclusive of the end offset. Raw downloads skip the decompressive
+        # transcoding of gzip-encoded objects, which also ignores ranges
+        return blob.download_as_bytes(start=start, end=None if end is None else end - 1, raw_download=True)
+
+    def write(
+        self,
+        path: str,
+        data: bytes | IO[bytes],
+        content_type: str,
+        metadata: dict[str, str] | None = None,
+        if_generation_match: int | None = None,
+        public: bool = False,
+        content_encoding: str | None = None,
+    ) -> StoredObject:
+        from google.api_core.exceptions import PreconditionFailed  # pylint: disable=import-outside-toplevel
+
+        blob = self.bucket.blob(path)
+        blob.cache_control = "no-store"
+        blob.chunk_size = RESUMABLE_CHUNK_SIZE
+        blob.metadata = metadata
+        blob.content_encoding = content_encoding
+        try:
+            if isinstance(data, bytes):
+                blob.upload_from_string(data, content_type=content_type, if_generation_match=if_generation_match)
+            else:
+                blob.upload_from_file(data, content_type=content_type, if_generation_match=if_generation_match)
+        except PreconditionFailed as e:
+            raise GenerationMismatch(f"{path} changed since generation {if_generation_match}") from e
+        if public:
+            blob.make_public()
+        return StoredObject(path, int(blob.generation), blob.size, metadata)
+
+    def delete(self, path: str) -> None:
+        from google.api_core.exceptions import NotFound  # pylint: disable=import-outside-toplevel
+
+        try:
+            self.bucket.blob(path).delete()
+        except NotFound:
+            pass
+
+    def list(self, prefix: str) -> list[StoredObject]:
+        return [
+            StoredObject(blob.name, int(blob.generation), blob.size, blob.metadata)
+            for blob in self.bucket.list_blobs(prefix=prefix)
+        ]
+
+    def generations(self, path: str) -> list[int]:
+        return sorted(
+            int(blob.generation) for blob in self.bucket.list_blobs(prefix=path, versions=True) if blob.name == path
+        )
+
+    def restore(self, path: str, generation: int, if_generation_match: int | None = None) -> StoredObject:
+        from google.api_core.exceptions import PreconditionFailed  # pylint: disable=import-outside-toplevel
+
+        source = self.bucket.blob(path, generation=generation)
+        try:
+            restored = self.bucket.copy_blob(
+                source, self.bucket, path, source_generation=generation, if_generation_match=if_generation_match
+            )
+        except PreconditionFailed as e:
+            raise GenerationMismatch(f"{path} changed since generation {if_generation_match}") from e
+        return StoredObject(path, int(restored.generation), restored.size, restored.metadata)
+
+    def public_url(self, path: str) -> str:
+        return self.bucket.blob(path).public_url
+
+
+class LocalBackend(StorageBackend):
+    """
+    Versioned object store on the local filesystem, for benchmarks and self-hosted deployments.
+
+    Each object is a directory holding one immutable `<generation>.data` file (plus its
+    `.meta.json`) per write and a `live` file naming the current generation. Reads map the
+    generation file with mmap and return zero-copy memoryview slices. Preconditions are only
+    atomic within one process, which default_backend gives a single backend per root.
+    """
+
+    MAX_OPEN_MAPS = 256
+
+    def __init__(self, root: str | os.PathLike) -> None:
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Generation files never change, so their maps can be reused until evicted.
+        self._maps: OrderedDict[Path, mmap.mmap] = OrderedDict()
+        self._last_generation = 0
+
+    def _object_dir(self, path: str) -> Path:
+        object_dir = (self.root / path).resolve()
+        if self.root not in object_dir.parents:
+            raise ValueError(f"Invalid storage path: {path}")
+        return object_dir
+
+    def _live_generation(self, object_dir: Path) -> int | None:
+        try:
+            return int((object_dir / "live").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def _next_generation(self) -> int:
+        # Microsecond timestamps, like GCS, kept strictly increasing within the process
+        self._last_generation = max(time.time_ns() // 1000, self._last_generation + 1)
+        return self._last_generation
+
+    def _stored_object(self, path: str, object_dir: Path, generation: int) -> StoredObject:
+        meta = json.loads((object_dir / f"{generation}.meta.json").read_text(encoding="utf-8"))
+        return StoredObject(path, generation, meta["size"], meta["metadata"])
+
+    @staticmethod
+    def _replace_atomically(target: Path, write) -> None:
+        with tempfile.NamedTemporaryFile(dir=target.parent, delete=False) as tmp:
+            write(tmp)
+        os.replace(tmp.name, target)
+
+    def _map(self, data_file: Path) -> mmap.mmap | None:
+        with self._lock:
+            if (mapped := self._maps.get(data_file)) is not None:
+                self._maps.move_to_end(data_file)
+                return mapped
+        if data_file.stat().st_size == 0:
+            return None  # empty files cannot be mapped
+        with open(data_file, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with self._lock:
+            self._maps[data_file] = mapped
+            # Evicted maps are closed by the garbage collector once no slice refers to them
+            while len(self._maps) > self.MAX_OPEN_MAPS:
+                self._maps.popitem(last=False)
+        return mapped
+
+    def stat(self, path: str) -> StoredObject | None:
+        object_dir = self._object_dir(path)
+        generation = self._live_generation(object_dir)
+        if generation is None:
+            return None
+        return self._stored_object(path, object_dir, generation)
+
+    def read(
+        self, path: str, generation: int | None = None, start: int | None = None, end: int | None = None
+    ) -> bytes | memoryview:
+        object_dir = self._object_dir(path)
+        generation = generation if generation is not None else self._live_generation(object_dir)
+        data_file = object_dir / f"{generation}.data"
+        if generation is None or not data_file.exists():
+            raise FileNotFoundError(f"File not found in storage: {path}")
+
+        mapped = self._map(data_file)
+        if mapped is None:
+            return b""
+        return memoryview(mapped)[start:end]
+
+    def write(
+        self,
+        path: str,
+        data: bytes | IO[bytes],
+        content_type: str,
+        metadata: dict[str, str] | None = None,
+        if_generation_match: int | None = None,
+        public: bool = False,
+        content_encoding: str | None = None,
+    ) -> StoredObject:
+        object_dir = self._object_dir(path)
+        object_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            live = self._live_generation(object_dir)
+            if if_generation_match is not None and (live or 0) != if_generation_match:
+                raise GenerationMismatch(f"{path} changed since generation {if_generation_match}")
+            generation = self._next_generation()
+
+            data_file = object_dir / f"{generation}.data"
+            with open(data_file, "wb") as f:
+                if isinstance(data, bytes):
+                    f.write(data)
+                else:
+                    shutil.copyfileobj(data, f)
+            size = data_file.stat().st_size
+            meta = {
+                "size": size,
+                "content_type": content_type,
+                "content_encoding": content_encoding,
+                "metadata": metadata or {},
+            }
+            (object_dir / f"{generation}.meta.json").write_text(json.dumps(meta), encoding="utf-8")
+            self._replace_atomically(object_dir / "live", lambda tmp: tmp.write(str(generation).encode()))
+        return StoredObject(path, generation, size, metadata)
+
+    def delete(self, path: str) -> None:
+        # Older generations stay on disk, like noncurrent versions in a versioned bucket
+        (self._object_dir(path) / "live").unlink(missing_ok=True)
+
+    def list(self, prefix: str) -> list[StoredObject]:
+        base = self._object_dir(prefix.rsplit("/", 1)[0]) if "/" in prefix else self.root
+        if not base.is_dir():
+            return []
+        objects = []
+        for live_file in base.rglob("live"):
+            path = live_file.parent.relative_to(self.root).as_posix()
+            if path.startswith(prefix) and (stored := self.stat(path)) is not None:
+                objects.append(stored)
+        return sorted(objects, key=lambda stored: stored.path)
+
+    def generations(self, path: str) -> list[int]:
+        object_dir = self._object_dir(path)
+        if not object_dir.is_dir():
+            return []
+        return sorted(int(data_file.stem) for data_file in object_dir.glob("*.data"))
+
+    def restore(self, path: str, generation: int, if_generation_match: int | None = None) -> StoredObject:
+        object_dir = self._object_dir(path)
+        meta = json.loads((object_dir / f"{generation}.meta.json").read_text(encoding="utf-8"))
+        with open(object_dir / f"{generation}.data", "rb") as f:
+            return self.write(
+                path,
+                f,
+                content_type=meta["content_type"],
+                metadata=meta["metadata"],
+                if_generation_match=if_generation_match,
+                content_encoding=meta.get("content_encoding"),
+            )
+
+    def public_url(self, path: str) -> str:
+        return self._object_dir(path).as_uri()
+
+
+# Local backends by root, shared by every Storage in the process so their lock, generation counter
+# and open maps are too
+_local_backends: dict[Path, LocalBackend] = {}
+_local_backends_lock = threading.Lock()
+
+
+def default_backend() -> StorageBackend:
+    """
+    Backend selected by STORAGE_BACKEND: "gcs" (default) or "local" rooted at LOCAL_STORAGE_ROOT.
+
+    There is one local backend per root and process. GCS backends keep no state of their own (the
+    bucket enforces preconditions), so each call gets a new one.
+    """
+    kind = os.environ.get("STORAGE_BACKEND", "gcs")
+    if kind == "gcs":
+        return GcsBackend()
+    if kind == "local":
+        root = Path(os.environ.get("LOCAL_STORAGE_ROOT", os.path.join(tempfile.gettempdir(), "openpecha"))).resolve()
+        with _local_backends_lock:
+            if (backend := _local_backends.get(root)) is None:
+                backend = _local_backends[root] = LocalBackend(root)
+        return backend
+    raise ValueError("STORAGE_BACKEND must be gcs or local")
@@ -2,7 +2,9 @@
 from unittest.mock import patch
 
 import pytest
+from google.api_core.exceptions import PreconditionFailed
 from main import create_app
+from storage import base_text_cache, chunk_manifest_cache, offset_index_cache
 
 
 class StorageBucket:
@@ -18,15 +20,21 @@ class StorageBucket:
         # Maps path -> list of version dicts: {"generation": int, "data": bytes}
         self._storage: dict[str, list[dict]] = {}
 
-    def blob(self, path: str):
-        # Return a blob pointing at the latest version for this path.
+    def blob(self, path: str, generation: int | None = None):
+        # Return a blob pointing at the latest version for this path, or at a specific generation.
+        if generation is not None:
+            for idx, version in enumerate(self._storage.get(path, [])):
+                if version["generation"] == generation:
+                    return MockBlob(path, self._storage, version_index=idx)
+            raise ValueError(f"Mock StorageBucket has no generation {generation} for {path}")
         return MockBlob(path, self._storage)
 
     def get_blob(self, path: str):
-        # Mimics GCS get_blob, returns None if not found
+        # Mimics GCS get_blob, returns None if not found. Like GCS, the returned blob
+        # is pinned to the generation that was current when it was fetched.
         versions = self._storage.get(path)
         if versions:
-            return MockBlob(path, self._storage)
+            return MockBlob(path, self._storage, version_index=len(versions) - 1)
         return None
 
     def reload(self):
@@ -54,7 +62,9 @@ class StorageBucket:
                 blobs.append(MockBlob(path, self._storage))
         return blobs
 
-    def copy_blob(self, source_blob, destination_bucket, new_name: str):
+    def copy_blob(
+        self, source_blob, destination_bucket, new_name: str, source_generation=None, if_generation_match=None
+    ):  # pylint: disable=unused-argument
         """
         Minimal implementation of Bucket.copy_blob used by rollback logic.
         """
@@ -62,9 +72,12 @@ class StorageBucket:
             # For our tests we only ever copy within the same bucket.
             raise ValueError("Mock StorageBucket only supports copying within the same bucket")
 
+        # Like GCS, the copy keeps the source's custom metadata.
         data = source_blob.download_as_bytes()
         dest_blob = self.blob(new_name)
-        dest_blob.upload_from_string(data)
+        dest_blob.metadata = source_blob.metadata
+        dest_blob.content_encoding = source_blob.content_encoding
+        dest_blob.upload_from_string(data, if_generation_match=if_generation_match)
         return dest_blob
 
 
@@ -81,6 +94,8 @@ class MockBlob:
         self._storage = storage
         self._version_index = version_index
         self.cache_control = None
+        self._metadata = None
+        self._content_encoding = None
 
     # Helper methods -----------------------------------------------------
     def _get_versions(self) -> list[dict]:
@@ -89,20 +104,33 @@ class MockBlob:
     def _append_version(self, data: bytes) -> None:
         versions = self._storage.setdefault(self.path, [])
         next_generation = versions[-1]["generation"] + 1 if versions else 1
-        versions.append({"generation": next_generation, "data": data})
-
-    def _get_data(self) -> bytes:
+        versions.append(
+            {
+                "generation": next_generation,
+                "data": data,
+                "metadata": self._metadata,
+                "content_encoding": self._content_encoding,
+            }
+        )
+
+    def _get_version(self) -> dict | None:
         versions = self._get_versions()
         if not versions:
-            return b""
+            return None
         if self._version_index is None:
-            return versions[-1]["data"]
+            return versions[-1]
         # Clamp to valid range just in case
         idx = max(0, min(self._version_index, len(versions) - 1))
-        return versions[idx]["data"]
+        return versions[idx]
+
+    def _get_data(self) -> bytes:
+        version = self._get_version()
+        return version["data"] if version else b""
 
     # Upload APIs --------------------------------------------------------
-    def upload_from_string(self, data):
+    def upload_from_string(self, data, content_type=None, if_generation_match=None):  # pylint: disable=unused-argument
+        if if_generation_match is not None and (self.generation or 0) != if_generation_match:
+            raise PreconditionFailed(f"Generation mismatch for {self.path}")
         if isinstance(data, str):
             data = data.encode("utf-8")
         self._append_version(data)
@@ -113,17 +141,20 @@ class MockBlob:
             self._append_version(f.read())
         return None
 
-    def upload_from_file(self, file_obj):
-        self._append_version(file_obj.read())
-        return None
+    def upload_from_file(self, file_obj, content_type=None, if_generation_match=None):
+        return self.upload_from_string(file_obj.read(), content_type, if_generation_match)
 
     # Download APIs ------------------------------------------------------
     def download_as_string(self):
         # Returns bytes
         return self._get_data()
 
-    def download_as_bytes(self):
-        return self.download_as_string()
+    def download_as_bytes(self, start=None, end=None, raw_download=False):  # pylint: disable=unused-argument
+        # Like GCS, `end` is inclusive.
+        data = self.download_as_string()
+        if start is None and end is None:
+            return data
+        return data[start or 0 : None if end is None else end + 1]
 
     def download_to_filename(self, filename):
         data = self._get_data()
@@ -152,6 +183,30 @@ class MockBlob:
     def name(self):
         return self.path
 
+    @property
+    def metadata(self):
+        if self._metadata is None and (version := self._get_version()):
+            return version["metadata"]
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value):
+        self._metadata = value
+
+    @property
+    def content_encoding(self):
+        if self._content_encoding is None and (version := self._get_version()):
+            return version.get("content_encoding")
+        return self._content_encoding
+
+    @content_encoding.setter
+    def content_encoding(self, value):
+        self._content_encoding = value
+
+    @property
+    def size(self):
+        return len(self._get_data()) if self._get_versions() else None
+
     @property
     def public_url(self):
         return f"https://mock-storage.example.com/{self.path}"
@@ -175,6 +230,9 @@ class Storage:
 @pytest.fixture(autouse=True)
 def mock_storage():
     mock_storage_bucket = StorageBucket()
+    base_text_cache.clear()
+    offset_index_cache.clear()
+    chunk_manifest_cache.clear()
 
     with patch("firebase_admin.storage.bucket", return_value=mock_storage_bucket):
         yield mock_storage_bucket
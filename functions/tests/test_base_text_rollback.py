@@ -0,0 +1,149 @@
+"""
+Unit tests for undoing base text writes when the graph update that follows them fails, using a
+mocked database and storage.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from exceptions import DataNotFound
+from models import AnnotationType, SegmentModel, SpanModel
+
+INSTANCE_REQUEST = {
+    "content": "Hello world. This is test.",
+    "annotation": [{"span": {"start": 0, "end": 12}}, {"span": {"start": 12, "end": 26}}],
+    "metadata": {"type": "critical", "source": "www.example_source.com"},
+}
+
+
+class TestUpdateInstanceRollback:
+    @patch("api.instances.Storage")
+    @patch("api.instances.Neo4JDatabase")
+    def test_text_is_written_on_the_recorded_generation(self, mock_db_cls, mock_storage_cls, client):
+        db, storage = mock_db_cls.return_value, mock_storage_cls.return_value
+        db.get_expression_id_by_manifestation_id.return_value = "E1"
+        db.get_base_text_generations.return_value = (7, 6)
+        storage.store_base_text.return_value = 8
+
+        with patch("api.instances._trigger_search_segmenter"), patch("api.instances._trigger_delete_search_segments"):
+            response = client.put("/v2/instances/M1", json=INSTANCE_REQUEST)
+
+        assert response.status_code == 200
+        assert storage.store_base_text.call_args.kwargs["if_generation_match"] == 7
+        db.set_base_text_generation.assert_called_once_with(manifestation_id="M1", generation=8)
+        storage.rollback_base_text.assert_not_called()
+
+    @patch("api.instances.Storage")
+    @patch("api.instances.Neo4JDatabase")
+    def test_failed_graph_update_restores_the_previous_text(self, mock_db_cls, mock_storage_cls, client):
+        db, storage = mock_db_cls.return_value, mock_storage_cls.return_value
+        db.get_expression_id_by_manifestation_id.return_value = "E1"
+        db.get_base_text_generations.return_value = (7, 6)
+        db.update_manifestation.side_effect = DataNotFound("Manifestation 'M1' not found")
+        storage.store_base_text.return_value = 8
+        storage.rollback_base_text.return_value = 9
+
+        response = client.put("/v2/instances/M1", json=INSTANCE_REQUEST)
+
+        assert response.status_code == 404
+        storage.rollback_base_text.assert_called_once_with(
+            expression_id="E1", manifestation_id="M1", generation=8, previous_generation=7
+        )
+        db.set_base_text_generation.assert_called_once_with(manifestation_id="M1", generation=9)
+
+    @patch("api.instances.Storage")
+    @patch("api.instances.Neo4JDatabase")
+    def test_untracked_text_is_restored_from_its_versions(self, mock_db_cls, mock_storage_cls, client):
+        db, storage = mock_db_cls.return_value, mock_storage_cls.return_value
+        db.get_expression_id_by_manifestation_id.return_value = "E1"
+        db.get_base_text_generations.return_value = (None, None)
+        db.update_manifestation.side_effect = DataNotFound("Manifestation 'M1' not found")
+        storage.store_base_text.return_value = 8
+        storage.rollback_base_text.return_value = None
+
+        response = client.put("/v2/instances/M1", json=INSTANCE_REQUEST)
+
+        assert response.status_code == 404
+        assert storage.store_base_text.call_args.kwargs["if_generation_match"] is None
+        storage.rollback_base_text.assert_called_once_with(
+            expression_id="E1", manifestation_id="M1", generation=None, previous_generation=None
+        )
+        db.set_base_text_generation.assert_not_called()
+
+
+class TestCreateAlignedTextRollback:
+    @patch("api.instances.Storage")
+    @patch("api.instances.Neo4JDatabase")
+    def test_failed_creation_deletes_the_new_text(self, mock_db_cls, mock_storage_cls, client):
+        db, storage = mock_db_cls.return_value, mock_storage_cls.return_value
+        db.get_manifestation.return_value = (None, "E0")
+        db.create_manifestation.side_effect = DataNotFound("Category not found")
+        storage.store_base_text.return_value = 1
+
+        response = client.post(
+            "/v2/instances/M0/translation",
+            json={
+                "language": "bo",
+                "content": "This is the translated text content",
+                "title": "Translated Title",
+                "source": "Source of the translation",
+                "category_id": "C1",
+                "segmentation": [{"span": {"start": 0, "end": 36}}],
+                "copyright": "Public domain",
+                "license": "CC0",
+            },
+        )
+
+        assert response.status_code == 404
+        (kwargs,) = [c.kwargs for c in storage.delete_base_text.call_args_list]
+        assert kwargs["expression_id"] == storage.store_base_text.call_args.kwargs["expression_id"]
+        storage.rollback_base_text.assert_not_called()
+
+
+class TestUpdateSegmentContentRollback:
+    @staticmethod
+    def mock_segment(db, storage):
+        segment = SegmentModel(id="S1", span=SpanModel(start=0, end=5))
+        db.get_segment.return_value = (segment, "M1", "E1")
+        db.get_base_text_generations.return_value = (7, 6)
+        db.get_manifestation.return_value = (
+            SimpleNamespace(annotations=[SimpleNamespace(id="A1", type=AnnotationType.SEGMENTATION)]),
+            "E1",
+        )
+        db.get_annotation_segments.return_value = [
+            {"id": "S1", "span": {"start": 0, "end": 5}},
+            {"id": "S2", "span": {"start": 5, "end": 11}},
+        ]
+        storage.fetch_base_text_range.return_value = "Hello"
+        storage.update_base_text_range.return_value = 8
+
+    @patch("api.segments.Storage")
+    @patch("api.segments.Neo4JDatabase")
+    def test_spans_are_shifted_in_one_batch(self, mock_db_cls, mock_storage_cls, client):
+        db, storage = mock_db_cls.return_value, mock_storage_cls.return_value
+        self.mock_segment(db, storage)
+
+        response = client.put("/v2/segments/S1/content", json={"content": "Hello there"})
+
+        assert response.status_code == 200
+        assert storage.update_base_text_range.call_args.kwargs["if_generation_match"] == 7
+        db.update_segmentation_spans.assert_called_once_with(
+            [{"id": "S1", "span_start": 0, "span_end": 11}, {"id": "S2", "span_start": 11, "span_end": 17}]
+        )
+        storage.rollback_base_text.assert_not_called()
+
+    @patch("api.segments.Storage")
+    @patch("api.segments.Neo4JDatabase")
+    def test_failed_span_update_restores_the_previous_text(self, mock_db_cls, mock_storage_cls, client):
+        db, storage = mock_db_cls.return_value, mock_storage_cls.return_value
+        self.mock_segment(db, storage)
+        db.update_segmentation_spans.side_effect = DataNotFound("Segments do not exist or invalid segment IDS")
+        storage.rollback_base_text.return_value = 9
+
+        response = client.put("/v2/segments/S1/content", json={"content": "Hello there"})
+
+        assert response.status_code == 404
+        storage.rollback_base_text.assert_called_once_with(
+            expression_id="E1", manifestation_id="M1", generation=8, previous_generation=7
+        )
+        assert [c.kwargs["generation"] for c in db.set_base_text_generation.call_args_list] == [8, 9]
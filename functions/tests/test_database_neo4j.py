@@ -11,6 +11,7 @@ Environment variables can be set via:
 2. .env file in project root (automatically loaded)
 """
 import os
+import re
 from pathlib import Path
 
 import pytest
@@ -28,6 +29,7 @@ from models import (
     ManifestationModelInput,
     ManifestationType,
     PersonModelInput,
+    SpanModel,
     TextType,
 )
 from neo4j_database import Neo4JDatabase
@@ -47,11 +49,11 @@ def load_constraints_file():
     with open(constraints_file, "r", encoding="utf-8") as f:
         content = f.read()
 
-    # Split by semicolons and filter out empty lines and comments-only lines
+    # Split by semicolons, drop comment lines and keep the constraint and index statements
     statements = []
     for line in content.split(";"):
-        line = line.strip()
-        if line and not line.startswith("//") and "CREATE CONSTRAINT" in line:
+        line = "\n".join(part for part in line.splitlines() if not part.strip().startswith("//")).strip()
+        if line and ("CREATE CONSTRAINT" in line or "INDEX" in line):
             statements.append(line + ";")
 
     return statements
@@ -252,6 +254,50 @@ class TestDatabaseNeo4j:
         assert isinstance(result, list)
         assert len(result) == 0  # Still empty
 
+    def test_list_queries_paginate_before_projecting(self, test_database):
+        """Test that no operator feeding the page's Skip/Limit expands fragment-only relationships"""
+
+        def paged_input(plan):
+            # The row pipeline is the leftmost branch; fragments are planned above its Limit
+            while plan["operatorType"].split("@")[0] not in ("Limit", "Skip"):
+                assert plan.get("children"), "plan has no Skip/Limit operator"
+                plan = plan["children"][0]
+            return plan
+
+        def details(plan):
+            yield plan.get("args", {}).get("Details", "")
+            for child in plan.get("children", []):
+                yield from details(child)
+
+        params = {
+            "offset": 0,
+            "limit": 10,
+            "after": "",
+            "category_id": "c",
+            "type": None,
+            "language": None,
+            "instance_type": None,
+            "title": "t",
+            "author": "a",
+            "title_query": "t*",
+            "author_query": "a*",
+        }
+        list_queries = {
+            "persons.fetch_all": (Queries.persons["fetch_all"], ("HAS_NAME",)),
+            "expressions.fetch_all": (Queries.expressions["fetch_all"], ("HAS_LICENSE",)),
+            "expressions.fetch_all_fuzzy_both": (Queries.expressions["fetch_all_fuzzy_both"], ("HAS_LICENSE",)),
+            "expressions.fetch_by_category": (
+                Queries.expressions["fetch_by_category"],
+                ("HAS_LICENSE", "ANNOTATION_OF"),
+            ),
+        }
+        with test_database.get_session() as session:
+            for name, (query, fragment_relationships) in list_queries.items():
+                plan = session.run(f"EXPLAIN {query}", params).consume().plan
+                below_page = " ".join(details(paged_input(plan)))
+                for relationship in fragment_relationships:
+                    assert relationship not in below_page, f"{name} expands {relationship} before paginating"
+
     def test_expression_not_found(self, test_database):
         """Test retrieving non-existent expression"""
         db = test_database
@@ -676,6 +722,360 @@ class TestDatabaseNeo4j:
         assert retrieved.contributions[0].person_id == commentator_id
         assert retrieved.contributions[0].role == ContributorRole.AUTHOR
 
+    def test_expression_type_is_materialized_and_filtered(self, test_database):
+        """Test that expression types are stored on create, refreshed on the target and used by type filters"""
+        person_id = test_database.create_person(PersonModelInput(name=LocalizedString({"en": "Author"})))
+        root_expression_id = test_database.create_expression(
+            ExpressionModelInput(
+                type=TextType.ROOT,
+                title=LocalizedString({"en": "Root Text"}),
+                language="en",
+                contributions=[ContributionModel(person_id=person_id, role=ContributorRole.AUTHOR)],
+            )
+        )
+        commentary_id = test_database.create_expression(
+            ExpressionModelInput(
+                type=TextType.COMMENTARY,
+                title=LocalizedString({"bo": "འགྲེལ་པ།"}),
+                language="bo",
+                target=root_expression_id,
+                contributions=[ContributionModel(person_id=person_id, role=ContributorRole.AUTHOR)],
+            )
+        )
+
+        with test_database.get_session() as session:
+            stored = {
+                record["id"]: record["type"]
+                for record in session.run("MATCH (e:Expression) RETURN e.id AS id, e.type AS type")
+            }
+        assert stored == {root_expression_id: "root", commentary_id: "commentary"}
+
+        commentaries = test_database.get_all_expressions(filters={"type": "commentary"})
+        assert [expression.id for expression in commentaries] == [commentary_id]
+
+        with test_database.get_session() as session:
+            session.run("MATCH (e:Expression) REMOVE e.type")
+        # Until the backfill finished, listings infer the missing types
+        assert [expression.id for expression in test_database.get_all_expressions(filters={"type": "root"})] == [
+            root_expression_id
+        ]
+        assert test_database.backfill_expression_types() == 2
+        assert [expression.id for expression in test_database.get_all_expressions(filters={"type": "root"})] == [
+            root_expression_id
+        ]
+
+    def test_relation_group_is_materialized_and_backfilled(self, test_database):
+        """Test that related expressions share a relation group that fetches their whole component"""
+        person_id = test_database.create_person(PersonModelInput(name=LocalizedString({"en": "Author"})))
+
+        def create(text_type, title, language, target=None):
+            return test_database.create_expression(
+                ExpressionModelInput(
+                    type=text_type,
+                    title=LocalizedString({language: title}),
+                    language=language,
+                    target=target,
+                    contributions=[ContributionModel(person_id=person_id, role=ContributorRole.AUTHOR)],
+                )
+            )
+
+        root_id = create(TextType.ROOT, "Root", "bo")
+        commentary_id = create(TextType.COMMENTARY, "Commentary", "bo", target=root_id)
+        other_id = create(TextType.ROOT, "Other", "en")
+
+        def groups():
+            with test_database.get_session() as session:
+                query = "MATCH (e:Expression) RETURN e.id AS id, e.relation_group AS relation_group"
+                return {record["id"]: record["relation_group"] for record in session.run(query)}
+
+        assert groups() == {root_id: root_id, commentary_id: root_id, other_id: other_id}
+        group, relations = test_database.get_expression_relation_component(commentary_id)
+        assert group == root_id
+        assert relations == {
+            root_id: [{"type": "COMMENTARY_OF", "direction": "in", "otherId": commentary_id}],
+            commentary_id: [{"type": "COMMENTARY_OF", "direction": "out", "otherId": root_id}],
+        }
+
+        with test_database.get_session() as session:
+            session.run("MATCH (e:Expression) REMOVE e.relation_group")
+        assert test_database.get_expression_relation_component(root_id) == (min(root_id, commentary_id), relations)
+        assert test_database.backfill_relation_groups() == 3
+        assert groups() == {
+            root_id: min(root_id, commentary_id),
+            commentary_id: min(root_id, commentary_id),
+            other_id: other_id,
+        }
+        assert test_database.get_expression_relation_component("missing") is None
+
+    def test_relation_component_includes_ungrouped_neighbours(self, test_database):
+        """Test that a grouped component relating to an ungrouped expression is fetched by traversal"""
+        person_id = test_database.create_person(PersonModelInput(name=LocalizedString({"en": "Author"})))
+
+        def create(text_type, title, target=None):
+            return test_database.create_expression(
+                ExpressionModelInput(
+                    type=text_type,
+                    title=LocalizedString({"bo": title}),
+                    language="bo",
+                    target=target,
+                    contributions=[ContributionModel(person_id=person_id, role=ContributorRole.AUTHOR)],
+                )
+            )
+
+        root_id = create(TextType.ROOT, "Root")
+        commentary_id = create(TextType.COMMENTARY, "Commentary", target=root_id)
+        # As if created while the backfill was grouping the root's component
+        late_id = create(TextType.COMMENTARY, "Late", target=root_id)
+        with test_database.get_session() as session:
+            session.run("MATCH (e:Expression {id: $id}) REMOVE e.relation_group", id=late_id)
+
+        group, relations = test_database.get_expression_relation_component(commentary_id)
+
+        assert group == root_id
+        assert set(relations) == {root_id, commentary_id, late_id}
+
+    def test_title_and_author_search_use_fulltext_index(self, test_database):
+        """Test that title and author searches match Tibetan syllables and English words via the fulltext index"""
+        author_id = test_database.create_person(
+            PersonModelInput(name=LocalizedString({"bo": "ཞི་བ་ལྷ།", "en": "Shantideva"}))
+        )
+        other_id = test_database.create_person(PersonModelInput(name=LocalizedString({"en": "Someone Else"})))
+        expression_id = test_database.create_expression(
+            ExpressionModelInput(
+                type=TextType.ROOT,
+                title=LocalizedString({"bo": "བྱང་ཆུབ་སེམས་དཔའི་སྤྱོད་པ་ལ་འཇུག་པ།", "en": "The Way of the Bodhisattva"}),
+                alt_titles=[LocalizedString({"en": "Bodhicaryavatara"})],
+                language="bo",
+                contributions=[ContributionModel(person_id=author_id, role=ContributorRole.AUTHOR)],
+            )
+        )
+        test_database.create_expression(
+            ExpressionModelInput(
+                type=TextType.ROOT,
+                title=LocalizedString({"en": "Another Way"}),
+                language="en",
+                contributions=[ContributionModel(person_id=other_id, role=ContributorRole.AUTHOR)],
+            )
+        )
+
+        def search(**filters):
+            return [expression.id for expression in test_database.get_all_expressions(filters=filters)]
+
+        assert search(title="སེམས་དཔའི") == [expression_id]
+        assert search(title="way of the") == [expression_id]
+        assert search(title="bodhicarya") == [expression_id]
+        assert search(author="ཞི་བ") == [expression_id]
+        assert search(author="shanti", title="Way") == [expression_id]
+        assert search(author="someone", title="Bodhisattva") == []
+        assert search(title="་།") == []
+
+        with test_database.get_session() as session:
+            session.run("MATCH (e:Expression {id: $id}) REMOVE e.type", id=expression_id)
+        assert search(title="bodhicarya", type="root") == [expression_id]
+
+    def test_get_annotation_returns_alignment_payload_in_one_query(self, test_database):
+        """Test that an alignment annotation is read with both segment lists in a single query"""
+        person_id = test_database.create_person(PersonModelInput(name=LocalizedString({"en": "Author"})))
+        manifestation_ids = []
+        for title in ("Source", "Target"):
+            expression_id = test_database.create_expression(
+                ExpressionModelInput(
+                    type=TextType.ROOT,
+                    title=LocalizedString({"en": title}),
+                    language="en",
+                    contributions=[ContributionModel(person_id=person_id, role=ContributorRole.AUTHOR)],
+                )
+            )
+            manifestation_ids.append(
+                test_database.create_manifestation(
+                    ManifestationModelInput(type=ManifestationType.CRITICAL, copyright=CopyrightStatus.PUBLIC_DOMAIN),
+                    expression_id,
+                    generate_id(),
+                )
+            )
+        source_id, target_id = manifestation_ids
+        target_annotation = AnnotationModel(id=generate_id(), type=AnnotationType.ALIGNMENT)
+        alignment_annotation = AnnotationModel(
+            id=generate_id(), type=AnnotationType.ALIGNMENT, aligned_to=target_annotation.id
+        )
+        target_segments = [{"id": generate_id(), "span": {"start": 0, "end": 8}}]
+        alignment_segments = [
+            {"id": generate_id(), "span": {"start": 4, "end": 10}},
+            {"id": generate_id(), "span": {"start": 0, "end": 4}},
+        ]
+        test_database.add_alignment_annotation_to_manifestation(
+            target_annotation,
+            alignment_annotation,
+            target_id,
+            source_id,
+            target_segments,
+            alignment_segments,
+            [{"source_id": segment["id"], "target_id": target_segments[0]["id"]} for segment in alignment_segments],
+        )
+
+        annotation = test_database.get_annotation(alignment_annotation.id)
+
+        assert annotation == {
+            "id": alignment_annotation.id,
+            "type": "alignment",
+            "data": {
+                "alignment_annotation": [
+                    {**alignment_segments[1], "aligned_segments": [target_segments[0]["id"]]},
+                    {**alignment_segments[0], "aligned_segments": [target_segments[0]["id"]]},
+                ],
+                "target_annotation": target_segments,
+            },
+        }
+        assert test_database.get_annotation(target_annotation.id)["data"] == target_segments
+        with pytest.raises(DataNotFound):
+            test_database.get_annotation("missing")
+
+    def test_layer_lookups_filter_on_the_stored_annotation_type(self):
+        """Test that annotation layer lookups only hop to AnnotationType for annotations without a stored type"""
+        for group in (Queries.manifestations, Queries.annotations, Queries.segments):
+            for name, query in group.items():
+                if name in ("create", "backfill_types"):
+                    continue
+                assert not re.search(r":Annotation \{type:", query), name
+                fallbacks = re.findall(
+                    r"COALESCE\((\w+)\.type, \[\(\1\)-\[:HAS_TYPE\]->\(\1_at:AnnotationType\)", query
+                )
+                assert query.count("AnnotationType") == len(fallbacks), name
+
+    def test_annotation_type_is_materialized_and_backfilled(self, test_database):
+        """Test that annotations store their type on create and that the backfill restores it"""
+        person_id = test_database.create_person(PersonModelInput(name=LocalizedString({"en": "Author"})))
+        expression_id = test_database.create_expression(
+            ExpressionModelInput(
+                type=TextType.ROOT,
+                title=LocalizedString({"en": "Annotated Text"}),
+                language="en",
+                contributions=[ContributionModel(person_id=person_id, role=ContributorRole.AUTHOR)],
+            )
+        )
+        manifestation_id = test_database.create_manifestation(
+            ManifestationModelInput(type=ManifestationType.CRITICAL, copyright=CopyrightStatus.PUBLIC_DOMAIN),
+            expression_id,
+            generate_id(),
+            annotation=AnnotationModel(id=generate_id(), type=AnnotationType.SEGMENTATION),
+            annotation_segments=[{"id": generate_id(), "span": {"start": 0, "end": 10}}],
+        )
+
+        def stored_types():
+            with test_database.get_session() as session:
+                return [record["type"] for record in session.run("MATCH (a:Annotation) RETURN a.type AS type")]
+
+        assert stored_types() == ["segmentation"]
+        assert test_database.has_annotation_type(manifestation_id, "segmentation")
+        assert not test_database.has_annotation_type(manifestation_id, "alignment")
+
+        with test_database.get_session() as session:
+            session.run("MATCH (a:Annotation) REMOVE a.type")
+        assert test_database.has_annotation_type(manifestation_id, "segmentation")
+        manifestation, _ = test_database.get_manifestation(manifestation_id)
+        assert [annotation.type for annotation in manifestation.annotations] == [AnnotationType.SEGMENTATION]
+        assert test_database.backfill_annotation_types() == 1
+        assert stored_types() == ["segmentation"]
+        assert test_database.has_annotation_type(manifestation_id, "segmentation")
+
+    def test_overlap_queries_seek_the_segment_span_index(self):
+        """Test that overlap queries look segments up by annotation_id before expanding SEGMENTATION_OF"""
+        for name in (
+            "get_aligned_segments_by_frontier",
+            "get_related_segments",
+            "find_related_alignment_only",
+            "find_related_alignment_spans",
+            "get_overlapping_segments_by_spans",
+        ):
+            query = Queries.segments[name]
+            assert ".annotation_id = " in query, name
+            assert query.index(".annotation_id = ") < query.index("<-[:SEGMENTATION_OF]-"), name
+
+    def test_segment_span_index_is_maintained_and_backfilled(self, test_database):
+        """Test that span lookups agree with and without the indexed properties, and after backfill and updates"""
+        person_id = test_database.create_person(PersonModelInput(name=LocalizedString({"en": "Author"})))
+        expression_id = test_database.create_expression(
+            ExpressionModelInput(
+                type=TextType.ROOT,
+                title=LocalizedString({"en": "Segmented Text"}),
+                language="en",
+                contributions=[ContributionModel(person_id=person_id, role=ContributorRole.AUTHOR)],
+            )
+        )
+        spans = ((0, 5), (5, 40), (40, 45))
+        segments = [{"id": generate_id(), "span": {"start": start, "end": end}} for start, end in spans]
+        manifestation_id = test_database.create_manifestation(
+            ManifestationModelInput(type=ManifestationType.CRITICAL, copyright=CopyrightStatus.PUBLIC_DOMAIN),
+            expression_id,
+            generate_id(),
+            annotation=AnnotationModel(id=generate_id(), type=AnnotationType.SEGMENTATION),
+            annotation_segments=segments,
+        )
+
+        def find(start, end):
+            span = SpanModel(start=start, end=end)
+            return sorted(segment.id for segment in test_database.find_segments_by_span(manifestation_id, span))
+
+        def max_span_lengths():
+            with test_database.get_session() as session:
+                return [r["length"] for r in session.run("MATCH (a:Annotation) RETURN a.max_span_length AS length")]
+
+        assert max_span_lengths() == [35]
+        expected = {(41, 42): [segments[2]["id"]], (30, 40): sorted(s["id"] for s in segments[1:])}
+        assert {span: find(*span) for span in expected} == expected
+
+        with test_database.get_session() as session:
+            session.run("MATCH (s:Segment) REMOVE s.annotation_id")
+            session.run("MATCH (a:Annotation) REMOVE a.max_span_length")
+        assert {span: find(*span) for span in expected} == expected
+        assert test_database.backfill_segment_span_index() == 1
+        assert max_span_lengths() == [35]
+        assert {span: find(*span) for span in expected} == expected
+
+        test_database.update_segmentation_spans([{"id": segments[0]["id"], "span_start": 0, "span_end": 60}])
+        assert max_span_lengths() == [60]
+        assert find(50, 51) == [segments[0]["id"]]
+
+    def test_cached_segment_layers_follow_segment_writes(self, test_database):
+        """Test that overlap lookups served from the segment layer cache see writes from this and other workers"""
+        person_id = test_database.create_person(PersonModelInput(name=LocalizedString({"en": "Author"})))
+        expression_id = test_database.create_expression(
+            ExpressionModelInput(
+                type=TextType.ROOT,
+                title=LocalizedString({"en": "Segmented Text"}),
+                language="en",
+                contributions=[ContributionModel(person_id=person_id, role=ContributorRole.AUTHOR)],
+            )
+        )
+        segments = [{"id": generate_id(), "span": {"start": start, "end": end}} for start, end in ((0, 10), (10, 20))]
+        manifestation_id = test_database.create_manifestation(
+            ManifestationModelInput(type=ManifestationType.CRITICAL, copyright=CopyrightStatus.PUBLIC_DOMAIN),
+            expression_id,
+            generate_id(),
+            annotation=AnnotationModel(id=generate_id(), type=AnnotationType.SEGMENTATION),
+            annotation_segments=segments,
+        )
+
+        def overlapping(start, end):
+            return [s["segment_id"] for s in test_database._get_overlapping_segments(manifestation_id, start, end)]
+
+        first, second = segments[0]["id"], segments[1]["id"]
+        assert overlapping(5, 15) == [first, second]
+        assert test_database._get_overlapping_segments_batch([first]) == {first: [first]}
+
+        test_database.update_segmentation_spans([{"id": first, "span_start": 0, "span_end": 12}])
+        assert test_database._get_overlapping_segments_batch([first]) == {first: [first, second]}
+
+        # A write by another worker moves the annotation to a new segments_version
+        with test_database.get_session() as session:
+            session.run(
+                "MATCH (s:Segment {id: $id})-[:SEGMENTATION_OF]->(a:Annotation) "
+                "SET s.span_start = 30, s.span_end = 40, a.segments_version = a.segments_version + 1",
+                id=second,
+            )
+        assert overlapping(5, 15) == [first]
+        assert overlapping(35, 36) == [second]
+
     def test_create_commentary_expression_nonexistent_target(self, test_database):
         """Test that creating commentary with non-existent target fails"""
         # Create a person for the contribution
@@ -0,0 +1,46 @@
+"""
+Unit tests for fulltext and type-filtered expression listings using a mocked database session.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from neo4j_database import Neo4JDatabase
+from neo4j_queries import Queries
+
+
+class TestExpressionSearch:
+    @pytest.mark.parametrize("filters", [{"title": "་།"}, {"author": "  "}, {"title": "way", "author": "!?"}])
+    @patch("neo4j_database.get_driver")
+    def test_search_without_searchable_terms_matches_nothing(self, mock_get_driver, filters):
+        session = mock_get_driver.return_value.session.return_value.__enter__.return_value
+
+        assert Neo4JDatabase().get_all_expressions(filters=filters) == []
+        session.run.assert_not_called()
+
+    @pytest.mark.parametrize("name", ["fetch_all_fuzzy_title", "fetch_all_fuzzy_author", "fetch_all_fuzzy_both"])
+    def test_type_filter_infers_the_type_of_expressions_stored_without_one(self, name):
+        query = Queries.expressions[name]
+
+        assert f"{Queries.stored_expression_type('e')} = $type" in query
+        assert "e.type = $type" not in query
+
+    @pytest.mark.parametrize("name", ["fetch_all_by_type", "fetch_all_by_type_after"])
+    def test_listing_seeks_the_stored_type_only_after_the_backfill(self, name):
+        query = Queries.expressions[name]
+        seek, scan = query.split("ELSE", 1)
+
+        assert "OPTIONAL MATCH (backfill:Backfill {id: 'expression_types'})" in query
+        assert "WHEN backfill IS NOT NULL" in seek and "MATCH (e:Expression {type: $type})" in seek
+        assert f"{Queries.stored_expression_type('e')} = $type" in scan
+
+    @patch("neo4j_database.get_driver")
+    def test_backfill_records_its_completion(self, mock_get_driver):
+        session = mock_get_driver.return_value.session.return_value.__enter__.return_value
+        session.run.return_value.single.return_value = {"updated": 3}
+
+        assert Neo4JDatabase().backfill_expression_types() == 3
+        assert [c.args[0] for c in session.run.call_args_list] == [
+            Queries.expressions["backfill_types"],
+            Queries.expressions["mark_types_backfilled"],
+        ]
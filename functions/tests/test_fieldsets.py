@@ -0,0 +1,151 @@
+"""
+Unit tests for sparse fieldsets: the `fields` parameter, the generated Cypher projections and the
+shape of sparse results, using a mocked database.
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from exceptions import InvalidRequest
+from fieldsets import EXPRESSION_FIELDS, PERSON_FIELDS, fields_from_args, fragment_fields, select_fields
+from models import TextType
+from neo4j_database import Neo4JDatabase
+from neo4j_queries import PROJECTED_FRAGMENTS, QUERY_TEMPLATES, Queries
+
+
+class TestFieldsParameter:
+    def test_absent_parameter_selects_every_field(self):
+        assert fields_from_args({}, PERSON_FIELDS) is None
+
+    def test_id_is_always_selected(self):
+        assert fields_from_args({"fields": "name, wiki"}, PERSON_FIELDS) == {"id", "name", "wiki"}
+
+    def test_unknown_field_is_rejected(self):
+        with pytest.raises(InvalidRequest, match="Unknown fields: names"):
+            fields_from_args({"fields": "name,names"}, PERSON_FIELDS)
+
+    def test_fragment_fields_map_api_names_and_add_what_fields_derive_from(self):
+        assert fragment_fields(frozenset({"id", "contributions", "alt_titles"}), EXPRESSION_FIELDS) == {
+            "id",
+            "contributors",
+            "alt_titles",
+            "title",
+        }
+
+    def test_select_fields_deduplicates_alternatives_and_serializes_enums(self):
+        values = {"type": TextType.ROOT, "title": {"en": "A"}, "alt_titles": [{"en": "A"}, {"en": "B"}, {"en": "B"}]}
+
+        assert select_fields(values, frozenset({"type", "alt_titles"}), EXPRESSION_FIELDS) == {
+            "type": "root",
+            "alt_titles": [{"en": "B"}],
+        }
+
+    def test_select_fields_follow_the_order_of_the_allowed_fields(self):
+        values = {"license": "CC0", "title": {"en": "A"}, "id": "E1"}
+
+        selected = select_fields(values, frozenset({"license", "id", "title"}), EXPRESSION_FIELDS)
+
+        assert list(selected) == ["id", "title", "license"]
+
+
+class TestSparseProjections:
+    def test_unrequested_subqueries_are_not_in_the_query(self):
+        full = Queries.expressions["fetch_by_id"]
+        template = QUERY_TEMPLATES["expressions"]["fetch_by_id"]
+        sparse = Queries.with_fields(template, "expression", "e", frozenset({"id", "title"}))
+
+        for pattern in ("HAS_CONTRIBUTION", "HAS_LICENSE", "HAS_COPYRIGHT", "EXPRESSION_OF", "TRANSLATION_OF"):
+            assert pattern in full
+            assert pattern not in sparse
+        assert "HAS_TITLE" in sparse
+
+    def test_related_instance_queries_only_project_summary_fields(self):
+        for name in ("find_related_instances", "find_expression_related_instances"):
+            query = Queries.manifestations[name]
+            assert "HAS_INCIPIT_TITLE" not in query
+            assert "HAS_LICENSE" not in query
+            assert "HAS_CONTRIBUTION" in query
+
+    def test_template_without_the_slot_is_rejected(self):
+        with pytest.raises(ValueError):
+            Queries.with_fields(QUERY_TEMPLATES["persons"]["fetch_by_id"], "expression", "e", frozenset({"id"}))
+
+    def test_full_queries_fill_every_template_slot(self):
+        for group, templates in QUERY_TEMPLATES.items():
+            for name, template in templates.items():
+                query = getattr(Queries, group)[name]
+                assert query == Queries.with_fields(template, *PROJECTED_FRAGMENTS[group])
+                assert "_fragment(" not in query
+
+
+class TestSparseDatabaseResults:
+    @patch("neo4j_database.get_driver")
+    def test_get_expression_fetches_and_returns_only_requested_fields(self, mock_get_driver):
+        session = mock_get_driver.return_value.session.return_value.__enter__.return_value
+        record = MagicMock()
+        record.data.return_value = {
+            "expression": {
+                "id": "E1",
+                "type": "translation",
+                "target": None,
+                "title": [{"language": "en", "text": "Title"}],
+                "alt_titles": [[{"language": "en", "text": "Title"}], [{"language": "en", "text": "Other"}]],
+            }
+        }
+        session.run.return_value.single.return_value = record
+
+        expression = Neo4JDatabase().get_expression("E1", fields=frozenset({"id", "target", "alt_titles"}))
+
+        assert expression == {"id": "E1", "target": "N/A", "alt_titles": [{"en": "Other"}]}
+        query = session.run.call_args.args[0]
+        assert "HAS_TITLE" in query and "TRANSLATION_OF" in query
+        assert "HAS_CONTRIBUTION" not in query and "HAS_LICENSE" not in query
+
+
+class TestPersonsFieldsEndpoint:
+    @patch("api.persons.Neo4JDatabase")
+    def test_sparse_person_is_returned_as_fetched(self, mock_db_cls, client):
+        mock_db_cls.return_value.get_person.return_value = {"id": "P1", "name": {"en": "Name"}}
+
+        response = client.get("/v2/persons/P1?fields=name")
+
+        assert response.status_code == 200
+        assert response.get_json() == {"id": "P1", "name": {"en": "Name"}}
+        mock_db_cls.return_value.get_person.assert_called_once_with("P1", fields=frozenset({"id", "name"}))
+
+    @patch("api.persons.Neo4JDatabase")
+    def test_unknown_field_is_a_bad_request(self, mock_db_cls, client):
+        assert client.get("/v2/persons?fields=title").status_code == 400
+        mock_db_cls.return_value.get_all_persons.assert_not_called()
+
+
+class TestInstanceFieldsEndpoint:
+    @patch("api.instances.Neo4JDatabase")
+    def test_instance_metadata_is_limited_to_requested_fields(self, mock_db_cls, client):
+        mock_db_cls.return_value.get_manifestation.return_value = (
+            {
+                "id": "M1",
+                "type": "critical",
+                "annotations": [{"id": "A1", "type": "segmentation"}, {"id": "A2", "type": "alignment"}],
+            },
+            "E1",
+        )
+
+        response = client.get("/v2/instances/M1?fields=type&annotation=true")
+
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "metadata": {"id": "M1", "type": "critical"},
+            "annotations": [{"annotation_id": "A1", "type": "segmentation"}],
+        }
+        mock_db_cls.return_value.get_manifestation.assert_called_once_with(
+            manifestation_id="M1", fields=frozenset({"id", "type", "annotations"})
+        )
+
+    @patch("api.instances.Neo4JDatabase")
+    def test_instance_metadata_keeps_the_field_order(self, mock_db_cls, client):
+        manifestation = {"id": "M1", "type": "critical", "source": "S", "colophon": "C", "wiki": "Q1"}
+        mock_db_cls.return_value.get_manifestation.return_value = (manifestation, "E1")
+
+        response = client.get("/v2/instances/M1?fields=colophon,wiki,source,type")
+
+        assert list(response.get_json()["metadata"]) == ["id", "type", "source", "wiki", "colophon"]
@@ -0,0 +1,58 @@
+# pylint: disable=redefined-outer-name
+"""
+Unit tests for POST /v2/instances/contents using a mocked database and the in-memory bucket.
+"""
+from unittest.mock import patch
+
+import pytest
+from storage import Storage
+
+
+@pytest.fixture
+def stored_texts():
+    storage = Storage()
+    storage.store_base_text("E1", "M1", "བཀྲ་ཤིས་བདེ་ལེགས།")
+    storage.store_base_text("E2", "M2", "Hello world")
+    return {"M1": "E1", "M2": "E2"}
+
+
+class TestInstanceContents:
+    @patch("api.instances.Neo4JDatabase")
+    def test_returns_contents_and_spans_in_request_order(self, mock_db_cls, client, stored_texts):
+        mock_db = mock_db_cls.return_value
+        mock_db.get_expression_ids_by_manifestation_ids.return_value = stored_texts
+
+        response = client.post(
+            "/v2/instances/contents",
+            json={
+                "instances": [
+                    {"manifestation_id": "M2", "span": {"start": 6, "end": 11}},
+                    {"manifestation_id": "M1"},
+                    {"manifestation_id": "M2", "span": {"start": 0, "end": 5}},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.get_json() == [
+            {"manifestation_id": "M2", "span": {"start": 6, "end": 11}, "content": "world"},
+            {"manifestation_id": "M1", "span": None, "content": "བཀྲ་ཤིས་བདེ་ལེགས།"},
+            {"manifestation_id": "M2", "span": {"start": 0, "end": 5}, "content": "Hello"},
+        ]
+        # One graph lookup for all storage paths
+        mock_db.get_expression_ids_by_manifestation_ids.assert_called_once_with(["M2", "M1"])
+
+    @patch("api.instances.Neo4JDatabase")
+    def test_unknown_manifestation_returns_404(self, mock_db_cls, client, stored_texts):
+        mock_db_cls.return_value.get_expression_ids_by_manifestation_ids.return_value = {"M1": stored_texts["M1"]}
+
+        response = client.post(
+            "/v2/instances/contents", json={"instances": [{"manifestation_id": "M1"}, {"manifestation_id": "M9"}]}
+        )
+
+        assert response.status_code == 404
+        assert "M9" in response.get_json()["error"]
+
+    def test_empty_batch_is_rejected(self, client):
+        response = client.post("/v2/instances/contents", json={"instances": []})
+        assert response.status_code == 422
@@ -0,0 +1,44 @@
+# pylint: disable=redefined-outer-name
+"""
+Unit tests for the `api` Cloud Functions entry point.
+"""
+from unittest.mock import patch
+
+import main
+import pytest
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+
+@pytest.fixture
+def fresh_app():
+    main._app = None  # pylint: disable=protected-access
+    with patch("main._init_firebase") as mock_init:
+        yield mock_init
+    main._app = None  # pylint: disable=protected-access
+
+
+def _dispatch(request: Request):
+    # Skip the firebase_functions CORS wrapper, which needs the hosting framework's app context.
+    return main.api.__wrapped__(request)
+
+
+def _health_request() -> Request:
+    return Request(EnvironBuilder(path="/__/health", method="GET").get_environ())
+
+
+def test_app_is_built_once_per_worker(fresh_app):
+    with patch("main.create_app", wraps=main.create_app) as mock_create_app:
+        first = _dispatch(_health_request())
+        second = _dispatch(_health_request())
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    fresh_app.assert_called_once()
+    mock_create_app.assert_called_once()
+
+
+def test_response_reports_dispatch_time(fresh_app):  # pylint: disable=unused-argument
+    response = _dispatch(_health_request())
+
+    assert response.headers["Server-Timing"].startswith("app;dur=")
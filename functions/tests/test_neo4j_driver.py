@@ -0,0 +1,80 @@
+# pylint: disable=redefined-outer-name
+"""
+Unit tests for the process-wide Neo4j driver used by Neo4JDatabase.
+"""
+from unittest.mock import patch
+
+import pytest
+import neo4j_database
+from neo4j_database import Neo4JDatabase, get_pool_stats
+
+
+@pytest.fixture
+def mock_graph_database():
+    # Start from empty driver maps and restore them after, so drivers shared with other tests in the
+    # session are neither closed nor replaced by mocks
+    with (
+        patch.dict(neo4j_database._drivers, clear=True),  # pylint: disable=protected-access
+        patch.dict(neo4j_database._driver_configs, clear=True),  # pylint: disable=protected-access
+        patch("neo4j.GraphDatabase") as mock_graph_db,
+    ):
+        yield mock_graph_db
+
+
+class TestSharedDriver:
+    def test_facades_share_one_driver(self, mock_graph_database):
+        Neo4JDatabase(neo4j_uri="bolt://localhost:7687", neo4j_auth=("neo4j", "secret"))
+        Neo4JDatabase(neo4j_uri="bolt://localhost:7687", neo4j_auth=("neo4j", "secret"))
+
+        mock_graph_database.driver.assert_called_once()
+        mock_graph_database.driver.return_value.verify_connectivity.assert_called_once()
+
+    def test_pool_configuration_from_environment(self, mock_graph_database, monkeypatch):
+        monkeypatch.setenv("NEO4J_URI", "bolt://example:7687")
+        monkeypatch.setenv("NEO4J_PASSWORD", "secret")
+        monkeypatch.setenv("NEO4J_MAX_POOL_SIZE", "7")
+        monkeypatch.setenv("NEO4J_ACQUISITION_TIMEOUT", "2.5")
+        monkeypatch.setenv("NEO4J_FETCH_SIZE", "250")
+
+        Neo4JDatabase()
+
+        _, kwargs = mock_graph_database.driver.call_args
+        assert kwargs["max_connection_pool_size"] == 7
+        assert kwargs["connection_acquisition_timeout"] == 2.5
+        assert kwargs["fetch_size"] == 250
+
+        stats = get_pool_stats()
+        assert len(stats) == 1
+        assert "uri" not in stats[0]
+        assert stats[0]["max_connection_pool_size"] == 7
+
+    def test_pool_stats_without_the_driver_internals_are_empty(self, mock_graph_database):
+        mock_graph_database.driver.return_value._pool = object()  # pylint: disable=protected-access
+        Neo4JDatabase(neo4j_uri="bolt://localhost:7687", neo4j_auth=("neo4j", "secret"))
+
+        assert get_pool_stats()[0]["addresses"] == {}
+
+    def test_failed_connectivity_is_not_cached(self, mock_graph_database):
+        mock_graph_database.driver.return_value.verify_connectivity.side_effect = [ConnectionError("down"), None]
+
+        with pytest.raises(ConnectionError):
+            Neo4JDatabase(neo4j_uri="bolt://localhost:7687", neo4j_auth=("neo4j", "secret"))
+        Neo4JDatabase(neo4j_uri="bolt://localhost:7687", neo4j_auth=("neo4j", "secret"))
+
+        assert mock_graph_database.driver.call_count == 2
+        mock_graph_database.driver.return_value.close.assert_called_once()
+
+
+class TestStatsEndpoint:
+    def test_stats_are_not_exposed_by_default(self, client, monkeypatch):
+        monkeypatch.delenv("STATS_ENDPOINT_ENABLED", raising=False)
+
+        assert client.get("/api/stats").status_code == 404
+
+    def test_stats_are_exposed_when_enabled(self, client, monkeypatch):
+        monkeypatch.setenv("STATS_ENDPOINT_ENABLED", "true")
+
+        response = client.get("/api/stats")
+
+        assert response.status_code == 200
+        assert set(response.get_json()) >= {"neo4j_pool", "base_text_cache"}
@@ -0,0 +1,113 @@
+"""
+Unit tests for cursor (keyset) pagination of list endpoints using a mocked database.
+"""
+from unittest.mock import patch
+
+import pytest
+from exceptions import InvalidRequest
+from models import LocalizedString, PersonModelOutput
+from neo4j_queries import Queries
+from pagination import decode_cursor, encode_cursor, next_cursor
+
+
+def _person(person_id: str) -> PersonModelOutput:
+    return PersonModelOutput(id=person_id, name=LocalizedString({"en": person_id}))
+
+
+class TestCursors:
+    def test_cursor_round_trips_and_empty_cursor_starts_at_first_page(self):
+        assert decode_cursor(encode_cursor("P1")) == "P1"
+        assert decode_cursor("") == ""
+
+    @pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor("P1")[:-3], "eyJ4IjogMX0"])
+    def test_malformed_cursor_is_rejected(self, cursor):
+        with pytest.raises(InvalidRequest):
+            decode_cursor(cursor)
+
+    def test_next_cursor_only_for_full_pages(self):
+        assert decode_cursor(next_cursor(["A", "B"], 2)) == "B"
+        assert next_cursor(["A"], 2) is None
+        assert next_cursor([], 2) is None
+
+    def test_keyset_queries_seek_by_id_instead_of_offset(self):
+        for query in (
+            Queries.expressions["fetch_all_after"],
+            Queries.expressions["fetch_all_fuzzy_both_after"],
+            Queries.expressions["fetch_by_category_after"],
+            Queries.persons["fetch_all_after"],
+        ):
+            assert "$offset" not in query
+            assert "$after" in query and "ORDER BY" in query
+
+    @pytest.mark.parametrize(
+        "queries, name, label",
+        [(Queries.expressions, name, "e") for name in ("fetch_all", "fetch_all_fuzzy_both", "fetch_by_category")]
+        + [(Queries.persons, "fetch_all", "person")],
+    )
+    def test_cursor_variant_only_differs_in_its_page_clauses(self, queries, name, label):
+        offset_query, cursor_query = queries[name], queries[f"{name}_after"]
+
+        assert offset_query.count(Queries.page(label)) == 1
+        assert offset_query.replace(Queries.page(label), Queries.page(label, keyset=True)) == cursor_query
+
+
+LIST_QUERIES = {
+    f"{group}.{name}{suffix}": getattr(Queries, group)[f"{name}{suffix}"]
+    for group, names in {
+        "expressions": (
+            "fetch_all",
+            "fetch_all_by_type",
+            "fetch_all_fuzzy_title",
+            "fetch_all_fuzzy_author",
+            "fetch_all_fuzzy_both",
+            "fetch_by_category",
+        ),
+        "persons": ("fetch_all",),
+    }.items()
+    for name in names
+    for suffix in ("", "_after")
+}
+# Text that only occurs inside the expression, manifestation and person fragments
+FRAGMENT_MARKERS = ("HAS_LICENSE", "ANNOTATION_OF", "alt_names:")
+
+
+class TestPaginateBeforeProjecting:
+    @pytest.mark.parametrize("query", LIST_QUERIES.values(), ids=LIST_QUERIES.keys())
+    def test_list_queries_limit_rows_before_building_fragments(self, query):
+        page_end = query.index("LIMIT $limit")
+        for marker in FRAGMENT_MARKERS:
+            assert marker not in query[:page_end]
+
+
+class TestPersonsCursorPagination:
+    @patch("api.persons.Neo4JDatabase")
+    def test_offset_mode_keeps_list_response(self, mock_db_cls, client):
+        mock_db_cls.return_value.get_all_persons.return_value = [_person("P1")]
+
+        response = client.get("/v2/persons?limit=2&offset=4")
+
+        assert response.status_code == 200
+        assert [p["id"] for p in response.get_json()] == ["P1"]
+        mock_db_cls.return_value.get_all_persons.assert_called_once_with(offset=4, limit=2, after=None, fields=None)
+
+    @patch("api.persons.Neo4JDatabase")
+    def test_cursor_mode_walks_pages(self, mock_db_cls, client):
+        mock_db = mock_db_cls.return_value
+        mock_db.get_all_persons.return_value = [_person("P1"), _person("P2")]
+
+        first = client.get("/v2/persons?limit=2&cursor=").get_json()
+
+        assert [p["id"] for p in first["items"]] == ["P1", "P2"]
+        mock_db.get_all_persons.assert_called_with(offset=0, limit=2, after="", fields=None)
+
+        mock_db.get_all_persons.return_value = [_person("P3")]
+        second = client.get(f"/v2/persons?limit=2&cursor={first['next_cursor']}").get_json()
+
+        mock_db.get_all_persons.assert_called_with(offset=0, limit=2, after="P2", fields=None)
+        assert second == {"items": [_person("P3").model_dump()], "next_cursor": None}
+
+    @patch("api.persons.Neo4JDatabase")
+    def test_invalid_cursor_and_cursor_with_offset_are_rejected(self, mock_db_cls, client):
+        assert client.get("/v2/persons?cursor=bogus").status_code == 400
+        assert client.get(f"/v2/persons?offset=2&cursor={encode_cursor('P1')}").status_code == 400
+        mock_db_cls.return_value.get_all_persons.assert_not_called()
@@ -0,0 +1,192 @@
+"""
+Query-level tests of the Cypher in neo4j_queries.py that run without a Neo4j server: every query
+is well formed once its fragments are interpolated, the database methods pass exactly the
+parameters their queries use, and the writes keep the versions and indexes the read paths rely on.
+"""
+
+import re
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from models import ExpressionModelInput, LocalizedString, SpanModel, TextType
+from neo4j_database import Neo4JDatabase
+from neo4j_queries import Queries
+
+QUERIES = {
+    f"{group}.{name}": query
+    for group, queries in vars(Queries).items()
+    if isinstance(queries, dict)
+    for name, query in queries.items()
+}
+
+# String literals and comments, matched left to right so a quote inside a comment is not a literal
+_LITERALS_AND_COMMENTS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|//[^\n]*")
+_CLOSING = {")": "(", "]": "[", "}": "{"}
+
+
+def code(query: str) -> str:
+    """The query without its string literals and comments."""
+    return _LITERALS_AND_COMMENTS.sub("''", query)
+
+
+def parameters(query: str) -> set[str]:
+    return set(re.findall(r"\$(\w+)", code(query)))
+
+
+def query_name(query: str) -> str:
+    """Name of a query of Queries, or the first line of one built elsewhere (e.g. by the validator)."""
+    return next((name for name, known in QUERIES.items() if known == query), query.strip().splitlines()[0])
+
+
+class TestQueryText:
+    @pytest.mark.parametrize("name", sorted(QUERIES))
+    def test_brackets_are_balanced(self, name):
+        stack = []
+        for char in code(QUERIES[name]):
+            if char in "([{":
+                stack.append(char)
+            elif char in _CLOSING:
+                assert stack and stack.pop() == _CLOSING[char], name
+        assert not stack, name
+
+    @pytest.mark.parametrize("name", sorted(QUERIES))
+    def test_fragments_are_interpolated(self, name):
+        query = code(QUERIES[name])
+
+        assert "Queries." not in query, name
+        assert "{{" not in query, name
+
+
+def expression(text_type: TextType) -> ExpressionModelInput:
+    return ExpressionModelInput(
+        type=text_type,
+        target="E0",
+        title=LocalizedString({"en": "Title"}),
+        language="en",
+        category_id="C1",
+        contributions=[],
+    )
+
+
+# Database method, its arguments and the queries of Queries it runs, in order
+CALLS = [
+    ("find_segments_by_span", ("M1", SpanModel(start=0, end=10)), ["segments.get_segment_layer_versions"]),
+    ("_get_overlapping_segments", ("M1", 0, 10), ["segments.get_segment_layer_versions"]),
+    ("_get_overlapping_segments_batch", (["S1"],), ["segments.get_segment_layer_versions_by_segments"]),
+    ("get_segment_related", ("M1", 0, 10), ["segments.find_related_alignment_only"]),
+    ("get_annotation", ("A1",), ["annotations.fetch_by_id"]),
+    ("get_annotation_type", ("A1",), ["annotations.get_annotation_type"]),
+    (
+        "update_segmentation_spans",
+        ([{"id": "S1", "span_start": 0, "span_end": 4}],),
+        ["segments.update_segmentation_spans_batch"],
+    ),
+    ("backfill_segment_span_index", (), ["segments.backfill_span_index"]),
+    ("backfill_annotation_types", (), ["annotations.backfill_types"]),
+    ("get_expression_relations_version", (), ["expressions.relations_version"]),
+    ("get_expression_relation_component", ("E1",), ["expressions.fetch_relation_component"]),
+    ("backfill_relation_groups", (), ["expressions.backfill_relation_groups"]),
+    (
+        "create_expression",
+        (expression(TextType.TRANSLATION),),
+        ["expressions.fetch_by_id", "nomens.create", "expressions.create_translation", "works.link_to_category"],
+    ),
+    (
+        "create_expression",
+        (expression(TextType.COMMENTARY),),
+        ["nomens.create", "expressions.create_commentary", "works.link_to_category"],
+    ),
+    (
+        "_get_related_segments",
+        ("M0", 0, 10, True),
+        [
+            "segments.get_aligned_segments_by_frontier",
+            "segments.get_overlapping_segments_by_spans",
+            "segments.get_aligned_segments_by_frontier",
+        ],
+    ),
+    (
+        "get_segments_relations",
+        ("M0", [{"id": "S0", "span": {"start": 0, "end": 10}}]),
+        ["segments.get_alignment_layers", "segments.get_segmentation_layers"],
+    ),
+]
+
+
+class TestQueryParameters:
+    @staticmethod
+    def record_runs(mock_get_driver) -> list[tuple[str, dict]]:
+        """Record every query run through the session, answering the walk's first level with one pair."""
+        runs = []
+        pairs = [
+            {
+                "idx": 0,
+                "alignment_1_id": "A01",
+                "alignment_2_id": "A10",
+                "manifestation_id": "M1",
+                "segments": [{"segment_id": "S1", "span": {"start": 0, "end": 10}}],
+            }
+        ]
+
+        def run(query, parameters=None, **kwargs):
+            runs.append((query, {**(parameters or {}), **kwargs}))
+            result = MagicMock()
+            result.data.return_value = pairs if query == Queries.segments["get_aligned_segments_by_frontier"] else []
+            return result
+
+        tx = MagicMock()
+        tx.run.side_effect = run
+        session = mock_get_driver.return_value.session.return_value.__enter__.return_value
+        session.run.side_effect = run
+        session.execute_read.side_effect = lambda work: work(tx)
+        session.execute_write.side_effect = lambda work: work(tx)
+        return runs
+
+    @pytest.mark.parametrize("method, args, expected", CALLS, ids=[f"{call[0]}-{i}" for i, call in enumerate(CALLS)])
+    @patch("neo4j_database.get_driver")
+    def test_methods_pass_the_parameters_their_queries_use(self, mock_get_driver, method, args, expected):
+        runs = self.record_runs(mock_get_driver)
+
+        getattr(Neo4JDatabase(), method)(*args)
+
+        for query, params in runs:
+            assert parameters(query) == set(params), query_name(query)
+        # Queries built elsewhere (e.g. by the validator) are only checked for their parameters
+        assert [name for name in map(query_name, (query for query, _ in runs)) if name in QUERIES] == expected
+
+
+class TestQueryContracts:
+    def test_overlap_seek_uses_the_segment_annotation_span_index(self):
+        constraints = (Path(__file__).parent.parent / "neo4j_constraints.cypher").read_text(encoding="utf-8")
+        seek = Queries.overlapping_segments("a", "s", "$span_start", "$span_end").split("ELSE")[0]
+
+        assert "FOR (s:Segment) ON (s.annotation_id, s.span_start)" in constraints
+        assert "s.annotation_id = a.id" in seek
+        assert "s.span_start >= $span_start - a.max_span_length" in seek
+
+    def test_segment_writes_advance_the_layer_version_and_span_bound(self):
+        writes = [
+            name
+            for name, query in QUERIES.items()
+            if re.search(r"CREATE \(\w*:Segment|\.span_(start|end)\s*=", code(query))
+        ]
+
+        assert writes == ["segments.create_batch", "segments.update_segmentation_spans_batch"]
+        for name in writes:
+            assert "segments_version = COALESCE" in QUERIES[name], name
+            assert "max_span_length" in QUERIES[name], name
+
+    def test_relation_writes_advance_the_relations_version(self):
+        writes = [name for name, query in QUERIES.items() if re.search(r"\[\w*:(TRANSLATION|COMMENTARY)_OF\]", query)]
+        writes = [name for name in writes if re.search(r"(MERGE|CREATE|DELETE)[^\n]*_OF\]", code(QUERIES[name]))]
+
+        assert writes == ["expressions.create_translation", "expressions.create_commentary"]
+        for name in writes:
+            assert Queries.bump_relations_version() in QUERIES[name], name
+            assert "relations_version.version AS relations_version" in QUERIES[name], name
+        assert "RelationsVersion {id: 'expressions'}" in Queries.expressions["relations_version"]
+
+    def test_related_segments_are_ordered_by_start_end_and_id(self):
+        for name in ("get_aligned_segments_by_frontier", "get_overlapping_segments_by_spans"):
+            assert re.search(r"ORDER BY idx, (\w+)\.span_start, \1\.span_end, \1\.id\n", Queries.segments[name]), name
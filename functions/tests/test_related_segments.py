@@ -0,0 +1,230 @@
+"""
+Unit tests for the level-synchronous related-segments walk and its in-memory counterpart behind
+segments-relation, using a mocked database session.
+"""
+
+from unittest.mock import MagicMock, patch
+
+from neo4j_database import Neo4JDatabase
+from neo4j_queries import Queries
+
+
+def segment(segment_id, start, end):
+    return {"segment_id": segment_id, "span": {"start": start, "end": end}}
+
+
+def pair(idx, alignment_1_id, alignment_2_id, manifestation_id, segments):
+    return {
+        "idx": idx,
+        "alignment_1_id": alignment_1_id,
+        "alignment_2_id": alignment_2_id,
+        "manifestation_id": manifestation_id,
+        "segments": segments,
+    }
+
+
+# M0 is aligned with M1 and M2, which are both aligned with M3
+LEVELS = [
+    [
+        pair(0, "A01", "A10", "M1", [segment("S1a", 10, 20), segment("S1b", 20, 30)]),
+        pair(0, "A02", "A20", "M2", [segment("S2", 5, 8)]),
+    ],
+    [
+        pair(0, "A10", "A01", "M0", [segment("S0", 0, 10)]),
+        pair(0, "A13", "A31", "M3", [segment("S3a", 40, 50)]),
+        pair(1, "A23", "A32", "M3", [segment("S3b", 0, 5)]),
+    ],
+    [pair(0, "A31", "A13", "M1", [segment("S1a", 10, 20)])],
+]
+
+
+# Alignment annotation -> (manifestation, aligned annotation, [(s1 start, s1 end, s2 id, s2 start, s2 end)])
+ALIGNMENTS = {
+    "A01": (
+        "M0",
+        "A10",
+        [(0, 10, "B1", 0, 12), (0, 10, "B0", 0, 12), (10, 20, "B2", 12, 30), (10, 20, "B3", 12, 14)],
+    ),
+    "A10": ("M1", "A01", [(0, 12, "C1", 0, 10), (12, 30, "C2", 10, 20), (12, 14, "C2", 10, 20)]),
+    "A12": ("M1", "A21", [(0, 20, "D1", 0, 5), (20, 30, "D2", 5, 15)]),
+    "A21": ("M2", "A12", [(0, 5, "E1", 0, 20), (5, 15, "E2", 20, 30)]),
+    "A02": ("M0", "A20", [(15, 20, "F1", 3, 9)]),
+    "A20": ("M2", "A02", [(3, 9, "G1", 15, 20)]),
+    "A23": ("M2", "A32", [(8, 30, "H1", 0, 4)]),
+    "A32": ("M3", "A23", [(0, 4, "I1", 8, 30)]),
+}
+SEGMENTATION = {
+    "M0": [("M0-1", 0, 10), ("M0-2", 10, 20), ("M0-3", 20, 25)],
+    "M1": [("M1-1", 0, 15), ("M1-2", 15, 30), ("M1-0", 0, 15), ("M1-3", 0, 5)],
+    "M2": [("M2-1", 0, 8), ("M2-2", 8, 30)],
+    "M3": [("M3-1", 0, 4)],
+}
+
+
+def overlaps(span_start, span_end, start, end):
+    return span_start < end and span_end > start
+
+
+def by_position(span):
+    """(id, start, end) sort key of the queries: start, then end, then id"""
+    return span[1], span[2], span[0]
+
+
+def run_query(query, **params):
+    """Answer the related-segments queries from ALIGNMENTS and SEGMENTATION."""
+    records = []
+    if query == Queries.segments["get_aligned_segments_by_frontier"]:
+        for idx, item in enumerate(params["frontier"]):
+            for a1, (manifestation_id, a2, links) in sorted(ALIGNMENTS.items()):
+                aligned = {
+                    (s2_id, s2_start, s2_end)
+                    for s1_start, s1_end, s2_id, s2_start, s2_end in links
+                    if manifestation_id == item["manifestation_id"]
+                    and overlaps(s1_start, s1_end, item["span_start"], item["span_end"])
+                }
+                if aligned:
+                    segments = [segment(*span) for span in sorted(aligned, key=by_position)]
+                    records.append(pair(idx, a1, a2, ALIGNMENTS[a2][0], segments))
+    elif query == Queries.segments["get_overlapping_segments_by_spans"]:
+        for idx, item in enumerate(params["spans"]):
+            spans = sorted(SEGMENTATION.get(item["manifestation_id"], []), key=by_position)
+            if overlapping := [
+                segment(*span) for span in spans if overlaps(*span[1:], item["span_start"], item["span_end"])
+            ]:
+                records.append({"idx": idx, "segments": overlapping})
+    elif query == Queries.segments["get_alignment_layers"]:
+        for a1, (manifestation_id, a2, links) in ALIGNMENTS.items():
+            if manifestation_id in params["manifestation_ids"]:
+                pairs = [{"alignment_2_id": a2, "manifestation_id": ALIGNMENTS[a2][0]}]
+                records.append(
+                    {"manifestation_id": manifestation_id, "alignment_1_id": a1, "pairs": pairs, "links": links}
+                )
+    elif query == Queries.segments["get_segmentation_layers"]:
+        for manifestation_id in params["manifestation_ids"]:
+            records.append({"manifestation_id": manifestation_id, "segments": SEGMENTATION[manifestation_id]})
+    result = MagicMock()
+    result.data.return_value = records
+    return result
+
+
+def mock_session(mock_get_driver, tx):
+    session = mock_get_driver.return_value.session.return_value.__enter__.return_value
+    session.execute_read.side_effect = lambda work: work(tx)
+
+
+def run_walk(mock_get_driver, responses, transform):
+    tx = MagicMock()
+    tx.run.return_value.data.side_effect = responses
+    mock_session(mock_get_driver, tx)
+
+    related = Neo4JDatabase()._get_related_segments("M0", 0, 10, transform)  # pylint: disable=protected-access
+    return related, [(c.args[0], c.kwargs) for c in tx.run.call_args_list]
+
+
+class TestRelatedSegments:
+    @patch("neo4j_database.get_driver")
+    def test_each_level_is_expanded_with_one_query(self, mock_get_driver):
+        related, calls = run_walk(mock_get_driver, LEVELS, transform=False)
+
+        assert related == [
+            {"manifestation_id": "M1", "segments": [segment("S1a", 10, 20), segment("S1b", 20, 30)]},
+            {"manifestation_id": "M2", "segments": [segment("S2", 5, 8)]},
+            {"manifestation_id": "M3", "segments": [segment("S3a", 40, 50)]},
+        ]
+        assert [query for query, _ in calls] == [Queries.segments["get_aligned_segments_by_frontier"]] * 3
+        assert [params["frontier"] for _, params in calls] == [
+            [{"manifestation_id": "M0", "span_start": 0, "span_end": 10}],
+            [
+                {"manifestation_id": "M1", "span_start": 10, "span_end": 30},
+                {"manifestation_id": "M2", "span_start": 5, "span_end": 8},
+            ],
+            [{"manifestation_id": "M3", "span_start": 40, "span_end": 50}],
+        ]
+
+    @patch("neo4j_database.get_driver")
+    def test_transform_maps_each_level_onto_segmentation_segments_with_one_query(self, mock_get_driver):
+        responses = [
+            LEVELS[0],
+            [{"idx": 0, "segments": [segment("T1", 0, 40)]}],
+            LEVELS[1],
+            [],
+            LEVELS[2],
+        ]
+
+        related, calls = run_walk(mock_get_driver, responses, transform=True)
+
+        assert related == [
+            {"manifestation_id": "M1", "segments": [segment("T1", 0, 40)]},
+            {"manifestation_id": "M2", "segments": []},
+            {"manifestation_id": "M3", "segments": []},
+        ]
+        assert calls[1] == (
+            Queries.segments["get_overlapping_segments_by_spans"],
+            {
+                "spans": [
+                    {"manifestation_id": "M1", "span_start": 10, "span_end": 30},
+                    {"manifestation_id": "M2", "span_start": 5, "span_end": 8},
+                ]
+            },
+        )
+        assert len(calls) == 5
+
+    @patch("neo4j_database.get_driver")
+    def test_segments_relations_match_a_walk_per_segment(self, mock_get_driver):
+        tx = MagicMock()
+        tx.run.side_effect = run_query
+        mock_session(mock_get_driver, tx)
+        db = Neo4JDatabase()
+        segments = [
+            {"id": segment_id, "span": {"start": start, "end": end}} for segment_id, start, end in SEGMENTATION["M0"]
+        ]
+
+        expected = [
+            {
+                "segment_id": segment["id"],
+                "related_segments": db._get_related_segments(  # pylint: disable=protected-access
+                    "M0", segment["span"]["start"], segment["span"]["end"], transform=True
+                ),
+            }
+            for segment in segments
+        ]
+        tx.run.reset_mock()
+        relations = db.get_segments_relations("M0", segments)
+
+        assert relations == expected
+        assert [r["manifestation_id"] for r in relations[1]["related_segments"]] == ["M1", "M2", "M3"]
+        assert [c.args[0] for c in tx.run.call_args_list] == [Queries.segments["get_alignment_layers"]] * 3 + [
+            Queries.segments["get_segmentation_layers"]
+        ]
+
+    @patch("neo4j_database.get_driver")
+    def test_segments_sharing_a_start_are_ordered_by_end_then_id_in_both_paths(self, mock_get_driver):
+        tx = MagicMock()
+        tx.run.side_effect = run_query
+        mock_session(mock_get_driver, tx)
+        db = Neo4JDatabase()
+
+        walked = db._get_related_segments("M0", 0, 10, transform=True)  # pylint: disable=protected-access
+        (relations,) = db.get_segments_relations("M0", [{"id": "M0-1", "span": {"start": 0, "end": 10}}])
+
+        assert relations["related_segments"] == walked
+        assert [s["segment_id"] for s in walked[0]["segments"]] == ["M1-3", "M1-0", "M1-1"]
+
+
+class TestSegmentsRelationEndpoint:
+    @patch("api.instances.Neo4JDatabase")
+    def test_relations_of_every_segment_are_fetched_in_one_call(self, mock_db_cls, client):
+        segments = [{"id": "S1", "span": {"start": 0, "end": 10}}]
+        mock_db_cls.return_value.get_segmentation_annotation_by_manifestation.return_value = segments
+        mock_db_cls.return_value.get_segments_relations.return_value = [{"segment_id": "S1", "related_segments": []}]
+
+        response = client.get("/v2/instances/M0/segments-relation")
+
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "instance_id": "M0",
+            "segments_relations": [{"segment_id": "S1", "related_segments": []}],
+        }
+        mock_db_cls.return_value.get_segments_relations.assert_called_once_with(
+            manifestation_id="M0", segments=segments
+        )
@@ -0,0 +1,190 @@
+"""
+Unit tests for the process-wide relation graph snapshot and the relations endpoint built on it,
+using a mocked database.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from api.relation import _classify_relations
+from models import ExpressionModelInput, TextType
+from relation_graph import RelationGraph, relation_graph
+
+RELATIONS = {
+    "R": [
+        {"type": "TRANSLATION_OF", "direction": "in", "otherId": "T"},
+        {"type": "COMMENTARY_OF", "direction": "in", "otherId": "C"},
+    ],
+    "T": [{"type": "TRANSLATION_OF", "direction": "out", "otherId": "R"}],
+    "C": [{"type": "COMMENTARY_OF", "direction": "out", "otherId": "R"}],
+    "X": [],
+}
+RELATION_GROUPS = {"R": "R", "T": "R", "C": "R", "X": "X"}
+
+
+def mock_db(version=4):
+    def fetch_component(expression_id):
+        if (group := RELATION_GROUPS.get(expression_id)) is None:
+            return None
+        members = [member for member, member_group in RELATION_GROUPS.items() if member_group == group]
+        return group, {member: list(RELATIONS[member]) for member in members}
+
+    db = MagicMock()
+    db.get_expression_relations_version.return_value = version
+    db.get_expression_relation_component.side_effect = fetch_component
+    return db
+
+
+def expression(text_type=TextType.ROOT, target=None):
+    return ExpressionModelInput.model_construct(type=text_type, target=target)
+
+
+@pytest.fixture(autouse=True)
+def clear_relation_graph():
+    relation_graph.clear()
+    yield
+    relation_graph.clear()
+
+
+class TestRelationGraph:
+    def test_component_only_contains_connected_expressions(self):
+        graph = RelationGraph()
+
+        assert set(graph.component(mock_db(), "T")) == {"R", "T", "C"}
+        assert graph.component(mock_db(), "X") == {"X": []}
+        assert graph.component(mock_db(), "missing") is None
+
+    def test_each_component_is_fetched_once_until_the_version_changes(self):
+        graph, db = RelationGraph(), mock_db()
+
+        graph.component(db, "R")
+        graph.component(db, "C")
+        graph.component(db, "X")
+        assert [c.args for c in db.get_expression_relation_component.call_args_list] == [("R",), ("X",)]
+
+        db.get_expression_relations_version.return_value = 5
+        graph.component(db, "C")
+        assert db.get_expression_relation_component.call_count == 3
+
+    def test_created_expressions_are_added_without_refetching(self):
+        graph, db = RelationGraph(), mock_db()
+        graph.component(db, "R")
+
+        graph.add_expression("T2", expression(TextType.TRANSLATION, target="T"), relations_version=5)
+        graph.add_expression("Y", expression(), relations_version=None)
+        db.get_expression_relations_version.return_value = 5
+
+        component = graph.component(db, "T2")
+        assert db.get_expression_relation_component.call_count == 1
+        assert component["T2"] == [{"type": "TRANSLATION_OF", "direction": "out", "otherId": "T"}]
+        assert {"type": "TRANSLATION_OF", "direction": "in", "otherId": "T2"} in component["T"]
+
+    def test_expression_joining_an_uncached_component_is_fetched_with_it(self):
+        graph, db = RelationGraph(), mock_db()
+        graph.component(db, "R")
+
+        graph.add_expression("T2", expression(TextType.TRANSLATION, target="X"), relations_version=5)
+        db.get_expression_relations_version.return_value = 5
+
+        graph.component(db, "R")
+        assert db.get_expression_relation_component.call_count == 1
+        graph.component(db, "X")
+        assert db.get_expression_relation_component.call_count == 2
+
+    def test_relation_written_by_another_worker_drops_the_snapshot(self):
+        graph, db = RelationGraph(), mock_db()
+        graph.component(db, "R")
+
+        # Another worker replaced a relation (same counts) before this one created T2
+        graph.add_expression("T2", expression(TextType.TRANSLATION, target="T"), relations_version=7)
+        assert "T2" not in graph.component(db, "R")
+        db.get_expression_relations_version.return_value = 7
+
+        graph.component(db, "R")
+        assert db.get_expression_relation_component.call_count == 2
+
+    def test_components_are_fetched_without_holding_the_lock(self):
+        graph, db = RelationGraph(), mock_db()
+        fetch_component = db.get_expression_relation_component.side_effect
+        held = []
+
+        def fetch_unlocked(expression_id):
+            held.append(graph._lock.locked())  # pylint: disable=protected-access
+            return fetch_component(expression_id)
+
+        db.get_expression_relation_component.side_effect = fetch_unlocked
+        graph.components(db, ["T", "X", "missing"])
+
+        assert held == [False, False, False]
+        assert graph.stats()["components"] == 2
+
+    def test_a_stale_version_neither_rolls_back_nor_fills_the_snapshot(self):
+        graph = RelationGraph()
+        graph.component(mock_db(version=5), "R")
+
+        stale = mock_db(version=4)
+        assert set(graph.component(stale, "C")) == {"R", "T", "C"}
+        assert graph.component(stale, "X") == {"X": []}
+
+        assert stale.get_expression_relation_component.call_count == 1
+        assert (graph.stats()["version"], graph.stats()["components"]) == (5, 1)
+
+    def test_added_relations_do_not_change_components_already_returned(self):
+        graph, db = RelationGraph(), mock_db()
+        component = graph.component(db, "R")
+        relations_of_t = component["T"]
+
+        graph.add_expression("T2", expression(TextType.TRANSLATION, target="T"), relations_version=5)
+        db.get_expression_relations_version.return_value = 5
+
+        assert component["T"] is relations_of_t and len(relations_of_t) == 1
+        assert len(graph.component(db, "T")["T"]) == 2
+
+
+class TestExpressionRelationsEndpoint:
+    @patch("api.relation.Neo4JDatabase")
+    def test_relations_are_classified_within_the_component(self, mock_db_cls, client):
+        mock_db_cls.return_value = mock_db()
+
+        response = client.get("/v2/relations/expressions/T")
+
+        assert response.status_code == 200
+        assert response.get_json() == {"TRANSLATION": ["R"], "COMMENTARY": ["C"]}
+
+    def test_relations_to_expressions_missing_from_the_component_are_kept_without_raising(self):
+        relations = {"R": list(RELATIONS["R"]), "T": list(RELATIONS["T"])}
+
+        assert _classify_relations("T", relations) == {"T": None, "R": "TRANSLATION", "C": "COMMENTARY"}
+
+    @patch("api.relation.Neo4JDatabase")
+    def test_unknown_expression_is_not_found(self, mock_db_cls, client):
+        mock_db_cls.return_value = mock_db()
+
+        assert client.get("/v2/relations/expressions/missing").status_code == 404
+
+    @patch("api.relation.Neo4JDatabase")
+    def test_batch_fetches_each_component_once(self, mock_db_cls, client):
+        db = mock_db_cls.return_value = mock_db()
+
+        response = client.post("/v2/relations/expressions:batch", json={"expression_ids": ["T", "C", "X", "T"]})
+
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "T": {"TRANSLATION": ["R"], "COMMENTARY": ["C"]},
+            "C": client.get("/v2/relations/expressions/C").get_json(),
+            "X": {},
+        }
+        assert db.get_expression_relations_version.call_count == 2
+        assert [c.args for c in db.get_expression_relation_component.call_args_list] == [("T",), ("X",)]
+
+    @patch("api.relation.Neo4JDatabase")
+    def test_batch_with_unknown_expressions_is_not_found(self, mock_db_cls, client):
+        mock_db_cls.return_value = mock_db()
+
+        response = client.post("/v2/relations/expressions:batch", json={"expression_ids": ["T", "missing"]})
+
+        assert response.status_code == 404
+        assert "missing" in response.get_json()["error"]
+
+    def test_batch_requires_expression_ids(self, client):
+        assert client.post("/v2/relations/expressions:batch", json={"expression_ids": []}).status_code == 422
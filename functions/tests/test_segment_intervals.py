@@ -0,0 +1,102 @@
+"""
+Unit tests for overlap lookups on sorted segment spans and the per-worker segment layer cache.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from models import SpanModel
+from neo4j_database import Neo4JDatabase
+from neo4j_queries import Queries
+from segment_intervals import SegmentIntervals, SegmentLayerCache, segment_layers
+
+
+class TestSegmentIntervals:
+    def test_overlapping_spans_are_returned_in_start_order(self):
+        intervals = SegmentIntervals([(20, 30, "c"), (0, 10, "a"), (5, 40, "long"), (10, 20, "b")])
+
+        assert intervals.overlapping(10, 20) == ["long", "b"]
+        assert intervals.overlapping(9, 11) == ["a", "long", "b"]
+        assert intervals.overlapping(30, 40) == ["long"]
+
+    def test_touching_spans_do_not_overlap(self):
+        intervals = SegmentIntervals([(0, 10, "a"), (10, 20, "b")])
+
+        assert intervals.overlapping(10, 10) == []
+        assert intervals.overlapping(20, 30) == []
+        assert SegmentIntervals([]).overlapping(0, 10) == []
+
+    def test_inclusive_lookups_count_touching_spans(self):
+        intervals = SegmentIntervals([(0, 10, "a"), (10, 20, "b"), (25, 30, "c")])
+
+        assert intervals.overlapping(10, 10, inclusive=True) == ["a", "b"]
+        assert intervals.overlapping_spans(20, 25, inclusive=True) == [("b", 10, 20), ("c", 25, 30)]
+
+
+class TestSegmentLayerCache:
+    def test_least_recently_used_layers_are_evicted_beyond_the_segment_budget(self):
+        cache = SegmentLayerCache(max_segments=4)
+        cache.put(("A1", 0), SegmentIntervals([(0, 1, "s1"), (1, 2, "s2")]))
+        cache.put(("A2", 0), SegmentIntervals([(0, 1, "s3"), (1, 2, "s4")]))
+        cache.get(("A1", 0))
+
+        cache.put(("A3", 0), SegmentIntervals([(0, 1, "s5")]))
+
+        assert cache.get(("A2", 0)) is None
+        assert cache.get(("A1", 0)) is not None
+        stats = cache.stats()
+        assert (stats["evictions"], stats["entries"], stats["segments"]) == (1, 2, 3)
+
+    def test_invalidate_drops_every_version_of_an_annotation(self):
+        cache = SegmentLayerCache(max_segments=10)
+        for key in (("A1", 0), ("A1", 1), ("A2", 0)):
+            cache.put(key, SegmentIntervals([(0, 1, "s")]))
+
+        cache.invalidate("A1")
+
+        assert cache.get(("A1", 0)) is None and cache.get(("A1", 1)) is None
+        assert cache.get(("A2", 0)) is not None
+
+
+class TestCachedOverlapLookups:
+    @pytest.fixture(autouse=True)
+    def clear_segment_layers(self):
+        segment_layers.clear()
+        yield
+        segment_layers.clear()
+
+    @staticmethod
+    def mock_tx(mock_get_driver, layers):
+        """Answer the layer queries from `layers`: annotation_id -> (segments_version, [[id, start, end]])."""
+
+        def run(query, **params):
+            result = MagicMock()
+            if query == Queries.segments["get_segment_layer_versions"]:
+                records = [{"annotation_id": a, "segments_version": version} for a, (version, _) in layers.items()]
+            else:
+                records = [
+                    {"annotation_id": a, "segments_version": layers[a][0], "segments": layers[a][1]}
+                    for a in params["annotation_ids"]
+                ]
+            result.data.return_value = records
+            return result
+
+        tx = MagicMock()
+        tx.run.side_effect = run
+        session = mock_get_driver.return_value.session.return_value.__enter__.return_value
+        session.execute_read.side_effect = lambda work: work(tx)
+        return tx
+
+    @patch("neo4j_database.get_driver")
+    def test_layers_are_loaded_once_per_segments_version(self, mock_get_driver):
+        layers = {"A1": (0, [["s2", 10, 20], ["s1", 0, 10], ["s3", 20, 30]])}
+        tx = self.mock_tx(mock_get_driver, layers)
+        db = Neo4JDatabase()
+
+        assert [s["segment_id"] for s in db._get_overlapping_segments("M1", 5, 15)] == ["s1", "s2"]
+        assert [s.id for s in db.find_segments_by_span("M1", SpanModel(start=20, end=25))] == ["s2", "s3"]
+        assert [c.args[0] for c in tx.run.call_args_list].count(Queries.segments["get_segment_layers"]) == 1
+
+        layers["A1"] = (1, [["s1", 0, 30]])
+        assert db._get_overlapping_segments("M1", 25, 26) == [{"segment_id": "s1", "span": {"start": 0, "end": 30}}]
+        assert [c.args[0] for c in tx.run.call_args_list].count(Queries.segments["get_segment_layers"]) == 2
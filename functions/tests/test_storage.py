@@ -0,0 +1,481 @@
+# pylint: disable=redefined-outer-name
+from unittest.mock import patch
+
+import pytest
+from exceptions import DataConflict
+from storage import (
+    CHUNKED_LAYOUT,
+    MONOLITHIC_LAYOUT,
+    OFFSET_INDEX_STRIDE,
+    BaseTextCache,
+    OffsetIndex,
+    Storage,
+    base_text_cache,
+    offset_index_cache,
+)
+from storage_backends import RESUMABLE_CHUNK_SIZE, GenerationMismatch, LocalBackend
+
+from tests.conftest import MockBlob
+
+
+class TestBaseTextCache:
+    def test_evicts_least_recently_used_when_over_budget(self):
+        cache = BaseTextCache(max_bytes=10)
+        cache.put(("E1", "M1", 1), "aaaa", 4)
+        cache.put(("E1", "M2", 1), "bbbb", 4)
+        assert cache.get(("E1", "M1", 1)) == "aaaa"
+
+        cache.put(("E1", "M3", 1), "cccc", 4)
+
+        assert cache.get(("E1", "M2", 1)) is None
+        assert cache.get(("E1", "M1", 1)) == "aaaa"
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] == 8
+
+    def test_skips_entries_larger_than_budget(self):
+        cache = BaseTextCache(max_bytes=3)
+        cache.put(("E1", "M1", 1), "abcd", 4)
+        assert cache.stats()["entries"] == 0
+
+    def test_invalidate_drops_every_generation(self):
+        cache = BaseTextCache(max_bytes=100)
+        cache.put(("E1", "M1", 1), "old", 3)
+        cache.put(("E1", "M1", 2), "new", 3)
+        cache.put(("E1", "M2", 1), "other", 5)
+
+        cache.invalidate("E1", "M1")
+
+        assert cache.get(("E1", "M1", 2)) is None
+        assert cache.get(("E1", "M2", 1)) == "other"
+
+
+class TestStorageBaseTextCache:
+    def test_retrieve_serves_repeated_reads_from_cache(self, mock_storage):
+        storage = Storage()
+        storage.store_base_text("E1", "M1", "བཀྲ་ཤིས་")
+        base_text_cache.clear()
+
+        assert storage.retrieve_base_text("E1", "M1") == "བཀྲ་ཤིས་"
+        assert storage.retrieve_base_text("E1", "M1") == "བཀྲ་ཤིས་"
+
+        stats = base_text_cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert mock_storage.get_blob("base_texts/E1/M1.txt") is not None
+
+    def test_new_generation_from_another_writer_is_not_served_stale(self, mock_storage):
+        storage = Storage()
+        storage.store_base_text("E1", "M1", "first")
+        assert storage.retrieve_base_text("E1", "M1") == "first"
+
+        # Simulate a write by another instance that bypasses this process' cache
+        mock_storage.blob("base_texts/E1/M1.txt").upload_from_string("second")
+
+        assert storage.retrieve_base_text("E1", "M1") == "second"
+
+    def test_range_update_and_rollback_invalidate(self):
+        storage = Storage()
+        storage.store_base_text("E1", "M1", "hello world")
+
+        storage.update_base_text_range("E1", "M1", 0, 5, "HELLO")
+        assert storage.retrieve_base_text("E1", "M1") == "HELLO world"
+
+        storage.rollback_base_text("E1", "M1")
+        assert storage.retrieve_base_text("E1", "M1") == "hello world"
+        assert storage.fetch_base_text_range("E1", "M1", 6, 11) == "world"
+
+
+class TestOffsetIndex:
+    def test_byte_range_covers_span_at_code_point_boundaries(self):
+        text = "ཀa" * 1500  # mixes 3-byte and 1-byte code points
+        index = OffsetIndex.build(text, stride=100)
+        data = text.encode("utf-8")
+
+        first_byte, end_byte, first_char = index.byte_range(250, 1234)
+        window = data[first_byte:end_byte].decode("utf-8")
+
+        assert window[250 - first_char : 1234 - first_char] == text[250:1234]
+        assert index.size == len(data)
+
+    def test_round_trips_through_bytes(self):
+        index = OffsetIndex.build("བཀྲ་ཤིས་" * 50, stride=16)
+        restored = OffsetIndex.from_bytes(index.to_bytes(), index.stride, index.chars)
+        assert list(restored.offsets) == list(index.offsets)
+
+
+class TestRangeReads:
+    text = "".join(f"{i:05d}་" for i in range(2000))
+
+    def test_range_read_downloads_only_covering_bytes(self, mock_storage):
+        storage = Storage()
+        storage.store_base_text("E1", "M1", self.text)
+        base_text_cache.clear()
+        offset_index_cache.clear()
+
+        with patch.object(MockBlob, "download_as_bytes", autospec=True, side_effect=MockBlob.download_as_bytes) as dl:
+            content = storage.fetch_base_text_range("E1", "M1", 5000, 5012)
+
+        assert content == self.text[5000:5012]
+        text_calls = [c for c in dl.call_args_list if c.args[0].name.endswith(".txt")]
+        assert len(text_calls) == 1
+        assert text_calls[0].kwargs["start"] > 0
+        assert text_calls[0].kwargs["end"] - text_calls[0].kwargs["start"] < 3 * OFFSET_INDEX_STRIDE * 3
+        assert mock_storage.get_blob("base_texts/E1/M1.idx") is not None
+
+    def test_multiple_spans_and_out_of_range_spans(self):
+        storage = Storage()
+        storage.store_base_text("E1", "M1", self.text)
+        base_text_cache.clear()
+
+        spans = [
+            (10, 20),
+            (7000, 7005),
+            (len(self.text) - 3, len(self.text) + 50),
+            (len(self.text) + 1, len(self.text) + 2),
+        ]
+        assert storage.fetch_base_text_ranges("E1", "M1", spans) == [self.text[s:e] for s, e in spans]
+
+    def test_rollback_rebuilds_the_index_for_the_restored_text(self, mock_storage):
+        storage = Storage()
+        storage.store_base_text("E1", "M1", "old text " * 500)
+        storage.store_base_text("E1", "M1", self.text)
+        storage.rollback_base_text("E1", "M1")
+        base_text_cache.clear()
+
+        assert storage.fetch_base_text_range("E1", "M1", 9, 17) == "old text"
+
+        text_generation = mock_storage.get_blob("base_texts/E1/M1.txt").generation
+        assert mock_storage.get_blob("base_texts/E1/M1.idx").metadata["text_generation"] == str(text_generation)
+
+    def test_reads_without_an_index_download_the_text_and_write_nothing(self, mock_storage):
+        storage = Storage()
+        storage.store_base_text("E1", "M1", self.text)
+        storage.backend.delete("base_texts/E1/M1.idx")
+        base_text_cache.clear()
+        offset_index_cache.clear()
+
+        assert storage.fetch_base_text_range("E1", "M1", 5000, 5012) == self.text[5000:5012]
+        assert mock_storage.get_blob("base_texts/E1/M1.idx") is None
+
+        assert storage.index_base_text("E1", "M1") is True
+        assert storage.index_base_text("E1", "M1") is False
+        assert mock_storage.get_blob("base_texts/E1/M1.idx") is not None
+
+
+class TestChunkedLayout:
+    text = "".join(f"{i:04d}ཀ" for i in range(100))  # 500 code points
+
+    @pytest.fixture
+    def storage(self, monkeypatch):
+        monkeypatch.setenv("BASE_TEXT_CHUNK_CHARS", "64")
+        return Storage(layout=CHUNKED_LAYOUT)
+
+    def test_store_and_retrieve_reassembles_chunks(self, storage, mock_storage):
+        storage.store_base_text("E1", "M1", self.text)
+        base_text_cache.clear()
+
+        assert storage.retrieve_base_text("E1", "M1") == self.text
+        assert mock_storage.get_blob("base_texts/E1/M1.txt") is None
+        assert mock_storage.get_blob("base_texts/E1/M1/chunks/000007.txt") is not None
+        assert storage.base_text_exists("E1", "M1")
+
+    def test_range_read_only_downloads_overlapping_chunks(self, storage):
+        storage.store_base_text("E1", "M1", self.text)
+        base_text_cache.clear()
+
+        with patch.object(MockBlob, "download_as_bytes", autospec=True, side_effect=MockBlob.download_as_bytes) as dl:
+            assert storage.fetch_base_text_ranges("E1", "M1", [(70, 80), (120, 130)]) == [
+                self.text[70:80],
+                self.text[120:130],
+            ]
+
+        chunk_reads = sorted(c.args[0].name for c in dl.call_args_list if "/chunks/" in c.args[0].name)
+        assert chunk_reads == ["base_texts/E1/M1/chunks/000001.txt", "base_texts/E1/M1/chunks/000002.txt"]
+
+    def test_range_update_rewrites_only_affected_chunk(self, storage, mock_storage):
+        storage.store_base_text("E1", "M1", self.text)
+        untouched = mock_storage.get_blob("base_texts/E1/M1/chunks/000005.txt").generation
+
+        storage.update_base_text_range("E1", "M1", 100, 110, "བཀྲ་ཤིས་")
+        expected = self.text[:100] + "བཀྲ་ཤིས་" + self.text[110:]
+        base_text_cache.clear()
+
+        assert storage.retrieve_base_text("E1", "M1") == expected
+        assert storage.fetch_base_text_range("E1", "M1", 400, 420) == expected[400:420]
+        assert mock_storage.get_blob("base_texts/E1/M1/chunks/000005.txt").generation == untouched
+        assert len(mock_storage._storage["base_texts/E1/M1/chunks/000001.txt"]) == 2
+
+    def test_large_insert_splits_chunk_and_rollback_restores(self, storage):
+        storage.store_base_text("E1", "M1", self.text)
+        insert = "x" * 300
+
+        storage.update_base_text_range("E1", "M1", 500, 500, insert)
+        assert storage.retrieve_base_text("E1", "M1") == self.text + insert
+
+        storage.rollback_base_text("E1", "M1")
+        base_text_cache.clear()
+        assert storage.retrieve_base_text("E1", "M1") == self.text
+
+    def test_stale_manifest_generation_conflicts(self, storage):
+        storage.store_base_text("E1", "M1", self.text)
+        layout, stale = storage._resolve("E1", "M1")
+        storage.update_base_text_range("E1", "M1", 0, 1, "a")
+
+        with pytest.raises(DataConflict):
+            storage._update_chunked_range("E1", "M1", stale, 0, 1, "b")
+        assert layout == CHUNKED_LAYOUT
+
+    def test_existing_monolithic_text_is_converted(self, storage, mock_storage):
+        Storage(layout=MONOLITHIC_LAYOUT).store_base_text("E1", "M1", self.text)
+        # Existing texts keep their layout until migrated
+        storage.store_base_text("E1", "M1", self.text)
+        assert mock_storage.get_blob("base_texts/E1/M1.txt") is not None
+
+        assert storage.convert_to_chunked("E1", "M1") is True
+        assert storage.convert_to_chunked("E1", "M1") is False
+        base_text_cache.clear()
+
+        assert mock_storage.get_blob("base_texts/E1/M1.txt") is None
+        assert mock_storage.get_blob("base_texts/E1/M1.idx") is None
+        assert storage.retrieve_base_text("E1", "M1") == self.text
+
+    def test_chunks_and_manifest_are_public_like_the_monolithic_text(self, storage):
+        with patch.object(MockBlob, "make_public", autospec=True) as make_public:
+            storage.store_base_text("E1", "M1", self.text)
+
+        public = {c.args[0].name for c in make_public.call_args_list}
+        assert "base_texts/E1/M1/manifest.json" in public
+        assert "base_texts/E1/M1/chunks/000007.txt" in public
+
+    def test_storing_a_shorter_text_deletes_the_extra_chunks(self, storage, mock_storage):
+        storage.store_base_text("E1", "M1", self.text)
+        storage.store_base_text("E1", "M1", self.text[:100])
+        base_text_cache.clear()
+
+        chunks = sorted(b.name for b in mock_storage.list_blobs(prefix="base_texts/E1/M1/chunks/"))
+        assert chunks == ["base_texts/E1/M1/chunks/000000.txt", "base_texts/E1/M1/chunks/000001.txt"]
+        assert storage.retrieve_base_text("E1", "M1") == self.text[:100]
+
+    def test_range_update_merging_chunks_deletes_the_ones_left_over(self, storage, mock_storage):
+        storage.store_base_text("E1", "M1", self.text)
+        storage.update_base_text_range("E1", "M1", 64, 256, "")
+        base_text_cache.clear()
+
+        assert mock_storage.get_blob("base_texts/E1/M1/chunks/000002.txt") is None
+        assert mock_storage.get_blob("base_texts/E1/M1/chunks/000003.txt") is None
+        assert storage.retrieve_base_text("E1", "M1") == self.text[:64] + self.text[256:]
+
+    def test_delete_removes_every_chunk(self, storage, mock_storage):
+        storage.store_base_text("E1", "M1", self.text)
+        storage.delete_base_text("E1", "M1")
+
+        assert not storage.base_text_exists("E1", "M1")
+        assert not [b for b in mock_storage.list_blobs(prefix="base_texts/E1/")]
+
+
+class TestCompression:
+    text = "བཀྲ་ཤིས་བདེ་ལེགས། " * 400
+
+    @pytest.mark.parametrize("compression", ["gzip", "zstd"])
+    def test_monolithic_round_trip_is_compressed(self, compression, monkeypatch, mock_storage):
+        monkeypatch.setenv("BASE_TEXT_COMPRESSION", compression)
+        storage = Storage()
+        storage.store_base_text("E1", "M1", self.text)
+        base_text_cache.clear()
+
+        blob = mock_storage.get_blob("base_texts/E1/M1.txt")
+        assert blob.metadata == {"compression": compression}
+        assert blob.size < len(self.text.encode("utf-8")) / 10
+        assert storage.retrieve_base_text("E1", "M1") == self.text
+        assert storage.fetch_base_text_range("E1", "M1", 5, 15) == self.text[5:15]
+
+    @pytest.mark.parametrize("compression, content_encoding, public", [("gzip", "gzip", True), ("zstd", None, False)])
+    @pytest.mark.parametrize("layout", [MONOLITHIC_LAYOUT, CHUNKED_LAYOUT])
+    def test_public_blobs_are_served_decodable(
+        self, compression, content_encoding, public, layout, monkeypatch, mock_storage
+    ):
+        monkeypatch.setenv("BASE_TEXT_COMPRESSION", compression)
+        with patch.object(MockBlob, "make_public", autospec=True) as make_public:
+            Storage(layout=layout).store_base_text("E1", "M1", self.text)
+
+        text_blobs = [b for b in mock_storage.list_blobs(prefix="base_texts/E1/M1") if b.name.endswith(".txt")]
+        published = {c.args[0].name for c in make_public.call_args_list}
+        assert text_blobs and {b.content_encoding for b in text_blobs} == {content_encoding}
+        assert all((b.name in published) == public for b in text_blobs)
+
+    def test_range_update_and_rollback_across_codecs(self, monkeypatch):
+        Storage().store_base_text("E1", "M1", self.text)
+
+        monkeypatch.setenv("BASE_TEXT_COMPRESSION", "gzip")
+        storage = Storage()
+        storage.update_base_text_range("E1", "M1", 0, 4, "ཀཀཀཀ")
+        assert storage.retrieve_base_text("E1", "M1") == "ཀཀཀཀ" + self.text[4:]
+
+        storage.rollback_base_text("E1", "M1")
+        base_text_cache.clear()
+        assert storage.retrieve_base_text("E1", "M1") == self.text
+        assert storage.fetch_base_text_range("E1", "M1", 0, 4) == self.text[:4]
+
+    def test_chunked_round_trip_records_codec_per_chunk(self, monkeypatch):
+        monkeypatch.setenv("BASE_TEXT_COMPRESSION", "zstd")
+        monkeypatch.setenv("BASE_TEXT_CHUNK_CHARS", "1000")
+        storage = Storage(layout=CHUNKED_LAYOUT)
+        storage.store_base_text("E1", "M1", self.text)
+        storage.update_base_text_range("E1", "M1", 1500, 1510, "x")
+        expected = self.text[:1500] + "x" + self.text[1510:]
+        base_text_cache.clear()
+
+        _, manifest_blob = storage._resolve("E1", "M1")
+        manifest = storage._load_manifest("E1", "M1", manifest_blob)
+        assert {chunk["compression"] for chunk in manifest.chunks} == {"zstd"}
+        assert storage.retrieve_base_text("E1", "M1") == expected
+        assert storage.fetch_base_text_range("E1", "M1", 1490, 1520) == expected[1490:1520]
+
+    def test_unknown_codec_is_rejected(self, monkeypatch):
+        monkeypatch.setenv("BASE_TEXT_COMPRESSION", "brotli")
+        with pytest.raises(ValueError):
+            Storage()
+
+
+class TestLocalBackend:
+    text = "".join(f"{i:05d}་" for i in range(3000))
+
+    @pytest.fixture
+    def backend(self, tmp_path):
+        return LocalBackend(tmp_path)
+
+    def test_generations_preconditions_and_restore(self, backend):
+        first = backend.write("a/b.txt", b"one", content_type="text/plain", metadata={"k": "v"})
+        second = backend.write("a/b.txt", b"two", content_type="text/plain", if_generation_match=first.generation)
+
+        with pytest.raises(GenerationMismatch):
+            backend.write("a/b.txt", b"three", content_type="text/plain", if_generation_match=first.generation)
+        with pytest.raises(GenerationMismatch):
+            backend.write("a/b.txt", b"three", content_type="text/plain", if_generation_match=0)
+
+        assert backend.generations("a/b.txt") == [first.generation, second.generation]
+        assert bytes(backend.read("a/b.txt", first.generation)) == b"one"
+
+        restored = backend.restore("a/b.txt", first.generation)
+        assert backend.stat("a/b.txt").generation == restored.generation
+        assert backend.stat("a/b.txt").metadata == {"k": "v"}
+        assert bytes(backend.read("a/b.txt")) == b"one"
+
+    def test_storages_share_one_backend_per_root(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("STORAGE_BACKEND", "local")
+        monkeypatch.setenv("LOCAL_STORAGE_ROOT", str(tmp_path))
+        first, second = Storage(), Storage()
+
+        assert first.backend is second.backend
+        stale = first.store_base_text("E1", "M1", "one")
+        first.store_base_text("E1", "M1", "two", if_generation_match=stale)
+        with pytest.raises(GenerationMismatch):
+            second.backend.write(
+                "base_texts/E1/M1.txt", b"three", content_type="text/plain", if_generation_match=stale
+            )
+        with pytest.raises(DataConflict):
+            second.store_base_text("E1", "M1", "three", if_generation_match=stale)
+
+    def test_range_reads_are_zero_copy_slices(self, backend):
+        backend.write("a/b.txt", b"0123456789", content_type="text/plain")
+
+        view = backend.read("a/b.txt", start=2, end=5)
+
+        assert isinstance(view, memoryview)
+        assert bytes(view) == b"234"
+
+    def test_list_and_delete(self, backend):
+        backend.write("base_texts/E1/M1.txt", b"x", content_type="text/plain")
+        backend.write("base_texts/E1/M1/manifest.json", b"{}", content_type="application/json")
+        backend.write("base_texts/E2/M1.txt", b"y", content_type="text/plain")
+
+        assert [o.path for o in backend.list("base_texts/E1/")] == [
+            "base_texts/E1/M1.txt",
+            "base_texts/E1/M1/manifest.json",
+        ]
+        backend.delete("base_texts/E1/M1.txt")
+        backend.delete("base_texts/E1/missing.txt")
+        assert not backend.exists("base_texts/E1/M1.txt")
+        with pytest.raises(ValueError):
+            backend.stat("../outside")
+
+    @pytest.mark.parametrize("layout", [MONOLITHIC_LAYOUT, CHUNKED_LAYOUT])
+    def test_storage_content_paths(self, backend, layout, monkeypatch):
+        monkeypatch.setenv("BASE_TEXT_CHUNK_CHARS", "1000")
+        storage = Storage(layout=layout, backend=backend)
+        storage.store_base_text("E1", "M1", self.text)
+        base_text_cache.clear()
+        offset_index_cache.clear()
+
+        assert storage.fetch_base_text_ranges("E1", "M1", [(6000, 6012), (10, 20)]) == [
+            self.text[6000:6012],
+            self.text[10:20],
+        ]
+        storage.update_base_text_range("E1", "M1", 0, 6, "ཀ")
+        assert storage.retrieve_base_text("E1", "M1") == "ཀ" + self.text[6:]
+
+        storage.rollback_base_text("E1", "M1")
+        base_text_cache.clear()
+        assert storage.retrieve_base_text("E1", "M1") == self.text
+
+        storage.delete_base_text("E1", "M1")
+        assert not storage.base_text_exists("E1", "M1")
+
+
+class TestStreamedUpload:
+    def test_store_uploads_from_memory_with_bounded_chunks(self):
+        with (
+            patch.object(MockBlob, "upload_from_filename", side_effect=AssertionError("no temp file uploads")),
+            patch.object(
+                MockBlob, "upload_from_string", autospec=True, side_effect=MockBlob.upload_from_string
+            ) as upload,
+        ):
+            Storage().store_base_text("E1", "M1", "བཀྲ་ཤིས་" * 10)
+
+        text_upload = next(c for c in upload.call_args_list if c.args[0].name.endswith(".txt"))
+        assert text_upload.args[0].chunk_size == RESUMABLE_CHUNK_SIZE
+        assert Storage().retrieve_base_text("E1", "M1") == "བཀྲ་ཤིས་" * 10
+
+
+class TestGenerationTracking:
+    @pytest.mark.parametrize("layout", [MONOLITHIC_LAYOUT, CHUNKED_LAYOUT])
+    def test_rollback_to_recorded_generation_does_not_list_versions(self, layout):
+        storage = Storage(layout=layout)
+        previous = storage.store_base_text("E1", "M1", "first")
+        current = storage.store_base_text("E1", "M1", "second")
+        assert storage.base_text_generation("E1", "M1") == current
+
+        with patch.object(storage.backend, "generations", side_effect=AssertionError("versions were listed")):
+            restored = storage.rollback_base_text("E1", "M1", generation=current, previous_generation=previous)
+
+        assert restored == storage.base_text_generation("E1", "M1")
+        assert storage.retrieve_base_text("E1", "M1") == "first"
+
+    def test_rollback_conflicts_when_text_changed_since_recorded_generation(self):
+        storage = Storage()
+        previous = storage.store_base_text("E1", "M1", "first")
+        current = storage.store_base_text("E1", "M1", "second")
+        storage.store_base_text("E1", "M1", "third")
+
+        with pytest.raises(DataConflict):
+            storage.rollback_base_text("E1", "M1", generation=current, previous_generation=previous)
+        assert storage.retrieve_base_text("E1", "M1") == "third"
+
+    def test_rollback_without_previous_generation_keeps_text(self):
+        storage = Storage()
+        current = storage.store_base_text("E1", "M1", "first")
+
+        assert storage.rollback_base_text("E1", "M1", generation=current) is None
+        assert storage.retrieve_base_text("E1", "M1") == "first"
+
+    def test_range_update_checks_expected_generation(self):
+        storage = Storage()
+        stale = storage.store_base_text("E1", "M1", "hello world")
+        current = storage.store_base_text("E1", "M1", "hello there")
+
+        with pytest.raises(DataConflict):
+            storage.update_base_text_range("E1", "M1", 0, 5, "HELLO", if_generation_match=stale)
+
+        updated = storage.update_base_text_range("E1", "M1", 0, 5, "HELLO", if_generation_match=current)
+        assert updated == storage.base_text_generation("E1", "M1")
+        assert storage.retrieve_base_text("E1", "M1") == "HELLO there"
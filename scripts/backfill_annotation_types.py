@@ -0,0 +1,29 @@
+"""
+Store the materialized type on every Annotation node.
+
+Layer lookups filter a manifestation's annotations on `a.type` (indexed as `annotation_type`, see
+neo4j_constraints.cypher) instead of following HAS_TYPE to the AnnotationType node. New
+annotations get it when they are created; this copies the AnnotationType name onto annotations
+created before, in batches of 1000. Safe to re-run.
+
+Usage (from the repository root, with NEO4J_URI and NEO4J_PASSWORD set):
+
+    python scripts/backfill_annotation_types.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions"))
+
+from neo4j_database import Neo4JDatabase  # noqa: E402  # pylint: disable=wrong-import-position
+
+
+def main() -> int:
+    updated = Neo4JDatabase().backfill_annotation_types()
+    print(f"{updated} annotations updated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+Store the materialized type on every Expression node.
+
+Expression listings filter on `e.type` through the `expression_type` index (see
+neo4j_constraints.cypher). New expressions get it when they are created; this fills it in for
+expressions created before, recomputing it from their TRANSLATION_OF/COMMENTARY_OF
+relationships in batches of 1000, then records the finished backfill as the
+(:Backfill {id: 'expression_types'}) node. Until that node exists, type-filtered listings scan
+every expression and infer the missing types. Safe to re-run.
+
+Usage (from the repository root, with NEO4J_URI and NEO4J_PASSWORD set):
+
+    python scripts/backfill_expression_types.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions"))
+
+from neo4j_database import Neo4JDatabase  # noqa: E402  # pylint: disable=wrong-import-position
+
+
+def main() -> int:
+    updated = Neo4JDatabase().backfill_expression_types()
+    print(f"{updated} expressions updated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Write the offset index of every monolithic base text that lacks a current one.
+
+Walks base_texts/{expression_id}/{manifestation_id}.txt in the configured bucket and writes the
+.idx blob next to each text whose index is missing or was built for another generation (see
+Storage.index_base_text). Range reads never write indexes themselves, so run this once after
+deploying for texts stored before. Texts that already have a current index, chunked texts and
+compressed texts are left alone, so the tool can be re-run safely.
+
+Usage (from the repository root, with application default credentials):
+
+    python scripts/backfill_offset_indexes.py --dry-run
+    python scripts/backfill_offset_indexes.py
+    python scripts/backfill_offset_indexes.py --expression-id <id>
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions"))
+
+from storage import Storage  # noqa: E402  # pylint: disable=wrong-import-position
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expression-id", help="Only index the texts of this expression")
+    parser.add_argument("--dry-run", action="store_true", help="List the texts that would be indexed")
+    args = parser.parse_args()
+
+    if os.environ.get("STORAGE_BACKEND", "gcs") == "gcs":
+        import firebase_config  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+
+    storage = Storage()
+    prefix = f"base_texts/{args.expression_id}/" if args.expression_id else "base_texts/"
+    indexed = skipped = failed = 0
+
+    for stored in storage.backend.list(prefix):
+        parts = stored.path.split("/")
+        if len(parts) != 3 or not parts[2].endswith(".txt"):
+            continue
+        expression_id, manifestation_id = parts[1], parts[2].removesuffix(".txt")
+
+        if args.dry_run:
+            index = storage.backend.stat(f"base_texts/{expression_id}/{manifestation_id}.idx")
+            if index is None or index.metadata.get("text_generation") != str(stored.generation):
+                print(f"would index {expression_id}/{manifestation_id} ({stored.size} bytes)")
+                indexed += 1
+            else:
+                skipped += 1
+            continue
+
+        try:
+            if storage.index_base_text(expression_id, manifestation_id):
+                indexed += 1
+                print(f"indexed {expression_id}/{manifestation_id}")
+            else:
+                skipped += 1
+        except Exception as e:  # keep going; the text stays readable through full downloads
+            failed += 1
+            print(f"FAILED {expression_id}/{manifestation_id}: {e}", file=sys.stderr)
+
+    print(f"{indexed} indexed, {skipped} skipped, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+Store the relation group on every Expression node.
+
+Relation lookups fetch the connected component of TRANSLATION_OF/COMMENTARY_OF relations around
+an expression through the `expression_relation_group` index (see neo4j_constraints.cypher). New
+expressions get it when they are created, as long as their target has one; this groups the
+expressions created before, 100 components per transaction, using the smallest expression id of
+each component. Ungrouped components are still found by traversing their relations. Safe to
+re-run.
+
+Usage (from the repository root, with NEO4J_URI and NEO4J_PASSWORD set):
+
+    python scripts/backfill_relation_groups.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions"))
+
+from neo4j_database import Neo4JDatabase  # noqa: E402  # pylint: disable=wrong-import-position
+
+
+def main() -> int:
+    updated = Neo4JDatabase().backfill_relation_groups()
+    print(f"{updated} ungrouped expressions processed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""
+Store the span index properties on every annotation created before they were maintained.
+
+Overlap queries seek an annotation's segments through the `segment_annotation_span` index (see
+neo4j_constraints.cypher), which needs `annotation_id` on each Segment and `max_span_length` on
+its Annotation. New segments get both when they are created; this fills them in for older
+annotations, 10 annotations per transaction. Until then those annotations fall back to expanding
+all of their segments. Safe to re-run.
+
+Usage (from the repository root, with NEO4J_URI and NEO4J_PASSWORD set):
+
+    python scripts/backfill_segment_spans.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions"))
+
+from neo4j_database import Neo4JDatabase  # noqa: E402  # pylint: disable=wrong-import-position
+
+
+def main() -> int:
+    updated = Neo4JDatabase().backfill_segment_span_index()
+    print(f"{updated} annotations updated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Compare base-text storage codecs on bytes moved and latency.
+
+For every corpus text and codec (none, gzip, zstd) this reports the stored size and the
+compress/decompress time. With --live it also times Storage.store_base_text and
+Storage.retrieve_base_text end to end against the configured bucket (each run uses a
+throwaway benchmark expression id that is deleted afterwards). Set STORAGE_BACKEND=local to
+measure the local filesystem backend instead.
+
+Usage (from the repository root):
+
+    python scripts/bench_compression.py                        # synthetic 100 KB, 1 MB, 10 MB texts
+    python scripts/bench_compression.py --corpus-dir ./texts   # every *.txt under a directory
+    python scripts/bench_compression.py --live --runs 5        # also time real uploads and downloads
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions"))
+
+from storage import COMPRESSIONS, Storage, base_text_cache, compress, decompress  # noqa: E402
+
+SYLLABLES = ["བཀྲ", "ཤིས", "བདེ", "ལེགས", "སངས", "རྒྱས", "ཆོས", "དགེ", "འདུན", "བྱང", "ཆུབ", "སེམས", "དཔའ"]
+
+
+def synthetic_text(size_bytes: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts: list[str] = []
+    total = 0
+    while total < size_bytes:
+        syllable = rng.choice(SYLLABLES) + ("། " if rng.random() < 0.08 else "་")
+        parts.append(syllable)
+        total += len(syllable.encode("utf-8"))
+    return "".join(parts)
+
+
+def load_corpus(corpus_dir: str | None) -> dict[str, str]:
+    if corpus_dir:
+        return {path.name: path.read_text(encoding="utf-8") for path in sorted(Path(corpus_dir).rglob("*.txt"))}
+    return {f"synthetic-{size // 1000}KB": synthetic_text(size) for size in (100_000, 1_000_000, 10_000_000)}
+
+
+def timed(func, runs: int) -> tuple[float, object]:
+    samples, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def bench_codecs(corpus: dict[str, str], runs: int) -> None:
+    print(f"{'text':<22}{'codec':<7}{'bytes':>12}{'ratio':>8}{'compress ms':>13}{'decompress ms':>15}")
+    for name, text in corpus.items():
+        raw = text.encode("utf-8")
+        for codec in COMPRESSIONS:
+            compress_ms, packed = timed(lambda c=codec: compress(raw, c), runs)
+            decompress_ms, _ = timed(lambda c=codec, p=packed: decompress(p, c), runs)
+            ratio = len(raw) / len(packed)
+            print(f"{name:<22}{codec:<7}{len(packed):>12}{ratio:>8.1f}{compress_ms:>13.1f}{decompress_ms:>15.1f}")
+
+
+def bench_live(corpus: dict[str, str], runs: int) -> None:
+    if os.environ.get("STORAGE_BACKEND", "gcs") == "gcs":
+        import firebase_config  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+
+    print(f"\n{'text':<22}{'codec':<7}{'store ms':>10}{'retrieve ms':>13}")
+    for name, text in corpus.items():
+        for codec in COMPRESSIONS:
+            storage = Storage()
+            storage.compression = codec
+            expression_id = f"benchmark-{uuid.uuid4().hex[:8]}"
+            try:
+                store_ms, _ = timed(lambda s=storage, e=expression_id: s.store_base_text(e, "M", text), runs)
+
+                def retrieve(s=storage, e=expression_id):
+                    base_text_cache.clear()  # measure the download, not the in-process cache
+                    return s.retrieve_base_text(e, "M")
+
+                retrieve_ms, _ = timed(retrieve, runs)
+                print(f"{name:<22}{codec:<7}{store_ms:>10.0f}{retrieve_ms:>13.0f}")
+            finally:
+                storage.delete_base_text(expression_id, "M")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus-dir", help="Directory of UTF-8 .txt files to benchmark instead of synthetic texts")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement; the median is reported")
+    parser.add_argument("--live", action="store_true", help="Also time uploads and downloads against the bucket")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus_dir)
+    bench_codecs(corpus, args.runs)
+    if args.live:
+        bench_live(corpus, args.runs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Measure GET /v2/annotations/{id} latency on a large alignment annotation.
+
+Seeds a throwaway alignment annotation with --segments segments, aligned one to one with a
+target annotation of the same size, then reads it through both paths:
+
+- "previous": the former sequence of a type query, an aligned-annotation query and one segment
+  query per annotation, each in its own session (the queries are reproduced here only for
+  comparison).
+- "current": Neo4JDatabase.get_annotation, one query in one read transaction.
+
+The seeded nodes are deleted afterwards.
+
+Usage (from the repository root, with NEO4J_URI and NEO4J_PASSWORD set):
+
+    python scripts/bench_get_annotation.py
+    python scripts/bench_get_annotation.py --segments 50000 --runs 10
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions"))
+
+from neo4j_database import Neo4JDatabase  # noqa: E402  # pylint: disable=wrong-import-position
+
+SEED_QUERY = """
+CREATE (source:Annotation {id: $prefix + '-source', type: 'alignment'})
+       -[:ALIGNED_TO]->(target:Annotation {id: $prefix + '-target', type: 'alignment'})
+WITH source, target
+UNWIND range(0, $segments - 1) AS i
+CREATE (s:Segment {id: $prefix + '-s' + i, annotation_id: source.id, span_start: i * 10, span_end: i * 10 + 10})
+       -[:SEGMENTATION_OF]->(source)
+CREATE (t:Segment {id: $prefix + '-t' + i, annotation_id: target.id, span_start: i * 12, span_end: i * 12 + 12})
+       -[:SEGMENTATION_OF]->(target)
+CREATE (s)-[:ALIGNED_TO]->(t)
+"""
+CLEANUP_QUERY = """
+MATCH (n)
+WHERE (n:Annotation OR n:Segment) AND n.id STARTS WITH $prefix
+CALL (n) {
+    DETACH DELETE n
+} IN TRANSACTIONS OF 10000 ROWS
+"""
+PREVIOUS_QUERIES = {
+    "type": """
+MATCH (a:Annotation {id: $annotation_id})
+RETURN a.type as annotation_type
+""",
+    "aligned": """
+MATCH (a:Annotation {id: $annotation_id})-[:ALIGNED_TO]->(target_ann:Annotation)
+RETURN target_ann.id as aligned_to_id
+""",
+    "segments": """
+MATCH (a:Annotation {id: $annotation_id})
+<-[:SEGMENTATION_OF]-(s:Segment)
+OPTIONAL MATCH (s)-[:HAS_REFERENCE]->(r:Reference)
+OPTIONAL MATCH (s)-[:HAS_TYPE]->(bt:BibliographyType)
+OPTIONAL MATCH (s)-[:ALIGNED_TO]->(aligned_seg:Segment)
+WITH s, r, bt, collect(aligned_seg.id) as aligned_segments
+RETURN s.id as id,
+       s.span_start as start,
+       s.span_end as end,
+       r.name as reference,
+       bt.name as bibliography_type,
+       aligned_segments
+ORDER BY s.span_start
+""",
+}
+
+
+def _previous(db: Neo4JDatabase, annotation_id: str) -> int:
+    with db.get_session() as session:
+        session.run(PREVIOUS_QUERIES["type"], annotation_id=annotation_id).single()
+        aligned_to_id = session.run(PREVIOUS_QUERIES["aligned"], annotation_id=annotation_id).single()["aligned_to_id"]
+    segments = 0
+    for segments_of in (annotation_id, aligned_to_id):
+        with db.get_session() as session:
+            segments += len(list(session.run(PREVIOUS_QUERIES["segments"], annotation_id=segments_of)))
+    return segments
+
+
+def _current(db: Neo4JDatabase, annotation_id: str) -> int:
+    return sum(len(segments) for segments in db.get_annotation(annotation_id)["data"].values())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=20000, help="Segments per annotation")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    db = Neo4JDatabase()
+    prefix = f"benchmark-{uuid.uuid4().hex[:8]}"
+    with db.get_session() as session:
+        session.run(SEED_QUERY, prefix=prefix, segments=args.segments).consume()
+    try:
+        print(f"{'path':<10}{'segments':>10}{'median ms':>12}{'min ms':>10}")
+        for name, read in (("previous", _previous), ("current", _current)):
+            timings = []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                segments = read(db, f"{prefix}-source")
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{name:<10}{segments:>10}{statistics.median(timings):>12.1f}{min(timings):>10.1f}")
+    finally:
+        with db.get_session() as session:
+            # CALL { ... } IN TRANSACTIONS only runs in an auto-commit transaction
+            session.run(CLEANUP_QUERY, prefix=prefix).consume()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Measure the related-segments walk (segment-related, segments-relation) on an alignment chain.
+
+Seeds --manifestations throwaway manifestations, each with a segmentation annotation of
+--segments segments, and aligns every one with the next through a pair of alignment annotations,
+so a walk from the first one reaches all the others. The walk is then run through both paths:
+
+- "previous": the former per-manifestation walk, with an alignment pair query per manifestation
+  and an aligned segments, manifestation and (with --transform) overlapping segments query per
+  pair, each in its own session (the queries are reproduced here only for comparison).
+- "current": Neo4JDatabase._get_related_segments, one query per BFS level (two with --transform).
+
+Both paths must return the same segments. The seeded nodes are deleted afterwards.
+
+Usage (from the repository root, with NEO4J_URI and NEO4J_PASSWORD set):
+
+    python scripts/bench_related_segments.py
+    python scripts/bench_related_segments.py --manifestations 10 --segments 1000 --transform
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions"))
+
+from neo4j_database import Neo4JDatabase  # noqa: E402  # pylint: disable=wrong-import-position
+
+SEED_QUERY = """
+UNWIND range(0, $manifestations - 1) AS m
+CREATE (manifestation:Manifestation {id: $prefix + '-m' + m})
+CREATE (segmentation:Annotation {id: $prefix + '-seg' + m, type: 'segmentation'})-[:ANNOTATION_OF]->(manifestation)
+WITH m, manifestation, segmentation
+UNWIND range(0, $segments - 1) AS i
+CREATE (:Segment {id: $prefix + '-m' + m + '-s' + i, annotation_id: segmentation.id, span_start: i * 10,
+                  span_end: i * 10 + 10})-[:SEGMENTATION_OF]->(segmentation)
+"""
+SEED_ALIGNMENT_QUERY = """
+UNWIND range(0, $manifestations - 2) AS m
+MATCH (source_manifestation:Manifestation {id: $prefix + '-m' + m})
+MATCH (target_manifestation:Manifestation {id: $prefix + '-m' + (m + 1)})
+CREATE (source_manifestation)<-[:ANNOTATION_OF]-(source:Annotation {id: $prefix + '-out' + m, type: 'alignment'})
+       -[:ALIGNED_TO]->(target:Annotation {id: $prefix + '-in' + (m + 1), type: 'alignment'})
+       -[:ANNOTATION_OF]->(target_manifestation)
+WITH m, source, target
+UNWIND range(0, $segments - 1) AS i
+CREATE (s:Segment {id: $prefix + '-out' + m + '-s' + i, annotation_id: source.id, span_start: i * 10,
+                   span_end: i * 10 + 10})-[:SEGMENTATION_OF]->(source)
+CREATE (t:Segment {id: $prefix + '-in' + (m + 1) + '-s' + i, annotation_id: target.id, span_start: i * 10,
+                   span_end: i * 10 + 10})-[:SEGMENTATION_OF]->(target)
+CREATE (s)-[:ALIGNED_TO]->(t)
+"""
+CLEANUP_QUERY = """
+MATCH (n)
+WHERE (n:Manifestation OR n:Annotation OR n:Segment) AND n.id STARTS WITH $prefix
+CALL (n) {
+    DETACH DELETE n
+} IN TRANSACTIONS OF 10000 ROWS
+"""
+PREVIOUS_QUERIES = {
+    "alignment_pairs": """
+MATCH (m:Manifestation {id: $manifestation_id})
+MATCH (m)<-[:ANNOTATION_OF]-(a1:Annotation {type: 'alignment'})
+MATCH (a1)-[:ALIGNED_TO]-(a2:Annotation)
+RETURN a1.id as alignment_1_id, a2.id as alignment_2_id
+ORDER BY alignment_1_id, alignment_2_id
+""",
+    "aligned_segments": """
+MATCH (a1:Annotation {id: $alignment_1_id})<-[:SEGMENTATION_OF]-(s1:Segment)
+WHERE s1.span_start < $span_end AND s1.span_end > $span_start
+MATCH (s1)-[:ALIGNED_TO]-(s2:Segment)
+RETURN DISTINCT s2.id as segment_id, s2.span_start as span_start, s2.span_end as span_end
+ORDER BY s2.span_start
+""",
+    "manifestation": """
+MATCH (:Annotation {id: $annotation_id})-[:ANNOTATION_OF]->(m:Manifestation)
+RETURN m.id as manifestation_id
+""",
+    "overlapping_segments": """
+MATCH (:Manifestation {id: $manifestation_id})<-[:ANNOTATION_OF]-(ann:Annotation {type: 'segmentation'})
+MATCH (ann)<-[:SEGMENTATION_OF]-(s:Segment)
+WHERE s.span_start < $span_end AND s.span_end > $span_start
+RETURN s.id as segment_id, s.span_start as span_start, s.span_end as span_end
+ORDER BY s.span_start
+""",
+}
+
+
+def _read(db: Neo4JDatabase, query: str, **params) -> list[dict]:
+    with db.get_session() as session:
+        return session.execute_read(lambda tx: tx.run(query, **params).data())
+
+
+def _segments(records: list[dict]) -> list[dict]:
+    return [{"segment_id": r["segment_id"], "span": {"start": r["span_start"], "end": r["span_end"]}} for r in records]
+
+
+def _previous(db: Neo4JDatabase, manifestation_id: str, start: int, end: int, transform: bool) -> list[dict]:
+    related_segments, traversed_alignment_pairs = [], set()
+    visited_manifestations = {manifestation_id}
+    queue = deque([(manifestation_id, start, end)])
+    while queue:
+        manifestation_1_id, span_start, span_end = queue.popleft()
+        for pair in _read(db, PREVIOUS_QUERIES["alignment_pairs"], manifestation_id=manifestation_1_id):
+            if (pair["alignment_1_id"], pair["alignment_2_id"]) in traversed_alignment_pairs:
+                continue
+            segments = _segments(
+                _read(
+                    db,
+                    PREVIOUS_QUERIES["aligned_segments"],
+                    alignment_1_id=pair["alignment_1_id"],
+                    span_start=span_start,
+                    span_end=span_end,
+                )
+            )
+            if not segments:
+                continue
+            overall_start = min(segment["span"]["start"] for segment in segments)
+            overall_end = max(segment["span"]["end"] for segment in segments)
+            manifestation_2_id = _read(db, PREVIOUS_QUERIES["manifestation"], annotation_id=pair["alignment_2_id"])[0][
+                "manifestation_id"
+            ]
+            if manifestation_2_id in visited_manifestations:
+                continue
+            visited_manifestations.add(manifestation_2_id)
+            if transform:
+                segments = _segments(
+                    _read(
+                        db,
+                        PREVIOUS_QUERIES["overlapping_segments"],
+                        manifestation_id=manifestation_2_id,
+                        span_start=overall_start,
+                        span_end=overall_end,
+                    )
+                )
+            related_segments.append({"manifestation_id": manifestation_2_id, "segments": segments})
+            traversed_alignment_pairs.add((pair["alignment_1_id"], pair["alignment_2_id"]))
+            traversed_alignment_pairs.add((pair["alignment_2_id"], pair["alignment_1_id"]))
+            queue.append((manifestation_2_id, overall_start, overall_end))
+    return related_segments
+
+
+def _current(db: Neo4JDatabase, manifestation_id: str, start: int, end: int, transform: bool) -> list[dict]:
+    return db._get_related_segments(manifestation_id, start, end, transform)  # pylint: disable=protected-access
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifestations", type=int, default=10, help="Length of the alignment chain")
+    parser.add_argument("--segments", type=int, default=1000, help="Segments per annotation")
+    parser.add_argument("--span", type=int, default=50, help="Length of the span the walk starts from")
+    parser.add_argument("--transform", action="store_true", help="Map spans onto segmentation segments")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    db = Neo4JDatabase()
+    prefix = f"benchmark-{uuid.uuid4().hex[:8]}"
+    with db.get_session() as session:
+        session.run(SEED_QUERY, prefix=prefix, manifestations=args.manifestations, segments=args.segments).consume()
+        session.run(
+            SEED_ALIGNMENT_QUERY, prefix=prefix, manifestations=args.manifestations, segments=args.segments
+        ).consume()
+    try:
+        results = {}
+        print(f"{'path':<10}{'reached':>10}{'median ms':>12}{'min ms':>10}")
+        for name, walk in (("previous", _previous), ("current", _current)):
+            timings = []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                results[name] = walk(db, f"{prefix}-m0", 0, args.span, args.transform)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{name:<10}{len(results[name]):>10}{statistics.median(timings):>12.1f}{min(timings):>10.1f}")
+        if results["previous"] != results["current"]:
+            print("The paths returned different segments", file=sys.stderr)
+            return 1
+    finally:
+        with db.get_session() as session:
+            # CALL { ... } IN TRANSACTIONS only runs in an auto-commit transaction
+            session.run(CLEANUP_QUERY, prefix=prefix).consume()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Compare base-text upload strategies on peak memory and latency.
+
+"tempfile" reproduces the previous store path: encode, write the text to /tmp, upload from the
+file (with the client's default resumable chunk size) and delete it. "memory" is the current
+Storage path: upload the encoded bytes straight from memory in bounded resumable chunks.
+
+Each measurement runs in a fresh interpreter, so the reported peak RSS belongs to that upload
+alone. Pages written to /tmp live on tmpfs in Cloud Functions; they are charged to the instance's
+memory but not to the process RSS, so the tempfile strategy also reports the bytes it put there.
+
+Usage (from the repository root):
+
+    STORAGE_BACKEND=local python scripts/bench_upload.py             # 10, 25 and 50 MB texts
+    python scripts/bench_upload.py --sizes-mb 10 50 --runs 5         # against the Firebase bucket
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+FUNCTIONS_DIR = Path(__file__).resolve().parent.parent / "functions"
+STRATEGIES = ("tempfile", "memory")
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _child(strategy: str, size_mb: int) -> dict:
+    sys.path.insert(0, str(FUNCTIONS_DIR))
+    if os.environ.get("STORAGE_BACKEND", "gcs") == "gcs":
+        import firebase_config  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+    from storage import Storage  # pylint: disable=import-outside-toplevel
+    from storage_backends import GcsBackend  # pylint: disable=import-outside-toplevel
+
+    unit = "བཀྲ་ཤིས་བདེ་ལེགས། "
+    text = unit * (size_mb * 1024 * 1024 // len(unit.encode("utf-8")))
+    storage = Storage()
+    expression_id = f"benchmark-{uuid.uuid4().hex[:8]}"
+    path = f"base_texts/{expression_id}/M.txt"
+    tmpfs_bytes = 0
+
+    baseline_rss = _rss_mb()
+    started = time.perf_counter()
+    if strategy == "memory":
+        storage._upload(path, text.encode("utf-8"), expression_id, "M")  # pylint: disable=protected-access
+    else:
+        temp_file = Path(tempfile.gettempdir()) / f"{expression_id}_M.txt"
+        try:
+            temp_file.write_text(text, encoding="utf-8")
+            tmpfs_bytes = temp_file.stat().st_size
+            if isinstance(storage.backend, GcsBackend):
+                storage.backend.bucket.blob(path).upload_from_filename(str(temp_file))
+            else:
+                with open(temp_file, "rb") as f:
+                    storage.backend.write(path, f, content_type="text/plain; charset=utf-8")
+        finally:
+            temp_file.unlink(missing_ok=True)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    peak_rss = _rss_mb()
+
+    storage.backend.delete(path)
+    return {"ms": elapsed_ms, "rss_mb": peak_rss - baseline_rss, "tmpfs_mb": tmpfs_bytes / 1024 / 1024}
+
+
+def _measure(strategy: str, size_mb: int) -> dict:
+    completed = subprocess.run(
+        [sys.executable, __file__, "--child", strategy, str(size_mb)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{strategy} upload of {size_mb} MB failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        print(json.dumps(_child(sys.argv[2], int(sys.argv[3]))))
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[10, 25, 50], help="Text sizes to upload")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement; medians are reported")
+    args = parser.parse_args()
+
+    print(f"{'size':>6}  {'strategy':<9}{'upload ms':>11}{'peak RSS +MB':>14}{'tmpfs MB':>10}")
+    for size_mb in args.sizes_mb:
+        for strategy in STRATEGIES:
+            runs = [_measure(strategy, size_mb) for _ in range(args.runs)]
+            ms = statistics.median(r["ms"] for r in runs)
+            rss = statistics.median(r["rss_mb"] for r in runs)
+            tmpfs = statistics.median(r["tmpfs_mb"] for r in runs)
+            print(f"{size_mb:>4}MB  {strategy:<9}{ms:>11.0f}{rss:>14.1f}{tmpfs:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Convert monolithic base texts to the chunked storage layout.
+
+Walks base_texts/{expression_id}/{manifestation_id}.txt in the configured bucket and rewrites
+each text as fixed-size chunks plus a manifest (see Storage.convert_to_chunked). Texts that
+are already chunked are left alone, so the tool can be re-run safely. The manifest's generation
+is recorded on the Manifestation node, and the previous generation (of the deleted .txt blob)
+cleared, so the Neo4j connection settings must be set as well.
+
+Usage (from the repository root, with application default credentials):
+
+    python scripts/chunk_base_texts.py --dry-run
+    python scripts/chunk_base_texts.py --min-bytes 1000000
+    python scripts/chunk_base_texts.py --expression-id <id>
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions"))
+
+from neo4j_database import Neo4JDatabase  # noqa: E402  # pylint: disable=wrong-import-position
+from storage import CHUNKED_LAYOUT, Storage  # noqa: E402  # pylint: disable=wrong-import-position
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expression-id", help="Only convert the texts of this expression")
+    parser.add_argument("--min-bytes", type=int, default=0, help="Skip texts smaller than this many bytes")
+    parser.add_argument("--dry-run", action="store_true", help="List the texts that would be converted")
+    args = parser.parse_args()
+
+    if os.environ.get("STORAGE_BACKEND", "gcs") == "gcs":
+        import firebase_config  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+
+    storage = Storage(layout=CHUNKED_LAYOUT)
+    db = None if args.dry_run else Neo4JDatabase()
+    prefix = f"base_texts/{args.expression_id}/" if args.expression_id else "base_texts/"
+    converted = skipped = failed = 0
+
+    for stored in storage.backend.list(prefix):
+        parts = stored.path.split("/")
+        if len(parts) != 3 or not parts[2].endswith(".txt"):
+            continue
+        expression_id, manifestation_id = parts[1], parts[2].removesuffix(".txt")
+
+        if (stored.size or 0) < args.min_bytes:
+            skipped += 1
+            continue
+        if args.dry_run:
+            print(f"would convert {expression_id}/{manifestation_id} ({stored.size} bytes)")
+            converted += 1
+            continue
+
+        try:
+            if storage.convert_to_chunked(expression_id, manifestation_id):
+                # The monolithic blob is gone, so there is nothing to roll back to
+                db.reset_base_text_generation(
+                    manifestation_id, storage.base_text_generation(expression_id, manifestation_id)
+                )
+            converted += 1
+            print(f"converted {expression_id}/{manifestation_id}")
+        except Exception as e:  # keep going; the failed text stays monolithic and readable
+            failed += 1
+            print(f"FAILED {expression_id}/{manifestation_id}: {e}", file=sys.stderr)
+
+    print(f"{converted} converted, {skipped} skipped, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+PROFILE title and author search: the previous CONTAINS scan against the fulltext-index queries.
+
+For every search term, both query shapes run under PROFILE against the configured Neo4j
+database. The report shows rows returned, total db hits over the plan, and server time. The
+scan queries are the pre-fulltext ones, kept here only for comparison, and return the same
+expression fragment.
+
+Usage (from the repository root, with NEO4J_URI and NEO4J_PASSWORD set to a realistic corpus):
+
+    python scripts/profile_text_search.py
+    python scripts/profile_text_search.py --title "བྱང་ཆུབ་སེམས་དཔའ" --title "Bodhisattva" --author "ཞི་བ་ལྷ"
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions"))
+
+from neo4j_database import fulltext_query, get_driver  # noqa: E402  # pylint: disable=wrong-import-position
+from neo4j_queries import Queries  # noqa: E402  # pylint: disable=wrong-import-position
+
+SCAN_QUERIES = {
+    "title": """
+    MATCH (e:Expression)
+    WHERE EXISTS {
+            MATCH (e)-[:HAS_TITLE]->(:Nomen)-[:HAS_LOCALIZATION]->(lt:LocalizedText)
+            WHERE toLower(lt.text) CONTAINS toLower($title)
+        }
+        OR EXISTS {
+            MATCH (e)-[:HAS_TITLE]->(:Nomen)<-[:ALTERNATIVE_OF]-(:Nomen)-[:HAS_LOCALIZATION]->(lt:LocalizedText)
+            WHERE toLower(lt.text) CONTAINS toLower($title)
+        }
+    WITH DISTINCT e
+    OFFSET $offset
+    LIMIT $limit
+""",
+    "author": """
+    MATCH (e:Expression)
+    WHERE EXISTS {
+            MATCH (e)-[:HAS_CONTRIBUTION]->(contrib:Contribution)-[:WITH_ROLE]->(role:RoleType)
+            WHERE role.name = 'author'
+            MATCH (contrib)-[:BY]->(:Person)-[:HAS_NAME]->(:Nomen)-[:HAS_LOCALIZATION]->(lt:LocalizedText)
+            WHERE toLower(lt.text) CONTAINS toLower($author)
+        }
+        OR EXISTS {
+            MATCH (e)-[:HAS_CONTRIBUTION]->(contrib:Contribution)-[:WITH_ROLE]->(role:RoleType)
+            WHERE role.name = 'author'
+            MATCH (contrib)-[:BY]->(:Person)-[:HAS_NAME]->(:Nomen)<-[:ALTERNATIVE_OF]-(:Nomen)
+                  -[:HAS_LOCALIZATION]->(lt:LocalizedText)
+            WHERE toLower(lt.text) CONTAINS toLower($author)
+        }
+    WITH DISTINCT e
+    OFFSET $offset
+    LIMIT $limit
+""",
+}
+FULLTEXT_QUERIES = {"title": "fetch_all_fuzzy_title", "author": "fetch_all_fuzzy_author"}
+
+
+def _db_hits(plan: dict) -> int:
+    return plan.get("dbHits", 0) + sum(_db_hits(child) for child in plan.get("children", []))
+
+
+def _profile(session, query: str, params: dict) -> tuple[int, int, int]:
+    result = session.run(f"PROFILE {query}", params)
+    rows = len(list(result))
+    summary = result.consume()
+    return rows, _db_hits(summary.profile), summary.result_available_after + summary.result_consumed_after
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--title", action="append", help="Title search term (repeatable)")
+    parser.add_argument("--author", action="append", help="Author search term (repeatable)")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    searches = [("title", term) for term in args.title or ["བྱང་ཆུབ", "prajnaparamita"]]
+    searches += [("author", term) for term in args.author or ["ཀླུ་སྒྲུབ", "nagarjuna"]]
+
+    print(f"{'field':<7}{'term':<28}{'query':<10}{'rows':>6}{'db hits':>12}{'ms':>8}")
+    with get_driver().session() as session:
+        for field, term in searches:
+            params = {
+                "title": None,
+                "author": None,
+                "title_query": None,
+                "author_query": None,
+                "type": None,
+                "language": None,
+                "offset": 0,
+                "limit": args.limit,
+                field: term,
+                f"{field}_query": fulltext_query(term),
+            }
+            for name, query in (
+                ("scan", f"{SCAN_QUERIES[field]}RETURN {Queries.expression_fragment('e')} AS expression"),
+                ("fulltext", Queries.expressions[FULLTEXT_QUERIES[field]]),
+            ):
+                rows, hits, ms = _profile(session, query, params)
+                print(f"{field:<7}{term:<28}{name:<10}{rows:>6}{hits:>12}{ms:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Cold-start import report for the functions bundle.
+
+Imports the entry point module in fresh interpreters with ``python -X importtime``,
+reports the median total import time and the most expensive modules, and optionally
+fails when the total exceeds a budget or regresses against a saved baseline.
+
+Usage (from the repository root, inside the functions virtualenv):
+
+    python scripts/startup_report.py
+    python scripts/startup_report.py --save startup_baseline.json
+    python scripts/startup_report.py --baseline startup_baseline.json --threshold 0.15
+    python scripts/startup_report.py --budget-ms 600
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+FUNCTIONS_DIR = Path(__file__).resolve().parent.parent / "functions"
+
+
+def _run_once(module: str) -> dict[str, dict[str, int]]:
+    """Import `module` in a fresh interpreter and return {name: {"self": us, "cumulative": us, "depth": n}}."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=FUNCTIONS_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        stripped = name.lstrip()
+        timings[stripped] = {
+            "self": int(self_us),
+            "cumulative": int(cumulative_us),
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        }
+    return timings
+
+
+def build_report(module: str, runs: int, top: int) -> dict:
+    samples = [_run_once(module) for _ in range(runs)]
+
+    def median(name: str, key: str) -> int:
+        return int(statistics.median(sample.get(name, {}).get(key, 0) for sample in samples))
+
+    names = set().union(*samples)
+    direct_imports = sorted(
+        (name for name in names if samples[-1].get(name, {}).get("depth") == 1),
+        key=lambda name: median(name, "cumulative"),
+        reverse=True,
+    )
+    heaviest_self = sorted(names, key=lambda name: median(name, "self"), reverse=True)
+
+    return {
+        "module": module,
+        "runs": runs,
+        "total_ms": median(module, "cumulative") / 1000,
+        "direct_imports_ms": {name: median(name, "cumulative") / 1000 for name in direct_imports[:top]},
+        "heaviest_self_ms": {name: median(name, "self") / 1000 for name in heaviest_self[:top]},
+    }
+
+
+def _print_report(report: dict) -> None:
+    print(f"Cold import of '{report['module']}': {report['total_ms']:.1f} ms (median of {report['runs']} runs)")
+    print("\nDirect imports by cumulative time:")
+    for name, ms in report["direct_imports_ms"].items():
+        print(f"  {ms:8.1f} ms  {name}")
+    print("\nModules by self time:")
+    for name, ms in report["heaviest_self_ms"].items():
+        print(f"  {ms:8.1f} ms  {name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to sample")
+    parser.add_argument("--top", type=int, default=15, help="Number of modules to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the median import time exceeds this budget")
+    parser.add_argument("--baseline", type=Path, help="Report saved with --save to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed relative regression against --baseline (default: 0.2)"
+    )
+    parser.add_argument("--save", type=Path, help="Write the report as JSON for later comparisons")
+    args = parser.parse_args()
+
+    report = build_report(args.module, args.runs, args.top)
+    _print_report(report)
+
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nSaved report to {args.save}")
+
+    failed = False
+    if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+        print(f"\nFAIL: {report['total_ms']:.1f} ms exceeds the {args.budget_ms:.1f} ms budget")
+        failed = True
+
+    if args.baseline:
+        baseline_ms = json.loads(args.baseline.read_text(encoding="utf-8"))["total_ms"]
+        limit_ms = baseline_ms * (1 + args.threshold)
+        change = (report["total_ms"] - baseline_ms) / baseline_ms
+        print(f"\nBaseline: {baseline_ms:.1f} ms, change: {change:+.1%} (limit {limit_ms:.1f} ms)")
+        if report["total_ms"] > limit_ms:
+            print("FAIL: cold import regressed beyond the threshold")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())